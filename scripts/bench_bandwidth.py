@@ -0,0 +1,112 @@
+"""Measure how many bytes the TUI writes to the terminal, per mode.
+
+PomodoroApp runs headlessly under Textual's ``run_test`` pilot, once as
+usual and once in low-bandwidth mode (``TIMY_LOW_BANDWIDTH``), on top of a
+synthetic history. The app counts the bytes of every screen update it
+renders (``timy_terminal_bytes_total``), which is what a real terminal
+would receive, apart from cursor placement. Scenarios:
+
+* a running timer, in bytes per minute (this takes ``--seconds`` of real
+  time per mode, a minute by default);
+* the last minute of a session, where both modes show seconds;
+* one completed session, including its notification;
+* another timy instance logging a session, which changes the graph;
+* a history sync that changes nothing.
+
+    python scripts/bench_bandwidth.py
+    python scripts/bench_bandwidth.py --seconds 120
+"""
+import argparse
+import asyncio
+import atexit
+import os
+import shutil
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+from dates import generate_timestamps
+
+# Point HISTORY_DIR at a scratch directory before timy is imported
+_SCRATCH = tempfile.mkdtemp(prefix="timy-bench-bandwidth-")
+atexit.register(shutil.rmtree, _SCRATCH, ignore_errors=True)
+os.environ["HOME"] = _SCRATCH
+os.environ.setdefault("TIMY_SOUND", "null")
+
+from timy import checkpoint, history  # noqa: E402
+from timy.app import PomodoroApp  # noqa: E402
+
+MODES = {"normal": False, "low-bandwidth": True}
+HISTORY_SIZE = 10_000
+TERMINAL_SIZE = (160, 50)
+SECONDS = 60.0
+# The last minute shows seconds in both modes, so a shorter sample is scaled up
+LAST_MINUTE_SECONDS = 20.0
+# Long enough for the "Break time!" notification to come and go
+COMPLETION_SECONDS = 4.0
+
+
+async def bench_mode(low_bandwidth: bool, seconds: float) -> dict:
+    history.HISTORY_DIR.mkdir(parents=True, exist_ok=True)
+    history.HISTORY_FILE.write_text("\n".join(generate_timestamps(HISTORY_SIZE // 10, 10)) + "\n")
+    history.DAYS_FILE.unlink(missing_ok=True)
+    checkpoint.STATE_FILE.unlink(missing_ok=True)
+    shutil.rmtree(history.HISTORY_DIR / "segments", ignore_errors=True)
+
+    app = PomodoroApp(low_bandwidth=low_bandwidth)
+    results = {}
+    async with app.run_test(size=TERMINAL_SIZE) as pilot:
+        timer = app.timer_display
+        while app.pomodoro_graph._initial_loading:
+            await pilot.pause(0.01)
+        await pilot.pause(0.5)
+
+        async def written(action, duration: float) -> int:
+            before = app.terminal_bytes.value
+            action()
+            await asyncio.sleep(duration)
+            await pilot.pause()
+            return app.terminal_bytes.value - before
+
+        def start(left: timedelta):
+            def action():
+                timer.time_left = left
+                timer.is_running = True
+            return action
+
+        # Half a minute into a minute, so exactly one whole minute passes per minute measured
+        running = await written(start(timedelta(minutes=25, seconds=30)), seconds)
+        results["running timer (B/min)"] = running * 60 / seconds
+        timer.is_running = False
+
+        last = await written(start(timedelta(seconds=59.5)), LAST_MINUTE_SECONDS)
+        results["last minute (B/min)"] = last * 60 / LAST_MINUTE_SECONDS
+        timer.is_running = False
+        await pilot.pause()
+
+        results["completed session (B)"] = await written(start(timedelta(seconds=0.5)), COMPLETION_SECONDS)
+
+        def log_elsewhere():
+            history.append_completion(datetime.now()) # As `timy log` in another terminal would
+        results["other instance logs (B)"] = await written(log_elsewhere, 1.0)
+        results["no-op history sync (B)"] = await written(app.pomodoro_graph.load_history, 0.2)
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=SECONDS,
+                        help=f"How long the running timer is measured per mode (default: {SECONDS:g})")
+    args = parser.parse_args()
+
+    results = {mode: asyncio.run(bench_mode(low_bandwidth, args.seconds)) for mode, low_bandwidth in MODES.items()}
+    print(f"{'scenario':<26}" + "".join(f"{mode:>15}" for mode in MODES) + f"{'saved':>8}")
+    for scenario, normal in results["normal"].items():
+        low = results["low-bandwidth"][scenario]
+        saved = f"{1 - low / normal:.0%}" if normal else "-"
+        print(f"{scenario:<26}{normal:>15.0f}{low:>15.0f}{saved:>8}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
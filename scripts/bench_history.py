@@ -0,0 +1,169 @@
+"""Benchmark the history data path against synthetic histories.
+
+Histories are produced with ``dates.generate_timestamps`` in several shapes
+(shuffled, sorted, with malformed lines, spanning several years) and sizes.
+The PomodoroGraph / TimerDisplay methods are timed inside a headless Textual
+app, peak memory is recorded with tracemalloc, and the timings are compared
+against ``bench_baseline.json``.
+
+    python scripts/bench_history.py                  # 1k .. 1M entries
+    python scripts/bench_history.py --full           # also 10M entries
+    python scripts/bench_history.py --update-baseline
+"""
+import argparse
+import asyncio
+import atexit
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+from dates import generate_timestamps
+
+# Point HISTORY_DIR at a scratch directory before timy is imported
+_SCRATCH = tempfile.mkdtemp(prefix="timy-bench-")
+atexit.register(shutil.rmtree, _SCRATCH, ignore_errors=True)
+os.environ["HOME"] = _SCRATCH
+os.environ.setdefault("TIMY_SOUND", "null")
+
+from timy import history  # noqa: E402
+from timy.app import PomodoroApp  # noqa: E402
+
+BASELINE_FILE = Path(__file__).with_name("bench_baseline.json")
+SIZES = [1_000, 10_000, 100_000, 1_000_000]
+FULL_SIZES = SIZES + [10_000_000]
+CASES = ["shuffled", "sorted", "malformed", "multi_year"]
+# A run fails if it is this much slower than the baseline (plus a small
+# absolute allowance so microsecond-scale timings don't flap)
+TOLERANCE = 0.5
+SLACK_SECONDS = 0.002
+REPEAT = 5
+
+
+def make_history(case: str, size: int) -> list:
+    """Return ``size`` history lines shaped according to ``case``."""
+    days = 5 * 365 if case == "multi_year" else 100
+    per_day = max(1, -(-size // days))
+    lines = generate_timestamps(-(-size // per_day), per_day)[:size]
+    if case == "sorted":
+        lines.sort()
+    elif case == "malformed":
+        for i in range(0, len(lines), 100):
+            lines[i] = "not-a-timestamp"
+    return lines
+
+
+def best_of(fn, repeat: int = REPEAT, setup=None) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def peak_memory(fn, setup=None) -> int:
+    if setup is not None:
+        setup()
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+async def bench_case(case: str, size: int) -> dict:
+    history.HISTORY_DIR.mkdir(parents=True, exist_ok=True)
+    history.HISTORY_FILE.write_text("\n".join(make_history(case, size)) + "\n")
+    history.DAYS_FILE.unlink(missing_ok=True)
+    # Months archived by the previous case would be counted on top of this one
+    shutil.rmtree(history.HISTORY_DIR / "segments", ignore_errors=True)
+
+    app = PomodoroApp()
+    results = {}
+    async with app.run_test() as pilot:
+        graph = app.pomodoro_graph
+        timer = app.timer_display
+        # The graph's first load runs in a worker; wait for it before timing anything
+        while graph._initial_loading:
+            await pilot.pause(0.01)
+        await app.history_writer.flush()
+        repeat = 1 if size >= 1_000_000 else REPEAT
+
+        def invalidate_render():
+            graph._grid_key = None
+
+        functions = {
+            # Full parse: drop the day store first
+            "load_history_cold": (graph.load_history, graph._store.reset, repeat),
+            # Nothing appended since the last sync
+            "load_history_warm": (graph.load_history, None, REPEAT),
+            "get_total_contributions": (graph.get_total_contributions, None, REPEAT),
+            "render": (graph.render, invalidate_render, REPEAT),
+            # What the UI pays (just queueing) and the write the writer does for it
+            "_log_completion": (timer._log_completion, None, REPEAT),
+            "append_completion": (lambda: history.append_completion(datetime.now(), graph._store), None, REPEAT),
+        }
+        for name, (fn, setup, n) in functions.items():
+            seconds = best_of(fn, n, setup)
+            peak = peak_memory(fn, setup)
+            results[name] = {"seconds": seconds, "peak_bytes": peak}
+    return results
+
+
+def compare(results: dict, baseline: dict) -> list:
+    regressions = []
+    for key, functions in results.items():
+        for name, measured in functions.items():
+            expected = baseline.get(key, {}).get(name)
+            if expected is None:
+                continue
+            limit = expected["seconds"] * (1 + TOLERANCE) + SLACK_SECONDS
+            if measured["seconds"] > limit:
+                regressions.append(f"{key} {name}: {measured['seconds']:.4f}s > {limit:.4f}s")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--full", action="store_true", help="Include the 10M-entry histories")
+    parser.add_argument("--sizes", type=int, nargs="+", help="Override the history sizes")
+    parser.add_argument("--cases", nargs="+", choices=CASES, default=CASES)
+    parser.add_argument("--update-baseline", action="store_true", help="Store this run as the new baseline")
+    args = parser.parse_args()
+
+    sizes = args.sizes or (FULL_SIZES if args.full else SIZES)
+    results = {}
+    print(f"{'case':<12}{'size':>10}  {'function':<26}{'time':>12}{'peak mem':>12}")
+    for case in args.cases:
+        for size in sizes:
+            key = f"{case}/{size}"
+            results[key] = asyncio.run(bench_case(case, size))
+            for name, r in results[key].items():
+                print(f"{case:<12}{size:>10}  {name:<26}{r['seconds'] * 1000:>10.2f}ms{r['peak_bytes'] / 1024:>10.0f}KB")
+
+    if args.update_baseline:
+        baseline = json.loads(BASELINE_FILE.read_text()) if BASELINE_FILE.exists() else {}
+        baseline.update(results)
+        BASELINE_FILE.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+        print(f"Baseline written to {BASELINE_FILE}")
+        return 0
+
+    if not BASELINE_FILE.exists():
+        print("No baseline stored; run with --update-baseline first")
+        return 0
+    regressions = compare(results, json.loads(BASELINE_FILE.read_text()))
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
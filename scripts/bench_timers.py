@@ -0,0 +1,87 @@
+"""Measure the CPU cost of hosting many timers in one TUI.
+
+PomodoroApp runs headlessly under Textual's ``run_test`` pilot with N extra
+timers (``timy --timer``), all running on its TimerScheduler. For each N,
+the process CPU time is sampled over a few seconds, together with the
+scheduler's wakeups and the frames painted. Two workloads are measured:
+
+``steady``
+    every timer in a long work session; nothing is due, so only the timer
+    list's once-a-second repaint runs;
+``churn``
+    every timer's session ends within the window, at random times, so each
+    completion (phase switch, history record, notification) is included.
+
+    python scripts/bench_timers.py
+    python scripts/bench_timers.py --counts 1 100 1000 --seconds 10
+"""
+import argparse
+import asyncio
+import atexit
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import timedelta
+
+# Point HISTORY_DIR at a scratch directory before timy is imported
+_SCRATCH = tempfile.mkdtemp(prefix="timy-bench-timers-")
+atexit.register(shutil.rmtree, _SCRATCH, ignore_errors=True)
+os.environ["HOME"] = _SCRATCH
+os.environ.setdefault("TIMY_SOUND", "null")
+
+from timy import checkpoint  # noqa: E402
+from timy.app import PomodoroApp  # noqa: E402
+
+COUNTS = [1, 10, 100]
+SECONDS = 5.0
+TERMINAL_SIZE = (160, 50)
+
+
+async def bench_count(count: int, workload: str, seconds: float) -> dict:
+    checkpoint.STATE_FILE.unlink(missing_ok=True)
+    app = PomodoroApp(timers=[(f"timer {i}", 50, 10) for i in range(count)])
+    async with app.run_test(size=TERMINAL_SIZE) as pilot:
+        await pilot.pause(0.5)
+        scheduler = app.timer_scheduler
+        for timer in scheduler:
+            if workload == "churn":
+                timer.session.timer.time_left = timedelta(seconds=random.uniform(0.1, seconds - 0.5))
+            scheduler.start(timer.name)
+        app.timer_list.sync()
+        await pilot.pause()
+
+        wakeups, written = scheduler.wakeups, app.terminal_bytes.value
+        cpu, wall = time.process_time(), time.perf_counter()
+        await asyncio.sleep(seconds)
+        cpu, wall = time.process_time() - cpu, time.perf_counter() - wall
+        result = {
+            "cpu_ms_per_s": cpu * 1000 / wall,
+            "wakeups": scheduler.wakeups - wakeups,
+            "completed": sum(timer.completed for timer in scheduler),
+            "bytes_per_s": (app.terminal_bytes.value - written) / wall,
+        }
+        if app.history_writer is not None:
+            await app.history_writer.flush()
+    return result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--counts", type=int, nargs="+", default=COUNTS, help="Numbers of timers (default: 1 10 100)")
+    parser.add_argument("--seconds", type=float, default=SECONDS, help=f"Measurement window (default: {SECONDS:g})")
+    args = parser.parse_args()
+
+    print(f"{'workload':<9}{'timers':>8}{'CPU ms/s':>10}{'wakeups':>9}{'completed':>11}{'bytes/s':>9}")
+    for workload in ("steady", "churn"):
+        for count in args.counts:
+            r = asyncio.run(bench_count(count, workload, args.seconds))
+            print(f"{workload:<9}{count:>8}{r['cpu_ms_per_s']:>10.2f}{r['wakeups']:>9}"
+                  f"{r['completed']:>11}{r['bytes_per_s']:>9.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,233 @@
+"""Benchmark keystroke-to-paint latency of the TUI, headlessly.
+
+PomodoroApp runs under Textual's ``run_test`` pilot on top of a synthetic
+history (``dates.generate_timestamps``). Each interaction is repeated and
+its latency measured from the moment the key (or click) is posted to the
+first frame painted afterwards. PomodoroApp renders every frame to terminal
+escape sequences itself (to count the bytes), headless or not, so the cost
+of producing the output is included. The frame rate of an idle,
+running timer is measured too. Results are compared against
+``bench_ui_baseline.json``.
+
+    python scripts/bench_ui.py                  # 100k-entry history
+    python scripts/bench_ui.py --sizes 1000000
+    python scripts/bench_ui.py --update-baseline
+"""
+import argparse
+import asyncio
+import atexit
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import timedelta
+from pathlib import Path
+
+from dates import generate_timestamps
+
+# Point HISTORY_DIR at a scratch directory before timy is imported
+_SCRATCH = tempfile.mkdtemp(prefix="timy-bench-ui-")
+atexit.register(shutil.rmtree, _SCRATCH, ignore_errors=True)
+os.environ["HOME"] = _SCRATCH
+os.environ.setdefault("TIMY_SOUND", "null")
+
+from timy import checkpoint, history  # noqa: E402
+from timy.app import PomodoroApp  # noqa: E402
+
+BASELINE_FILE = Path(__file__).with_name("bench_ui_baseline.json")
+SIZES = [100_000]
+SAMPLES = 100
+# Seconds the timer runs while frames are counted
+RUN_SECONDS = 3.0
+# An interaction that paints nothing within this long is timed to the end of
+# its processing instead (starting the timer at a full minute changes nothing
+# on screen until the first tick)
+PAINT_TIMEOUT = 0.1
+TERMINAL_SIZE = (160, 50)
+# A run fails if a latency is this much higher than the baseline (plus a small
+# absolute allowance so millisecond-scale timings don't flap), or if the
+# running timer paints this much more often
+TOLERANCE = 0.5
+SLACK_SECONDS = 0.005
+# Tails are noisier: the p99 of 100 samples is the second worst
+P99_TOLERANCE = 1.0
+
+
+class BenchApp(PomodoroApp):
+    """PomodoroApp that timestamps every frame it paints."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.frames = []
+        self.acted = None # When the last action bound to a key finished
+
+    async def run_action(self, *args, **kwargs) -> bool:
+        handled = await super().run_action(*args, **kwargs)
+        self.acted = time.perf_counter()
+        return handled
+
+    def _display(self, screen, renderable) -> None:
+        written = self.terminal_bytes.value
+        super()._display(screen, renderable)
+        if self.terminal_bytes.value != written:
+            self.frames.append(time.perf_counter())
+
+
+async def measure(app: BenchApp, pilot, action) -> tuple:
+    """``(seconds, painted)``: from ``action`` to the next frame, or to the
+    end of the key's action if it painted nothing within ``PAINT_TIMEOUT``."""
+    painted = len(app.frames)
+    app.acted = None
+    start = time.perf_counter()
+    await action()
+    processed = app.acted or time.perf_counter()
+    deadline = start + PAINT_TIMEOUT
+    while len(app.frames) == painted and time.perf_counter() < deadline:
+        await asyncio.sleep(0.0005)
+    # Let anything the interaction scheduled settle before the next sample
+    await pilot.pause()
+    if len(app.frames) > painted:
+        return app.frames[painted] - start, True
+    return processed - start, False
+
+
+def summarize(samples: list) -> dict:
+    seconds = sorted(s for s, _ in samples)
+    return {
+        "p50": statistics.median(seconds),
+        "p99": seconds[min(int(0.99 * len(seconds)), len(seconds) - 1)],
+        "unpainted": sum(1 for _, painted in samples if not painted),
+    }
+
+
+async def bench_size(size: int, samples: int) -> dict:
+    history.HISTORY_DIR.mkdir(parents=True, exist_ok=True)
+    history.HISTORY_FILE.write_text("\n".join(generate_timestamps(-(-size // 10), 10)[:size]) + "\n")
+    history.DAYS_FILE.unlink(missing_ok=True)
+    checkpoint.STATE_FILE.unlink(missing_ok=True)
+    shutil.rmtree(history.HISTORY_DIR / "segments", ignore_errors=True)
+
+    app = BenchApp()
+    results = {}
+    async with app.run_test(size=TERMINAL_SIZE) as pilot:
+        graph = app.pomodoro_graph
+        while graph._initial_loading:
+            await pilot.pause(0.01)
+        await pilot.pause(0.1)
+
+        def press(key):
+            return lambda: pilot.press(key)
+
+        def update_settings(minutes):
+            async def action():
+                app.query_one("#work-input").value = str(minutes)
+                await pilot.click("#update-settings")
+            return action
+
+        # Start and stop alternately, always from a full minute so that no
+        # tick lands in the measurement
+        toggle = []
+        for i in range(samples):
+            if not i % 2:
+                app.timer_display.time_left = timedelta(minutes=app.timer_display.work_duration)
+                await pilot.pause()
+            toggle.append(await measure(app, pilot, press("space")))
+        results["toggle_timer"] = toggle
+
+        reset = []
+        for _ in range(samples):
+            app.timer_display.time_left = timedelta(minutes=12)
+            app.timer_display.update_timer()
+            await pilot.pause()
+            reset.append(await measure(app, pilot, press("r")))
+        results["reset_timer"] = reset
+
+        graph.focus()
+        await pilot.pause()
+        results["graph_arrow"] = [await measure(app, pilot, press("up" if i % 2 else "down"))
+                                  for i in range(samples)]
+        results["graph_page"] = [await measure(app, pilot, press("pagedown" if i % 2 else "pageup"))
+                                 for i in range(samples)]
+
+        update = []
+        for i in range(samples):
+            update.append(await measure(app, pilot, update_settings(25 + i % 2)))
+            app.clear_notifications()
+        results["update_settings"] = update
+
+        # Frames while the timer runs and nothing else happens
+        app.action_reset_timer()
+        await pilot.pause()
+        app.action_toggle_timer()
+        await pilot.pause()
+        painted = len(app.frames)
+        await asyncio.sleep(RUN_SECONDS)
+        fps = (len(app.frames) - painted) / RUN_SECONDS
+        app.action_toggle_timer()
+
+    report = {name: summarize(values) for name, values in results.items()}
+    report["running_timer"] = {"fps": fps}
+    return report
+
+
+def compare(results: dict, baseline: dict) -> list:
+    regressions = []
+    for key, interactions in results.items():
+        for name, measured in interactions.items():
+            expected = baseline.get(key, {}).get(name)
+            if expected is None:
+                continue
+            if "fps" in measured:
+                limit = expected["fps"] * (1 + TOLERANCE) + 0.5
+                if measured["fps"] > limit:
+                    regressions.append(f"{key} {name}: {measured['fps']:.2f} fps > {limit:.2f} fps")
+                continue
+            for stat in ("p50", "p99"):
+                tolerance = P99_TOLERANCE if stat == "p99" else TOLERANCE
+                limit = expected[stat] * (1 + tolerance) + SLACK_SECONDS
+                if measured[stat] > limit:
+                    regressions.append(f"{key} {name} {stat}: {measured[stat] * 1000:.1f}ms > {limit * 1000:.1f}ms")
+            if measured["unpainted"] and not expected["unpainted"]:
+                regressions.append(f"{key} {name}: {measured['unpainted']} interactions painted nothing")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="History sizes (default: 100k)")
+    parser.add_argument("--samples", type=int, default=SAMPLES, help=f"Repetitions per interaction (default: {SAMPLES})")
+    parser.add_argument("--update-baseline", action="store_true", help="Store this run as the new baseline")
+    args = parser.parse_args()
+
+    results = {}
+    print(f"{'size':>10}  {'interaction':<18}{'p50':>10}{'p99':>10}{'unpainted':>11}")
+    for size in args.sizes:
+        key = str(size)
+        results[key] = asyncio.run(bench_size(size, args.samples))
+        for name, r in results[key].items():
+            if "fps" in r:
+                print(f"{size:>10}  {name:<18}{r['fps']:>9.2f} frames/s")
+            else:
+                print(f"{size:>10}  {name:<18}{r['p50'] * 1000:>8.2f}ms{r['p99'] * 1000:>8.2f}ms{r['unpainted']:>11}")
+
+    if args.update_baseline:
+        baseline = json.loads(BASELINE_FILE.read_text()) if BASELINE_FILE.exists() else {}
+        baseline.update(results)
+        BASELINE_FILE.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+        print(f"Baseline written to {BASELINE_FILE}")
+        return 0
+
+    if not BASELINE_FILE.exists():
+        print("No baseline stored; run with --update-baseline first")
+        return 0
+    regressions = compare(results, json.loads(BASELINE_FILE.read_text()))
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,124 @@
+"""Load test for ``timy daemon``: one daemon, many attached clients.
+
+Starts a daemon in a subprocess on a scratch history, attaches ``--clients``
+protocol clients (the same DaemonClient the TUI uses) and measures:
+
+* attach latency: connect until the initial snapshot is applied
+* fan-out latency: a toggle sent by one client until every client saw the
+  resulting timer update, and a logged completion until every client saw the
+  new day counter
+
+    python scripts/daemon_load.py --clients 300 --entries 100000
+"""
+import argparse
+import asyncio
+import atexit
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from dates import generate_timestamps
+
+_SCRATCH = tempfile.mkdtemp(prefix="timy-daemon-")
+atexit.register(shutil.rmtree, _SCRATCH, ignore_errors=True)
+os.environ["HOME"] = _SCRATCH
+
+from timy import history  # noqa: E402
+from timy.daemon import DaemonClient  # noqa: E402
+
+
+def percentiles(samples: list) -> str:
+    samples = sorted(samples)
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    return f"p50 {statistics.median(samples) * 1000:7.2f} ms   p99 {p99 * 1000:7.2f} ms   max {samples[-1] * 1000:7.2f} ms"
+
+
+async def wait_for_socket(path: Path, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not path.exists():
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"daemon did not create {path}")
+        await asyncio.sleep(0.05)
+
+
+async def attach(socket_path: Path) -> tuple:
+    client = DaemonClient(socket_path)
+    ready = asyncio.Event()
+    client.on_days = ready.set
+    start = time.perf_counter()
+    await client.connect()
+    await ready.wait()
+    return client, time.perf_counter() - start
+
+
+async def fan_out(clients: list, trigger, hook: str) -> list:
+    """Per-client delay between ``trigger()`` and the next ``hook`` callback."""
+    loop = asyncio.get_running_loop()
+    arrivals = [loop.create_future() for _ in clients]
+    for client, arrival in zip(clients, arrivals):
+        def done(*args, arrival=arrival):
+            if not arrival.done():
+                arrival.set_result(time.perf_counter())
+        setattr(client, hook, done)
+    start = time.perf_counter()
+    trigger()
+    return [t - start for t in await asyncio.gather(*arrivals)]
+
+
+async def run(args) -> None:
+    lines = generate_timestamps(args.entries // 5)
+    history.HISTORY_DIR.mkdir(parents=True, exist_ok=True)
+    history.HISTORY_FILE.write_text("\n".join(lines) + "\n")
+    socket_path = Path(_SCRATCH) / "daemon.sock"
+
+    daemon = subprocess.Popen(
+        [sys.executable, "-m", "timy", "daemon", "--socket", str(socket_path)],
+        env={**os.environ, "TIMY_SOUND": "null"}, stdout=subprocess.DEVNULL,
+    )
+    try:
+        start = time.perf_counter()
+        await wait_for_socket(socket_path)
+        print(f"daemon ready with {len(lines)} entries in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+        clients, latencies = [], []
+        for _ in range(args.clients):
+            client, latency = await attach(socket_path)
+            clients.append(client)
+            latencies.append(latency)
+        print(f"attach ({args.clients} clients)       {percentiles(latencies)}")
+
+        delays = []
+        for _ in range(args.rounds):
+            delays += await fan_out(clients, lambda: clients[0].send("toggle"), "on_timer")
+        print(f"timer fan-out ({args.rounds} rounds)    {percentiles(delays)}")
+
+        log = lambda: subprocess.Popen([sys.executable, "-m", "timy", "log"], stdout=subprocess.DEVNULL)
+        delays = await fan_out(clients, log, "on_days")
+        print(f"logged record to all clients   {percentiles(delays)}  (includes 'timy log' startup)")
+
+        with open(f"/proc/{daemon.pid}/status") as status:
+            rss = next(line.split()[1] for line in status if line.startswith("VmRSS"))
+        print(f"daemon RSS                     {int(rss) // 1024} MB")
+        for client in clients:
+            client.close()
+    finally:
+        daemon.terminate()
+        daemon.wait()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=300)
+    parser.add_argument("--entries", type=int, default=100_000)
+    parser.add_argument("--rounds", type=int, default=20)
+    asyncio.run(run(parser.parse_args()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
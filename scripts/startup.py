@@ -0,0 +1,59 @@
+"""Measure cold-start time of the headless ``timy`` subcommands.
+
+Each command is run in a fresh interpreter several times and the median wall
+time is compared against TARGET_MS. Exits non-zero if any command is over
+budget or ends up importing Textual.
+"""
+import statistics
+import subprocess
+import sys
+import time
+
+# Budget for a headless command, interpreter startup included
+TARGET_MS = 80
+RUNS = 15
+COMMANDS = [
+    ["status", "--short"],
+    ["stats"],
+]
+
+CHECK_NO_TEXTUAL = (
+    "import sys, timy.cli\n"
+    "try:\n"
+    "    timy.cli.main(['status', '--short'])\n"
+    "except SystemExit:\n"
+    "    pass\n"
+    "sys.exit(1 if 'textual' in sys.modules else 0)\n"
+)
+
+
+def time_command(args):
+    samples = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-m", "timy", *args], check=True, stdout=subprocess.DEVNULL)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+if __name__ == "__main__":
+    failed = False
+    empty = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "pass"], check=True)
+        empty.append((time.perf_counter() - start) * 1000)
+    print(f"{'python -c pass':<24}{statistics.median(empty):7.1f} ms")
+
+    for args in COMMANDS:
+        ms = time_command(args)
+        over = ms > TARGET_MS
+        failed |= over
+        print(f"{'timy ' + ' '.join(args):<24}{ms:7.1f} ms{'  OVER BUDGET' if over else ''}")
+
+    if subprocess.run([sys.executable, "-c", CHECK_NO_TEXTUAL], stdout=subprocess.DEVNULL).returncode != 0:
+        print("Headless path imported textual")
+        failed = True
+
+    print(f"Target: {TARGET_MS} ms")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,1338 @@
+from datetime import datetime, timedelta, date
+import asyncio
+import itertools
+import os
+import signal
+import threading
+import time
+from collections import defaultdict
+from textual.app import App, ComposeResult
+from textual.containers import Container, Vertical, Horizontal
+from textual.widgets import Header, Footer, Button, Static, Input
+from textual.binding import Binding
+from textual.reactive import reactive
+from rich.text import Text
+from rich.style import Style
+from textual import events
+from textual._compositor import CompositorUpdate
+
+from .celldiff import CellDiff, RenderedUpdate
+from .checkpoint import TimerCheckpoint
+from .hooks import HookBus, create_bus
+from .scheduler import ScheduledTimer, TimerScheduler
+from .metrics import Registry, create_exporter
+from .sound import SoundBackend, create_backend, BREAK_OVER, WORK_OVER
+from .stats import SessionStats, sparkline
+from .storage import open_store
+from .tags import TagIndex
+from .timer import TimerCore, PomodoroSession
+from .watch import HistoryWatcher
+from .writer import HistoryWriter
+from .history import HISTORY_DIR, HISTORY_FILE, DayCountStore, SessionRecord, append_completion
+
+
+# Graph palette indexed by min(count, 13); built once instead of per cell
+_INTENSITY_STYLES = tuple(
+    Style(color=color)
+    for color in (
+        "#000000", # 0
+        "#002000", # 1
+        "#003500", # 2
+        "#004A00", # 3
+        "#006000", # 4
+        "#007F00", # 5
+        "#009F00", "#009F00", # 6-7
+        "#00BF00", "#00BF00", # 8-9
+        "#00DF00", "#00DF00", "#00DF00", # 10-12
+        "#00FF00", # 13+ max intensity
+    )
+)
+_EMPTY_STYLE = Style(color="grey19") # Even darker grey
+_SELECTED_STYLE = Style(reverse=True)
+
+
+class PomodoroGraph(Static):
+    """A widget to display Pomodoro history like a GitHub contribution graph.
+
+    Only ``days_to_display`` days are materialized at a time; scrolling back
+    through older history (left/right past the edge, or PageUp/PageDown)
+    just moves that window over the day store.
+    """
+
+    can_focus = True # Allow the widget to receive focus
+
+    # The grid's size never depends on the data, so a change only needs a repaint
+    pomodoro_data = reactive(lambda: defaultdict(int), layout=False)
+
+    def __init__(self, days=100, store: DayCountStore = None, tags: TagIndex = None, metrics: Registry = None, **kwargs): # Approx 3 months (13 weeks * 7 days)
+        super().__init__(**kwargs)
+        self.days_to_display = days
+        self.styles.padding = (0, 1)
+        self.styles.content_align = ("center", "middle")
+        self._store = store if store is not None else open_store()
+        self._tags = tags
+        self.tag = None # Only show sessions with this tag
+        self._scroll_weeks = 0 # How many weeks the window is moved back from today
+        self._initial_loading = False
+        self._reload_pending = False
+        # Cached static grid, rebuilt only when _grid_key changes
+        self._data_version = 0
+        self._grid_key = None
+        self._grid_text = None
+        self._grid_cells = {}
+        # Selection is painted over the cached grid in render(); no layout involved
+        self.selected_col = None # Track selected column index
+        self.selected_row = None # Track selected row index
+        # Key bursts repaint the graph at once; _flush updates the info line and counter once after the paint
+        self._flush_pending = False
+        self._info_dirty = False
+        self._counter_dirty = False
+        self._info_widget = None # Cached query_one results
+        self._counter_widget = None
+        self._counter_text = None
+        self._render_time = self._sync_time = self._records = None
+        if metrics is not None:
+            self._render_time = metrics.histogram("timy_graph_render_seconds", "Time spent in PomodoroGraph.render")
+            self._sync_time = metrics.histogram("timy_history_sync_seconds", "Time to fold new history lines into the day store")
+            self._records = metrics.counter("timy_history_records_parsed_total", "History records parsed")
+        # self.load_history() # DO NOT call from __init__
+
+    def on_mount(self) -> None:
+        """Called when the widget is mounted. Load initial data in the background."""
+        self._initial_loading = True
+        self.run_worker(self._initial_load(), exclusive=True, group="history")
+
+    async def _initial_load(self) -> None:
+        # Parsing a long log happens in a thread so the first frame paints right away
+        try:
+            messages = await asyncio.to_thread(self._sync_store)
+        finally:
+            self._initial_loading = False
+        self._after_sync(messages)
+        if self._reload_pending:
+            self._reload_pending = False
+            self.load_history()
+
+    def _counts(self) -> DayCountStore:
+        """The day counters currently shown: all sessions, or one tag's."""
+        if self.tag is not None:
+            return self._tags.view(self.tag)
+        return self._store
+
+    def set_tag(self, tag: str | None) -> None:
+        """Filter the graph to ``tag`` (None shows everything); no history is re-read."""
+        self.tag = tag
+        self._load_window()
+
+    def cycle_tag(self) -> str | None:
+        """Switch to the next known tag, wrapping around to "all"."""
+        choices = [None] + (self._tags.tags() if self._tags is not None else [])
+        position = choices.index(self.tag) if self.tag in choices else 0
+        self.set_tag(choices[(position + 1) % len(choices)])
+        return self.tag
+
+    def _visible_range(self) -> tuple[date, date]:
+        """First and last day of the currently displayed window."""
+        end_date = date.today() - timedelta(weeks=self._scroll_weeks)
+        return end_date - timedelta(days=self.days_to_display - 1), end_date
+
+    def load_history(self) -> None:
+        """Load Pomodoro completion data from the history file."""
+        if self._initial_loading:
+            # Don't block the UI on the store lock; pick it up once the first load is done
+            self._reload_pending = True
+            return
+        self._after_sync(self._sync_store())
+
+    def _sync_store(self) -> list:
+        """Fold new log lines into the day store; returns messages to log.
+
+        Safe to run in a thread: it touches the store but no widgets.
+        """
+        messages = []
+        start = time.perf_counter()
+        try:
+            # Only lines appended since the day store was last synced are parsed
+            added = self._store.update(
+                on_invalid=lambda line: messages.append(f"Skipping invalid date format in history: {line}")
+            )
+            if self._tags is not None:
+                self._tags.update()
+            if self._records is not None:
+                self._records.inc(added)
+                self._sync_time.observe(time.perf_counter() - start)
+        except OSError as e:
+            messages.append(f"Error reading history {self._store.path}: {e}")
+        except Exception as e:
+            messages.append(f"Unexpected error loading history: {e}")
+        return messages
+
+    def _after_sync(self, messages: list) -> None:
+        for message in messages:
+            self.log(message)
+
+        self._load_window()
+        for panel in self.app.query(StatsPanel):
+            panel.refresh_if_stale()
+        # If selection is out of bounds after reload, reset it
+        max_weeks = self.days_to_display // 7 + 1
+        if self.selected_col is not None and (self.selected_col >= max_weeks or self.selected_row >= 7):
+            self.selected_col = None
+            self.selected_row = None
+            self.tooltip = None
+
+    def _load_window(self) -> None:
+        """Read just the visible days from the day store."""
+        start_date, end_date = self._visible_range()
+        counts = defaultdict(int)
+        try:
+            counts = self._counts().window(start_date, end_date)
+        except Exception as e:
+            self.log(f"Unexpected error loading history: {e}")
+        self.pomodoro_data = counts # Repaints the graph
+
+        # Deferred so the DOM is ready, and so a burst of scrolls updates it once
+        self._counter_dirty = True
+        self._schedule_flush()
+
+    def _schedule_flush(self) -> None:
+        """Update the info line and counter once the graph has painted, however many keys arrive before it."""
+        if not self._flush_pending:
+            self._flush_pending = True
+            self.call_after_refresh(self._flush)
+
+    def _flush(self) -> None:
+        self._flush_pending = False
+        if self._info_dirty:
+            self._info_dirty = False
+            self._update_tooltip()
+        if self._counter_dirty:
+            self._counter_dirty = False
+            self._update_counter()
+
+    def _selection_changed(self) -> None:
+        self.refresh() # Textual merges the refreshes of a burst of keys into one paint
+        self._info_dirty = True
+        self._schedule_flush()
+
+    @property
+    def _info(self) -> Static:
+        if self._info_widget is None:
+            self._info_widget = self.app.query_one("#selected-info", Static)
+        return self._info_widget
+
+    @property
+    def _counter(self) -> Static:
+        if self._counter_widget is None:
+            self._counter_widget = self.app.query_one("#contrib-counter", Static)
+        return self._counter_widget
+
+    def _update_counter(self) -> None:
+        try:
+            total = self.get_total_contributions()
+            count_str = f"{total} pomo{'s' if total != 1 else ''}"
+            if self._scroll_weeks:
+                start_date, end_date = self._visible_range()
+                count_str += f" from {start_date.strftime('%b %d, %Y')} to {end_date.strftime('%b %d, %Y')}"
+            else:
+                count_str += f" in the last {self.days_to_display} days"
+            if self.tag is not None:
+                totals = self._tags.totals.get(self.tag)
+                if totals is not None:
+                    count_str = f"#{self.tag}: {count_str} ({totals.seconds / 3600:.1f}h total)"
+            if count_str != self._counter_text: # Syncs that change nothing don't repaint
+                self._counter_text = count_str
+                self._counter.update(count_str)
+        except Exception as e:
+            # Log error using self.log now available
+            self.log(f"Error updating contribution counter: {e}")
+
+    def scroll_weeks(self, weeks: int) -> bool:
+        """Move the window ``weeks`` back (positive) or forward (negative) in time.
+
+        The window never goes past today or before the earliest recorded week.
+        Returns whether it moved.
+        """
+        target = max(self._scroll_weeks + weeks, 0)
+        if weeks > 0:
+            first_day = self._counts().first_day()
+            if first_day is None:
+                return False
+            start_date, _ = self._visible_range()
+            # Stop once the earliest recorded day is in view
+            weeks_left = -(-max((start_date - first_day).days, 0) // 7)
+            target = min(target, self._scroll_weeks + weeks_left)
+        if target == self._scroll_weeks:
+            return False
+        self._scroll_weeks = target
+        self._load_window()
+        return True
+
+    def _get_intensity_style(self, count: int) -> Style:
+        """Return a style based on the Pomodoro count for a day."""
+        return _INTENSITY_STYLES[min(count, len(_INTENSITY_STYLES) - 1)]
+
+    def watch_pomodoro_data(self) -> None:
+        """Invalidate the cached grid whenever new data is loaded."""
+        self._data_version += 1
+
+    def _build_grid(self, start_date: date, end_date: date) -> None:
+        """Render the static grid (no selection) and remember each cell's offset."""
+        # Find the Sunday before or on the start_date to align columns
+        start_offset = (start_date.weekday() + 1) % 7 # weekday() is 0=Mon, 6=Sun. We want Sun=0.
+        render_start = start_date.toordinal() - start_offset
+        num_weeks = min((end_date.toordinal() - render_start) // 7 + 1, self.days_to_display // 7 + 1)
+
+        day_labels = ["S", "M", "T", "W", "T", "F", "S"]
+        if self._scroll_weeks:
+            title = f" Pomodoros (until {end_date.strftime('%b %d, %Y')})"
+        else:
+            title = f" Pomodoros ({self.days_to_display} days)"
+        title += f" #{self.tag}\n" if self.tag is not None else "\n"
+        rendered_grid = Text(title, style="bold")
+        cells = {}
+        for r, label in enumerate(day_labels):
+            rendered_grid.append(f"{label} ", style="dim")
+            for c in range(num_weeks):
+                ordinal = render_start + c * 7 + r
+                if start_date.toordinal() <= ordinal <= end_date.toordinal():
+                    count = self.pomodoro_data.get(date.fromordinal(ordinal), 0)
+                    cells[(r, c)] = (len(rendered_grid), count)
+                    if count == 0:
+                        # Use a different character for empty cells for clarity
+                        rendered_grid.append("·", style=_EMPTY_STYLE)
+                    else:
+                        rendered_grid.append("■", style=self._get_intensity_style(count))
+                else:
+                    # Keep cells outside the range blank
+                    rendered_grid.append(" ")
+                rendered_grid.append(" ") # Spacing between columns
+            rendered_grid.append("\n")
+
+        self._grid_text = rendered_grid
+        self._grid_cells = cells
+
+    def render(self) -> Text:
+        """Render the contribution grid, reusing the cached grid when possible."""
+        if self._render_time is None:
+            return self._render_grid()
+        with self._render_time.time():
+            return self._render_grid()
+
+    def _render_grid(self) -> Text:
+        start_date, end_date = self._visible_range()
+        key = (end_date, self._data_version, getattr(self.app, "theme", None), self.days_to_display, self.tag)
+        if key != self._grid_key:
+            self._build_grid(start_date, end_date)
+            self._grid_key = key
+
+        cell = self._grid_cells.get((self.selected_row, self.selected_col))
+        if cell is None or not self.has_focus:
+            return self._grid_text
+
+        # Only the selected cell differs from the cached grid
+        offset, count = cell
+        rendered_grid = self._grid_text.copy()
+        plain = rendered_grid.plain
+        rendered_grid.plain = plain[:offset] + "X" + plain[offset + 1:] # Use 'X' for selected cell
+        rendered_grid.stylize(self._get_intensity_style(count) + _SELECTED_STYLE, offset, offset + 1)
+        return rendered_grid
+
+    # --- Focus and Navigation --- #
+
+    def get_total_contributions(self) -> int:
+        """Calculate the total contributions within the displayed date range."""
+        start_date, end_date = self._visible_range()
+        # Answered from running totals over day ordinals, not by scanning the data
+        return self._counts().range_total(start_date, end_date)
+
+    def _get_date_from_selection(self) -> date | None:
+        """Calculate the date for the currently selected cell."""
+        if self.selected_col is None or self.selected_row is None:
+            return None
+
+        start_date, end_date = self._visible_range()
+        start_offset = (start_date.weekday() + 1) % 7
+        render_start_date = start_date - timedelta(days=start_offset)
+
+        try:
+            selected_date = render_start_date + timedelta(days=(self.selected_col * 7) + self.selected_row)
+            # Ensure the selected date is within the actual display range and not in the future
+            if start_date <= selected_date <= end_date:
+                return selected_date
+        except Exception:
+            return None # Calculation error
+        return None
+
+    def _update_tooltip(self) -> None:
+        """Update the tooltip based on the selected date."""
+        selected_date = self._get_date_from_selection()
+        count_str = ""
+        if selected_date:
+            count = self.pomodoro_data.get(selected_date, 0)
+            pomo_str = "pomo" if count == 1 else "pomos"
+            count_str = f"{count} {pomo_str} on {selected_date.strftime('%b %d, %Y')}"
+            # self.tooltip = Text(count_str) # Remove tooltip assignment
+        # else:
+            # count_str remains ""
+
+        # Update the static info widget; it is always one line high, so skip layout
+        try:
+            self._info.update(count_str, layout=False)
+        except Exception as e:
+             # Log error using self.log now available
+            self.log(f"Error updating selected info widget: {e}")
+
+    def on_focus(self, event: events.Focus) -> None:
+        """Initialize selection when focused."""
+        if self.selected_col is None or self.selected_row is None:
+            # Select the most recent visible day (usually today)
+            start_date, end_date = self._visible_range()
+            start_offset = (start_date.weekday() + 1) % 7
+            render_start_date = start_date - timedelta(days=start_offset)
+            days_diff = (end_date - render_start_date).days
+            self.selected_col = days_diff // 7
+            self.selected_row = days_diff % 7
+            self._selection_changed()
+        self.refresh()
+
+    def on_blur(self, event: events.Blur) -> None:
+        """Clear selection when focus is lost."""
+        # Optional: Decide if you want to keep selection or clear it
+        # self.selected_col = None
+        # self.selected_row = None
+        # self.tooltip = None
+        self.refresh()
+
+    def on_key(self, event: events.Key) -> None:
+        """Handle arrow key navigation."""
+        if not self.has_focus:
+            return
+
+        max_weeks = self.days_to_display // 7 + 1 # Approximate number of columns
+        moved = False
+
+        if self.selected_col is None or self.selected_row is None:
+            self.on_focus(None) # Initialize if no selection
+            if self.selected_col is None: return # Still no selection, bail
+
+        current_col, current_row = self.selected_col, self.selected_row
+
+        if event.key == "up":
+            if current_row > 0:
+                self.selected_row -= 1
+                moved = True
+        elif event.key == "down":
+            if current_row < 6:
+                self.selected_row += 1
+                moved = True
+        elif event.key == "left":
+            if current_col > 0:
+                self.selected_col -= 1
+                moved = True
+            else:
+                moved = self.scroll_weeks(1) # Past the left edge: scroll back in time
+        elif event.key == "right":
+            if current_col < max_weeks - 1:
+                self.selected_col += 1
+                moved = True
+            else:
+                moved = self.scroll_weeks(-1)
+        elif event.key == "pageup":
+            moved = self.scroll_weeks(max_weeks - 1)
+        elif event.key == "pagedown":
+            moved = self.scroll_weeks(-(max_weeks - 1))
+
+        if moved:
+            event.stop()
+            self._selection_changed()
+
+class StatsPanel(Static):
+    """Streaks, rolling averages and weekday/hour breakdowns."""
+
+    def __init__(self, stats: SessionStats, **kwargs):
+        super().__init__(**kwargs)
+        self._stats = stats
+        self._cache_key = None
+        self._cached = None
+
+    def refresh_if_stale(self) -> None:
+        """Repaint only if the statistics changed since the last render."""
+        if (date.today(), self._stats.version) != self._cache_key:
+            self.refresh()
+
+    def render(self) -> Text:
+        today = date.today()
+        key = (today, self._stats.version)
+        if key == self._cache_key:
+            return self._cached
+
+        stats = self._stats
+        streak = stats.current_streak(today)
+        text = Text()
+        text.append(f"Streak: {streak} day{'s' if streak != 1 else ''}", style="bold")
+        text.append(f" (longest {stats.longest_streak})\n", style="dim")
+        text.append(f"Avg/day: {stats.rolling_average(7, today):.1f} (7d) · {stats.rolling_average(30, today):.1f} (30d)\n")
+        text.append("Weekdays ", style="dim")
+        for label, bar in zip("MTWTFSS", sparkline(stats.weekday_totals)):
+            text.append(f"{label}{bar} ")
+        text.append("\nHours    ", style="dim")
+        text.append(sparkline(stats.hour_totals))
+        text.append(" 0-23h", style="dim")
+
+        self._cache_key, self._cached = key, text
+        return text
+
+
+def _ms(seconds: float | None) -> str:
+    return "   -   " if seconds is None else f"{seconds * 1000:6.2f}ms"
+
+
+class PerfOverlay(Static):
+    """Live view of the app's metrics; only refreshes while shown."""
+
+    def __init__(self, metrics: Registry, **kwargs):
+        super().__init__(**kwargs)
+        self._metrics = metrics
+        self._refresher = None
+        self._last_written = None # (when, bytes) at the previous render, for the rate
+        self._rate = 0.0
+
+    def toggle(self) -> None:
+        self.toggle_class("visible")
+        if self.has_class("visible"):
+            self._refresher = self.set_interval(0.5, self.refresh)
+            self.refresh()
+        elif self._refresher is not None:
+            self._refresher.stop()
+            self._refresher = None
+
+    def _histogram_row(self, text: Text, label: str, name: str) -> None:
+        h = self._metrics.histogram(name, "")
+        text.append(f"{label:<13}", style="bold")
+        text.append(f"last {_ms(h.last)}  p50 {_ms(h.percentile(0.5))}  p99 {_ms(h.percentile(0.99))}  max {_ms(h.max)}  n={h.count}\n")
+
+    def render(self) -> Text:
+        metrics = self._metrics
+        text = Text("Performance (P to hide)\n", style="bold underline")
+        self._histogram_row(text, "graph render", "timy_graph_render_seconds")
+        self._histogram_row(text, "tick drift", "timy_timer_tick_drift_seconds")
+        self._histogram_row(text, "history sync", "timy_history_sync_seconds")
+        parsed = metrics.counter("timy_history_records_parsed_total", "").value
+        written = metrics.counter("timy_terminal_bytes_total", "").value
+        now = time.monotonic()
+        if self._last_written is not None:
+            self._rate = (written - self._last_written[1]) / max(now - self._last_written[0], 1e-9)
+        self._last_written = (now, written)
+        text.append(f"{'terminal':<13}", style="bold")
+        text.append(f"{self._rate:7.0f} B/s  {written} bytes written\n")
+        text.append(f"{'queues':<13}", style="bold")
+        text.append(f"writer {metrics.gauge('timy_history_writer_queue', '').value}  "
+                    f"sound {metrics.gauge('timy_sound_queue', '').value}  "
+                    f"hooks {metrics.gauge('timy_hook_queue', '').value}  "
+                    f"records parsed {parsed}")
+        return text
+
+
+def _format_left(seconds: int, coarse: bool = False) -> str:
+    """``MM:SS``, or whole minutes while more than one is left in coarse mode."""
+    minutes, seconds = divmod(seconds, 60)
+    if coarse and (minutes, seconds) > (1, 0):
+        return f"{minutes + (seconds > 0)} min"
+    return f"{minutes:02d}:{seconds:02d}"
+
+
+class TimerList(Static):
+    """Compact list of the extra timers (``timy --timer``, or N), one line each.
+
+    One TimerScheduler runs all of them. The list repaints at most once a
+    second while any of them runs, and only the rows in view are formatted,
+    so a hundred timers cost about what one does.
+    """
+
+    can_focus = True
+    ROWS = 6 # Timers shown at once; the view follows the selection
+
+    BINDINGS = [
+        Binding("up", "select(-1)", "Previous timer", show=False),
+        Binding("down", "select(1)", "Next timer", show=False),
+        Binding("space", "toggle", "Start/Stop timer"),
+        Binding("r", "reset", "Reset timer"),
+        Binding("delete", "remove", "Remove timer"),
+    ]
+
+    def __init__(self, scheduler: TimerScheduler, hooks: HookBus = None, coarse: bool = False, **kwargs):
+        super().__init__(**kwargs)
+        self._scheduler = scheduler
+        self._hooks = hooks
+        self._coarse = coarse
+        self.selected = 0
+        self._ticker = None # Once-a-second repaint while a timer runs
+        self._shown = None
+
+    def on_mount(self) -> None:
+        self.sync()
+
+    def on_focus(self, event: events.Focus) -> None:
+        self.sync()
+
+    def on_blur(self, event: events.Blur) -> None:
+        self.sync()
+
+    def sync(self) -> None:
+        """Repaint if anything on screen changed, and tick only while a timer runs."""
+        self.display = len(self._scheduler) > 0
+        text = self._render_rows()
+        if text != self._shown:
+            self._shown = text
+            self.update(text)
+        running = any(timer.is_running for timer in self._scheduler)
+        if running and self._ticker is None:
+            self._ticker = self.set_interval(1, self.sync)
+        elif not running and self._ticker is not None:
+            self._ticker.stop()
+            self._ticker = None
+
+    def _render_rows(self) -> Text:
+        total = len(self._scheduler)
+        self.selected = min(self.selected, max(total - 1, 0))
+        top = max(min(self.selected - self.ROWS // 2, total - self.ROWS), 0)
+        text = Text()
+        for i, timer in enumerate(itertools.islice(self._scheduler, top, top + self.ROWS), top):
+            session = timer.session
+            marker = "›" if i == self.selected and self.has_focus else " "
+            state = "▶" if timer.is_running else "‖"
+            phase = "Break" if session.is_break else "Work"
+            left = _format_left(session.timer.display_seconds(), self._coarse)
+            line = f"{marker}{state} {timer.name[:16]:<16} {phase:<5} {left:>6}  {timer.completed} done"
+            text.append(line + "\n", style="bold" if timer.is_running else "")
+        if total > self.ROWS:
+            text.append(f"  {total - self.ROWS} more (↑/↓)", style="dim")
+        else:
+            text.rstrip()
+        return text
+
+    @property
+    def selected_timer(self) -> ScheduledTimer | None:
+        return next(itertools.islice(self._scheduler, self.selected, None), None)
+
+    def action_select(self, step: int) -> None:
+        if len(self._scheduler):
+            self.selected = (self.selected + step) % len(self._scheduler)
+            self.sync()
+
+    def action_toggle(self) -> None:
+        timer = self.selected_timer
+        if timer is None:
+            return
+        starting = not timer.is_running and timer.session.at_start()
+        self._scheduler.toggle(timer.name)
+        if starting and self._hooks is not None:
+            self._hooks.emit("session-start", timer=timer.name, **timer.session.hook_fields())
+        self.sync()
+
+    def action_reset(self) -> None:
+        timer = self.selected_timer
+        if timer is not None:
+            self._scheduler.reset(timer.name)
+            self.sync()
+
+    def action_remove(self) -> None:
+        timer = self.selected_timer
+        if timer is not None:
+            self._scheduler.remove(timer.name)
+            self.sync()
+            if not len(self._scheduler):
+                self.app.pomodoro_graph.focus()
+
+
+class TimerDisplay(Static):
+    """A widget to display the current timer value."""
+    def __init__(self, store: DayCountStore = None, sound: SoundBackend = None, writer: HistoryWriter = None,
+                 remote: bool = False, metrics: Registry = None, checkpoint: TimerCheckpoint = None,
+                 hooks: HookBus = None, coarse: bool = False):
+        super().__init__()
+        self._store = store
+        self._writer = writer
+        self._sound = sound
+        self._hooks = hooks # Told about session boundaries; runs them on its own threads
+        self._coarse = coarse # Whole minutes until the last one (low-bandwidth mode)
+        self._shown = None # Text on screen, so an unchanged time isn't repainted
+        self._session = PomodoroSession() # 30/5 minutes by default
+        self._timer = self._session.timer
+        self._wakeup = None # Pending one-shot Textual timer while running
+        self._remote = remote # Attached to a daemon, which owns phase changes
+        self._checkpoint = checkpoint
+        self._checkpoint_pending = False
+        self._missed = None
+        self._drift = self._wakeups = None
+        if metrics is not None:
+            self._drift = metrics.histogram("timy_timer_tick_drift_seconds", "How late TimerDisplay.tick ran after its scheduled wakeup")
+            self._wakeups = metrics.counter("timy_timer_wakeups_total", "TimerDisplay.tick wakeups")
+        if checkpoint is not None:
+            # Before the first paint: pick up where the last run stopped (or crashed)
+            self._missed = checkpoint.restore(self._session)
+            if self._missed is not None:
+                self._log_record(self._missed) # Finished while timy wasn't running
+            checkpoint.save(self._session)
+
+    def _play_notification_sound(self, is_break: bool) -> None:
+        """Queue the appropriate notification sound on the sound backend."""
+        if self._sound is not None:
+            self._sound.play(BREAK_OVER if is_break else WORK_OVER)
+
+    @property
+    def timer(self) -> TimerCore:
+        """The deadline-based timer core (exposes drift and wakeup stats)."""
+        return self._timer
+
+    @property
+    def time_left(self) -> timedelta:
+        return self._timer.time_left
+
+    @time_left.setter
+    def time_left(self, value: timedelta) -> None:
+        self._timer.time_left = value
+        self._schedule_wakeup()
+        self._state_changed()
+
+    @property
+    def is_running(self) -> bool:
+        return self._timer.is_running
+
+    @is_running.setter
+    def is_running(self, value: bool) -> None:
+        if value:
+            starting = not self._timer.is_running and self._session.at_start()
+            self._timer.start()
+            if starting:
+                self._emit("session-start")
+        else:
+            self._timer.stop()
+        self._schedule_wakeup()
+        self._state_changed()
+        self.update_timer() # The running/paused marker
+
+    def _schedule_wakeup(self) -> None:
+        """Wake up at the next visible second boundary; never while stopped."""
+        if self._wakeup is not None:
+            self._wakeup.stop()
+            self._wakeup = None
+        step = 60 if self._coarse and self._timer.remaining() > 60 else 1
+        delay = self._timer.next_wakeup(step)
+        if delay is not None and self.is_mounted:
+            self._wakeup = self.set_timer(delay, self.tick)
+
+    @property
+    def is_break(self) -> bool:
+        return self._session.is_break
+
+    @is_break.setter
+    def is_break(self, value: bool) -> None:
+        self._session.is_break = value
+        self._state_changed()
+
+    @property
+    def work_duration(self) -> int:
+        return self._session.work_duration
+
+    @work_duration.setter
+    def work_duration(self, value: int) -> None:
+        self._session.work_duration = value
+        self._state_changed()
+
+    @property
+    def break_duration(self) -> int:
+        return self._session.break_duration
+
+    @break_duration.setter
+    def break_duration(self, value: int) -> None:
+        self._session.break_duration = value
+        self._state_changed()
+
+    def _state_changed(self) -> None:
+        """Checkpoint the timer once the current event is handled.
+
+        Actions set several fields in a row (reset: stop, phase, time left);
+        they are written together.
+        """
+        if self._checkpoint is None or self._checkpoint_pending:
+            return
+        if self.is_mounted:
+            self._checkpoint_pending = True
+            self.call_later(self.save_checkpoint)
+        else:
+            self.save_checkpoint()
+
+    def save_checkpoint(self) -> None:
+        self._checkpoint_pending = False
+        if self._checkpoint is not None:
+            self._checkpoint.save(self._session)
+
+    def on_mount(self) -> None:
+        self.update_timer()
+        self.call_after_refresh(self._schedule_wakeup) # A restored session may be running
+        if self._missed is not None:
+            self.notify(f"Logged the session that finished at {self._missed.timestamp:%H:%M} while timy was closed", timeout=5)
+
+    def update_timer(self) -> None:
+        state = "▶" if self.is_running else "‖" # As in the timer list
+        status = "Break" if self.is_break else "Work"
+        text = f"{state} {status} Time: {_format_left(self._timer.display_seconds(), self._coarse)}"
+        if text != self._shown:
+            self._shown = text
+            self.update(text)
+
+    def tick(self) -> None:
+        self._wakeup = None
+        self._timer.record_wakeup()
+        if self._drift is not None:
+            self._drift.observe(self._timer.last_drift)
+            self._wakeups.inc()
+        if self.is_running:
+            self.update_timer()
+            if self._timer.remaining() <= 0:
+                if self._remote:
+                    self._timer.stop() # The daemon's "done" message switches the phase
+                else:
+                    self.timer_complete()
+            else:
+                self._schedule_wakeup()
+
+    @property
+    def tag(self) -> str | None:
+        return self._session.tag
+
+    @tag.setter
+    def tag(self, value: str | None) -> None:
+        self._session.tag = value
+        self._state_changed()
+
+    def _log_completion(self, interrupted: bool = False) -> None:
+        """Logs the completion (or, for tagged sessions, the interruption) of a work session."""
+        self._log_record(self._session.record(datetime.now(), interrupted))
+
+    def _log_record(self, record: SessionRecord) -> None:
+        try:
+            if self._writer is not None:
+                # Written off the event loop; the writer refreshes the graph once it lands
+                self._writer.submit(record)
+            else:
+                # Appends the line and bumps today's counter in the day store
+                append_completion(record, self._store)
+        except OSError as e:
+            path = self._store.path if self._store is not None else HISTORY_FILE
+            print(f"Error creating directory or writing to history {path}: {e}")
+            self.app.log(f"Error creating directory or writing to history {path}: {e}")
+        except Exception as e:
+            print(f"Unexpected error logging completion: {e}")
+            self.app.log(f"Unexpected error logging completion: {e}")
+
+    def apply_state(self, state: dict) -> None:
+        """Mirror a timer state pushed by the daemon."""
+        self._session.apply_state(state)
+        self._schedule_wakeup()
+        self.update_timer()
+
+    def log_interruption(self) -> None:
+        """Record a tagged work session that is being abandoned part way."""
+        if self.tag is not None and self._session.interrupted_seconds() > 0:
+            self._log_completion(interrupted=True)
+
+    def timer_complete(self) -> None:
+        was_break = self._session.complete()
+        self._schedule_wakeup()
+        self._state_changed()
+        if not was_break:
+            # Work session just finished, log it!
+            self._log_completion()
+        self._announce(was_break)
+        self._emit("break-end" if was_break else "session-end")
+
+        # If a work session just completed (and was written synchronously), update the
+        # graph once the new timer is on screen
+        if not was_break and self._writer is None:
+            self.call_after_refresh(self._refresh_graph)
+
+    def _refresh_graph(self) -> None:
+        try:
+            self.app.query_one(PomodoroGraph).load_history()
+        except Exception as e:
+            self.app.log(f"Error updating graph: {e}")
+
+    def _emit(self, event: str) -> None:
+        if self._hooks is not None:
+            self._hooks.emit(event, **self._session.hook_fields())
+
+    def remote_complete(self, was_break: bool, state: dict) -> None:
+        """The daemon finished a session (and already logged it)."""
+        self.apply_state(state)
+        self._announce(was_break)
+
+    def _announce(self, was_break: bool) -> None:
+        self.notify("Back to work! 💪" if was_break else "Break time! 🎉", timeout=3)
+        self.update_timer()
+        # Play the appropriate sound
+        self._play_notification_sound(was_break)
+
+class PomodoroApp(App):
+    """A Pomodoro timer application."""
+    CSS = """
+    Screen {
+        align: center middle;
+        layers: base overlay;
+    }
+
+    #app-wrapper {
+        width: auto;
+        height: auto;
+        max-height: 100;
+        align: center middle;
+        padding: 0 4; /* Add some padding to the overall wrapper */
+    }
+
+    #main-container {
+        width: 60;
+        height: 24;
+        border: heavy green;
+        padding: 2 4;
+        margin-right: 5; /* Increase space between containers */
+    }
+
+    #graph-container {
+        width: 60; /* Slightly wider graph container */
+        height: auto;
+        margin-top: 3; /* Align with main container */
+        padding: 0 1; /* Add some padding around the graph */
+    }
+
+    PomodoroGraph {
+        border: heavy green;
+        height: 11;
+    }
+
+    #contrib-counter {
+        margin-top: 1;
+        width: 100%;
+        text-align: center;
+        color: $text-muted;
+    }
+
+    #timer-display {
+        height: 3;
+        content-align: center middle;
+        text-style: bold;
+        color: $accent;
+        margin: 1 0;
+        background: $boost;
+    }
+
+    #controls {
+        height: auto;
+        align: center middle;
+        margin: 1 0;
+    }
+
+    Button {
+        margin: 1;
+        min-width: 16;
+    }
+
+    #settings {
+        height: auto;
+        align: center middle;
+        margin: 1 0;
+        layout: horizontal;
+    }
+
+    .setting-group {
+        width: auto;
+        height: 5;
+        content-align: center middle;
+        padding: 0 1;
+    }
+
+    Input {
+        width: 10;
+        margin: 0 1;
+        background: $boost;
+    }
+
+    Label {
+        padding: 0 1;
+        color: $text;
+    }
+
+    #selected-info {
+        margin-top: 1;
+        width: 100%;
+        height: 1;
+        text-align: center;
+    }
+
+    StatsPanel {
+        margin-top: 1;
+        width: 100%;
+        height: 4;
+        content-align: center middle;
+    }
+
+    TimerList {
+        margin-top: 1;
+        width: 100%;
+        height: auto;
+        border: round green;
+        padding: 0 1;
+    }
+
+    TimerList:focus {
+        border: round $accent;
+    }
+
+    PerfOverlay {
+        layer: overlay;
+        dock: bottom;
+        width: 100%;
+        height: auto;
+        padding: 0 1;
+        margin-bottom: 1;
+        background: $panel;
+        display: none;
+    }
+
+    PerfOverlay.visible {
+        display: block;
+    }
+    """
+
+    BINDINGS = [
+        Binding("space", "toggle_timer", "Start/Stop"),
+        Binding("r", "reset_timer", "Reset"),
+        Binding("t", "cycle_tag", "Tag filter"),
+        Binding("n", "new_timer", "New timer"),
+        Binding("p", "toggle_perf", "Perf"),
+        Binding("q", "quit", "Quit"),
+    ]
+
+    def __init__(self, client=None, tag: str = None, low_bandwidth: bool = None, timers: list = None):
+        super().__init__()
+        # With a DaemonClient the daemon owns the timer and history; we only mirror it
+        self.client = client
+        self.tag = tag
+        if low_bandwidth is None:
+            low_bandwidth = os.environ.get("TIMY_LOW_BANDWIDTH", "") not in ("", "0")
+        # For slow links (SSH, mosh): only changed cells are sent, the timer shows whole minutes
+        self.cell_diff = CellDiff() if low_bandwidth else None
+        # The history backend is picked by TIMY_HISTORY (see timy.storage)
+        self.day_counts = client.days if client is not None else open_store()
+        self.stats = SessionStats()
+        self.metrics = Registry()
+        try:
+            # Seeded from the day store; afterwards it follows new records
+            self.stats.attach(self.day_counts)
+        except OSError as e:
+            self.log(f"Error reading history statistics: {e}")
+        self.sound = create_backend(on_error=self.log)
+        self.history_writer = None
+        self.history_watcher = None
+        self.hooks = None
+        self.tag_index = None
+        self.checkpoint = None
+        if client is None:
+            # Per-tag counts for the graph filter, kept current alongside the day store
+            self.tag_index = self.day_counts.tag_index()
+            self.history_writer = HistoryWriter(
+                self.day_counts,
+                durability=os.environ.get("TIMY_DURABILITY", "none"),
+                on_written=lambda timestamps: self._on_history_changed(),
+                on_error=self.log,
+            )
+            # Notices completions appended by other timy instances
+            if self.day_counts.watch_path is not None:
+                self.history_watcher = HistoryWatcher(self.day_counts.watch_path, self._on_history_changed)
+            # User hooks on session boundaries (TIMY_HOOKS); with a daemon, it runs them
+            self.hooks = create_bus(on_error=self._hook_error)
+            # Timer state survives crashes and restarts (unless another instance owns it)
+            self.checkpoint = TimerCheckpoint(on_error=self.log)
+            if not self.checkpoint.acquire():
+                self.checkpoint = None
+            else:
+                self.metrics.gauge("timy_checkpoint_writes", "Timer state checkpoint writes", lambda: self.checkpoint.writes)
+        self.timer_display = TimerDisplay(self.day_counts, self.sound, self.history_writer,
+                                          remote=client is not None, metrics=self.metrics,
+                                          checkpoint=self.checkpoint, hooks=self.hooks,
+                                          coarse=low_bandwidth)
+        if tag is not None: # Otherwise keep the tag of a session restored from the checkpoint
+            self.timer_display.tag = tag
+        # Any number of extra timers, all run from one deadline queue
+        self.timer_scheduler = TimerScheduler(self.set_timer, on_done=self._extra_timer_done)
+        for name, work, brk in timers or ():
+            try:
+                self.timer_scheduler.add(name, work, brk)
+            except ValueError as e:
+                self.log(f"Skipping timer: {e}")
+        self.timer_list = TimerList(self.timer_scheduler, self.hooks, coarse=low_bandwidth, id="timer-list")
+        self.pomodoro_graph = PomodoroGraph(store=self.day_counts, tags=self.tag_index, metrics=self.metrics)
+        self.contribution_counter = Static(id="contrib-counter")
+        self.selected_day_info = Static(id="selected-info") # Add selected info widget
+        self.stats_panel = StatsPanel(self.stats, id="stats-panel")
+        self.metrics.gauge("timy_history_writer_queue", "Completions waiting to be written",
+                           lambda: self.history_writer.pending if self.history_writer is not None else 0)
+        self.metrics.gauge("timy_sound_queue", "Notification sounds waiting to play", lambda: self.sound.pending)
+        self.metrics.gauge("timy_hook_queue", "Hook runs waiting for a worker",
+                           lambda: self.hooks.pending if self.hooks is not None else 0)
+        self.metrics.gauge("timy_hooks_dropped", "Hook runs skipped because the queue was full or the hook busy",
+                           lambda: self.hooks.dropped if self.hooks is not None else 0)
+        self.metrics.gauge("timy_hook_failures", "Hook runs that failed",
+                           lambda: self.hooks.failures if self.hooks is not None else 0)
+        self.metrics.gauge("timy_hook_timeouts", "Hook runs that overran their timeout",
+                           lambda: self.hooks.timeouts if self.hooks is not None else 0)
+        self.terminal_bytes = self.metrics.counter("timy_terminal_bytes_total", "Bytes of screen updates written to the terminal")
+        self.perf_overlay = PerfOverlay(self.metrics)
+        # Periodic Prometheus export when TIMY_METRICS is set
+        self.metrics_exporter = create_exporter(self.metrics, on_error=self.log)
+
+    def compose(self) -> ComposeResult:
+        """Create child widgets for the app."""
+        yield Header()
+        yield Horizontal( # Use Horizontal directly for side-by-side layout
+            # Left side: Timer controls
+            Container(
+                Vertical(
+                    self.timer_display,
+                    Container(
+                        Button("Start/Stop (Space)", id="start-stop"),
+                        Button("Reset (R)", id="reset"),
+                        id="controls",
+                    ),
+                    Container(
+                        Container(
+                            Static("Work:", classes="label"),
+                            Input(placeholder=str(self.timer_display.work_duration), id="work-input"),
+                            classes="setting-group"
+                        ),
+                        Container(
+                            Static("Break:", classes="label"),
+                            Input(placeholder=str(self.timer_display.break_duration), id="break-input"),
+                            classes="setting-group"
+                        ),
+                        Button("Update Settings", id="update-settings"),
+                        id="settings",
+                    ),
+                ),
+                id="main-container",
+            ),
+            # Right Column: Graph and Counter
+            Container(
+                Vertical( # Use Vertical to stack graph and counter
+                    self.pomodoro_graph,
+                    self.contribution_counter,
+                    self.selected_day_info,
+                    self.stats_panel,
+                    self.timer_list,
+                ),
+                id="graph-container" # ID for styling the right column
+            ),
+            id="app-wrapper" # ID for the horizontal wrapper
+        )
+        yield self.perf_overlay
+        yield Footer()
+
+    def _display(self, screen, renderable) -> None:
+        # Rendered here instead of in Textual so the output can be counted, and
+        # cut down to the changed cells in low-bandwidth mode. This relies on
+        # Textual internals, so pyproject.toml pins its minor version.
+        driver = self._driver
+        # The checks App._display makes before writing, so the cell diff never
+        # records output the terminal didn't get. Headless (the benchmarks)
+        # writes nothing but is counted as if it did.
+        if renderable is None or self._batch_count or not self._running or self._closed or driver is None:
+            super()._display(screen, renderable)
+            return
+        if not isinstance(renderable, CompositorUpdate):
+            if self.cell_diff is not None:
+                self.cell_diff.reset() # A full repaint the diff doesn't follow
+            super()._display(screen, renderable)
+            return
+        # Inline output is placed relative to the cursor, which the diff doesn't track
+        if self.cell_diff is not None and not driver.is_inline:
+            data = self.cell_diff.render(renderable, tuple(self.size), self.console)
+            if not data:
+                self.post_display_hook()
+                return # Nothing on screen changed
+        else:
+            data = renderable.render_segments(self.console)
+        self.terminal_bytes.inc(len(data.encode()))
+        super()._display(screen, RenderedUpdate(data))
+
+    def on_mount(self) -> None:
+        """Set up the timer and ensure history directory exists."""
+        # Ensure the history directory exists on startup
+        try:
+            HISTORY_DIR.mkdir(parents=True, exist_ok=True)
+        except OSError as e:
+            self.log(f"Error creating history directory {HISTORY_DIR}: {e}")
+
+        if self.client is not None:
+            self.client.on_timer = self.timer_display.apply_state
+            self.client.on_done = self.timer_display.remote_complete
+            self.client.on_days = self._on_history_changed
+            self.client.on_disconnect = lambda: self.exit(message="timy daemon went away")
+            self.run_worker(self._connect_daemon(), exclusive=True, group="daemon")
+        else:
+            self.history_writer.start()
+            if self.history_watcher is not None:
+                self.history_watcher.start()
+        try:
+            # Flush buffered history on SIGTERM too, not only on quit
+            asyncio.get_running_loop().add_signal_handler(
+                signal.SIGTERM, lambda: asyncio.ensure_future(self.action_quit())
+            )
+        except (NotImplementedError, RuntimeError):
+            pass
+
+        # Prepare the sound clips and player now rather than on the first completion
+        self.sound.start()
+        if self.metrics_exporter is not None:
+            self.metrics_exporter.start()
+
+        # No interval here: TimerDisplay schedules its own wakeups while running
+
+    async def _connect_daemon(self) -> None:
+        try:
+            await self.client.connect()
+        except OSError as e:
+            self.exit(message=f"Could not connect to timy daemon at {self.client.socket_path}: {e}")
+            return
+        if self.tag is not None:
+            self.client.send("settings", tag=self.tag)
+
+    def _hook_error(self, message: str) -> None:
+        """Warn about a broken hook; runs reported by a worker thread are handed to the UI loop."""
+        self.log(message)
+        if threading.current_thread() is threading.main_thread():
+            self.call_later(self.notify, message, severity="warning", timeout=5)
+            return
+        try:
+            self.call_from_thread(self.notify, message, severity="warning", timeout=5)
+        except RuntimeError:
+            pass # The app is shutting down
+
+    def on_unmount(self) -> None:
+        # Anything still queued is written synchronously here
+        if self.client is not None:
+            self.client.close()
+        else:
+            self.history_writer.close()
+            if self.history_watcher is not None:
+                self.history_watcher.stop()
+        if self.checkpoint is not None:
+            self.timer_display.save_checkpoint()
+            self.checkpoint.close()
+        self.sound.close()
+        if self.hooks is not None:
+            self.hooks.close()
+        if self.metrics_exporter is not None:
+            self.metrics_exporter.stop()
+
+    def _on_history_changed(self) -> None:
+        """Refresh the graph once new records were appended (by us or another instance)."""
+        try:
+            self.pomodoro_graph.load_history()
+        except Exception as e:
+            self.log(f"Error updating graph: {e}")
+
+    async def action_quit(self) -> None:
+        """Flush buffered history, then quit."""
+        if self.history_writer is not None:
+            await self.history_writer.flush()
+        self.exit()
+
+    def on_button_pressed(self, event: Button.Pressed) -> None:
+        """Handle button presses."""
+        if event.button.id == "start-stop":
+            self.action_toggle_timer()
+        elif event.button.id == "reset":
+            self.action_reset_timer()
+        elif event.button.id == "update-settings":
+            try:
+                work_input = self.query_one("#work-input")
+                break_input = self.query_one("#break-input")
+                work = int(work_input.value) if work_input.value else None
+                brk = int(break_input.value) if break_input.value else None
+            except ValueError:
+                self.notify("Please enter valid numbers! ❌", timeout=2)
+                return
+
+            if self.client is not None:
+                self.client.send("settings", work=work, **{"break": brk})
+            else:
+                if work:
+                    self.timer_display.work_duration = work
+                if brk:
+                    self.timer_display.break_duration = brk
+
+                if not self.timer_display.is_running:
+                    self.timer_display.time_left = timedelta(minutes=self.timer_display.work_duration)
+                    self.timer_display.update_timer()
+
+            self.notify("Settings updated! ⚙️", timeout=2)
+
+    def action_toggle_timer(self) -> None:
+        """Toggle the timer on/off."""
+        if self.client is not None:
+            self.client.send("toggle")
+            return
+        self.timer_display.is_running = not self.timer_display.is_running
+
+    def action_toggle_perf(self) -> None:
+        """Show or hide the performance overlay."""
+        self.perf_overlay.toggle()
+
+    def action_cycle_tag(self) -> None:
+        """Show the next tag's sessions in the graph."""
+        if self.tag_index is None:
+            self.notify("Tag filtering needs the local history", timeout=2)
+            return
+        tag = self.pomodoro_graph.cycle_tag()
+        self.notify(f"Showing #{tag}" if tag is not None else "Showing all sessions", timeout=2)
+
+    def action_new_timer(self) -> None:
+        """Add an extra timer with the current durations and focus the timer list."""
+        if self.client is not None:
+            self.notify("Extra timers need the local history", timeout=2)
+            return
+        number = len(self.timer_scheduler) + 1
+        while f"timer {number}" in self.timer_scheduler:
+            number += 1
+        self.timer_scheduler.add(f"timer {number}", self.timer_display.work_duration,
+                                 self.timer_display.break_duration, tag=self.tag)
+        self.timer_list.selected = len(self.timer_scheduler) - 1
+        self.timer_list.sync()
+        self.timer_list.focus()
+
+    def _extra_timer_done(self, timer: ScheduledTimer, was_break: bool) -> None:
+        """An extra timer switched phase: log it, tell the user and run the hooks."""
+        if not was_break and self.history_writer is not None:
+            self.history_writer.submit(timer.session.record(datetime.now()))
+        self.notify(f"{timer.name}: {'Back to work! 💪' if was_break else 'Break time! 🎉'}", timeout=3)
+        self.sound.play(BREAK_OVER if was_break else WORK_OVER)
+        if self.hooks is not None:
+            self.hooks.emit("break-end" if was_break else "session-end", timer=timer.name, **timer.session.hook_fields())
+        self.timer_list.sync()
+
+    def action_reset_timer(self) -> None:
+        """Reset the timer to the work duration."""
+        if self.client is not None:
+            self.client.send("reset")
+            return
+        self.timer_display.log_interruption()
+        self.timer_display.is_running = False
+        self.timer_display.is_break = False
+        self.timer_display.time_left = timedelta(minutes=self.timer_display.work_duration)
+        self.timer_display.update_timer()
+
+def run(client=None, tag: str = None, low_bandwidth: bool = None, timers: list = None) -> None:
+    """Launch the Textual UI, optionally attached to a running daemon."""
+    app = PomodoroApp(client, tag, low_bandwidth, timers)
+    app.run()
@@ -0,0 +1,199 @@
+"""Bulk counting of history lines into per-day and per-hour totals.
+
+The day store only needs to know how many Pomodoros fall on each day and in
+each hour of the day, so a block of bare timestamps is never turned into
+``datetime`` objects. Lines in the fixed-width form timy writes
+(``YYYY-MM-DDTHH:MM:SS[.ffffff]``) are grouped by width and validated and
+bucketed column by column with strided slices, or, when NumPy is installed
+and the group is large, with ``np.datetime64`` and ``np.bincount``. Every
+other line (tagged or interrupted sessions, timezone offsets, malformed
+lines) goes through ``parse_records`` exactly as before, so invalid lines are
+still skipped and reported.
+"""
+
+from bisect import bisect_right
+from collections import Counter
+from datetime import date
+from functools import lru_cache
+from itertools import compress
+import operator
+import re
+import sys
+
+# Bare timestamp widths: without and with microseconds
+WIDTHS = (26, 19)
+# Below this many lines NumPy isn't worth importing (it costs more than the
+# cold-start budget of the headless commands)
+NUMPY_MIN_LINES = 10_000
+
+_DIGITS = bytes.maketrans(b"0123456789", b"0" * 10)
+_DIGIT_VALUES = bytes.maketrans(b"0123456789", bytes(range(10)))
+_WIDTH_SET = frozenset(WIDTHS)
+_TEMPLATES = {width: b"0000-00-00T00:00:00.000000"[:width] + b"\n" for width in WIDTHS}
+# Columns of YYYYMMDD within a line
+_DATE_COLUMNS = (0, 1, 2, 3, 5, 6, 8, 9)
+# What _count_fixed accepts, line by line (compiled when first needed)
+_BARE = rb"\d{4}-\d\d-\d\dT([01]\d|2[0-3]):[0-5]\d:[0-5]\d(\.\d{6})?"
+_numpy = False # Not tried yet
+
+
+def _load_numpy():
+    global _numpy
+    if _numpy is False:
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+        _numpy = numpy
+    return _numpy
+
+
+def count_lines(data: bytes, on_invalid=None, use_numpy: bool = True) -> tuple:
+    """Count the completed sessions in ``data`` (complete lines).
+
+    Returns ``({ordinal: count}, hours)`` where ``hours`` holds 24 counters.
+    Lines are skipped and reported to ``on_invalid`` exactly as by
+    ``parse_records``.
+    """
+    from .history import parse_records # history imports this module
+
+    days, hours = {}, [0] * 24
+    lines = data.split(b"\n")
+    if lines[-1] == b"":
+        lines.pop()
+    else:
+        data += b"\n"
+    width = len(lines[0]) if lines else 0
+    if width in WIDTHS and len(data) == len(lines) * (width + 1) and data[width::width + 1].count(b"\n") == len(lines):
+        # The usual case: a whole block of same-width timestamps
+        groups, rest = [(width, data, len(lines))], []
+    else:
+        lengths = list(map(len, lines))
+        groups = []
+        for width in WIDTHS:
+            group = list(compress(lines, map(width.__eq__, lengths)))
+            if group:
+                groups.append((width, b"\n".join(group) + b"\n", len(group)))
+        rest = list(compress(lines, map(operator.not_, map(_WIDTH_SET.__contains__, lengths))))
+
+    for width, group, count in groups:
+        counted = _count_fixed(group, width + 1, count, use_numpy)
+        if counted is None:
+            # Some line only looks like a timestamp (e.g. month 13): check
+            # them one by one, and leave the bad ones to the slow path
+            group_lines = group.split(b"\n")[:-1]
+            bare = re.compile(_BARE)
+            valid = [bare.fullmatch(line) is not None and _valid_date(line[:10]) for line in group_lines]
+            rest.extend(compress(group_lines, map(operator.not_, valid)))
+            good = list(compress(group_lines, valid))
+            if not good:
+                continue
+            counted = _count_fixed(b"\n".join(good) + b"\n", width + 1, len(good), use_numpy)
+        for ordinal, n in counted[0].items():
+            days[ordinal] = days.get(ordinal, 0) + n
+        hours = [a + b for a, b in zip(hours, counted[1])]
+
+    if rest:
+        for timestamp in parse_records(b"\n".join(rest), on_invalid):
+            ordinal = timestamp.toordinal()
+            days[ordinal] = days.get(ordinal, 0) + 1
+            hours[timestamp.hour] += 1
+    return days, hours
+
+
+@lru_cache(maxsize=4096)
+def _valid_date(text: bytes) -> bool:
+    try:
+        date(int(text[:4]), int(text[5:7]), int(text[8:10]))
+    except ValueError:
+        return False
+    return True
+
+
+def _count_fixed(data: bytes, stride: int, count: int, use_numpy: bool):
+    """Count ``count`` lines of ``stride`` bytes each; None unless all are valid."""
+    if data.translate(_DIGITS) != _TEMPLATES[stride - 1] * count:
+        return None
+    # Tens of minutes and seconds; the digit check above covers the rest of the form
+    if data[14::stride].translate(None, b"012345") or data[17::stride].translate(None, b"012345"):
+        return None
+    numpy = _load_numpy() if use_numpy and count >= NUMPY_MIN_LINES else None
+    if numpy is not None:
+        return _count_numpy(numpy, data, stride, count)
+
+    # Hour of each line as one byte: tens * 10 + units, computed for the
+    # whole column at once as big integers (no byte can carry into the next)
+    tens = int.from_bytes(data[11::stride].translate(_DIGIT_VALUES), "big")
+    units = int.from_bytes(data[12::stride].translate(_DIGIT_VALUES), "big")
+    line_hours = (tens * 10 + units).to_bytes(count, "big")
+    hours = [line_hours.count(hour) for hour in range(24)]
+    if sum(hours) != count:
+        return None # Hour 24 or later
+
+    # YYYYMMDD of each line as one integer, byte-reversed so that (on
+    # little-endian machines) the integers sort like the dates
+    date_keys = bytearray(8 * count)
+    for i, column in enumerate(_DATE_COLUMNS):
+        date_keys[7 - i::8] = data[column::stride]
+    keys = memoryview(date_keys).cast("Q")
+    probe = keys[::max(count // 64, 1)].tolist()
+    if probe == sorted(probe):
+        # Logs are appended in order: sorting is a linear pass, then each
+        # day's run is found by binary search
+        keys = keys.tolist()
+        keys.sort()
+        runs = []
+        start = 0
+        while start < count:
+            end = bisect_right(keys, keys[start], start)
+            runs.append((keys[start], end - start))
+            start = end
+    else:
+        runs = Counter(keys).items()
+    days = {}
+    for key, n in runs:
+        ordinal = _key_ordinal(key)
+        if ordinal is None:
+            return None
+        days[ordinal] = n
+    return days, hours
+
+
+@lru_cache(maxsize=1 << 16)
+def _key_ordinal(key: int) -> int | None:
+    """The ordinal of a YYYYMMDD date key (see _count_fixed), or None if it isn't a date."""
+    text = key.to_bytes(8, sys.byteorder)[::-1]
+    try:
+        return date(int(text[:4]), int(text[4:6]), int(text[6:])).toordinal()
+    except ValueError:
+        return None
+
+
+def _count_numpy(numpy, data: bytes, stride: int, count: int):
+    def column(offset: int, dtype: str):
+        # One field of every line, as a view into ``data``
+        return numpy.ndarray((count,), dtype, data, offset, (stride,))
+
+    # Only digits are left in these fields, so their ASCII bytes compare like the numbers.
+    # NumPy must never see an impossible date: a failing cast of a large array can crash it.
+    day = column(8, ">u2")
+    if (column(0, ">u4").min() < _ascii(b"0001") or column(5, ">u2").min() < _ascii(b"01")
+            or column(5, ">u2").max() > _ascii(b"12") or day.min() < _ascii(b"01")
+            or day.max() > _ascii(b"31") or column(11, ">u2").max() > _ascii(b"23")):
+        return None
+    for text in numpy.unique(column(0, "S10")[day >= _ascii(b"29")]).tolist():
+        if not _valid_date(text):
+            return None # e.g. February 30
+
+    stamps = column(0, "S13").astype("datetime64[h]").astype(numpy.int64) # YYYY-MM-DDTHH
+    day_numbers, hour_numbers = numpy.divmod(stamps, 24)
+    first = int(day_numbers.min())
+    per_day = numpy.bincount(day_numbers - first)
+    used = numpy.flatnonzero(per_day)
+    epoch = date(1970, 1, 1).toordinal()
+    days = dict(zip((used + first + epoch).tolist(), per_day[used].tolist()))
+    return days, numpy.bincount(hour_numbers, minlength=24).tolist()
+
+
+def _ascii(digits: bytes) -> int:
+    return int.from_bytes(digits, "big")
@@ -0,0 +1,127 @@
+"""Send the terminal only the cells that changed (low-bandwidth mode).
+
+Textual repaints whole line spans of every widget that refreshed: a timer
+going from 24:59 to 24:58 rewrites the widget's full width, padding
+included. ``CellDiff`` keeps a copy of what the terminal shows and turns
+each compositor update into cursor moves plus the runs of cells that
+actually differ. Short unchanged gaps are resent rather than skipped, as a
+cursor move costs about as much.
+"""
+
+from rich.cells import get_character_cell_size
+from rich.control import Control
+from rich.segment import Segment
+# Private to Textual; pyproject.toml pins the minor version these match
+from textual._compositor import ChopsUpdate, CompositorUpdate, LayoutUpdate
+from textual.strip import Strip
+
+# Unchanged cells between two changes that are cheaper to resend than to skip
+GAP = 8
+
+
+class RenderedUpdate(CompositorUpdate):
+    """An update whose terminal output was already produced."""
+
+    def __init__(self, data: str):
+        self.data = data
+
+    def render_segments(self, console) -> str:
+        return self.data
+
+
+class CellDiff:
+    """What the terminal shows, one ``(character, style)`` per cell."""
+
+    def __init__(self):
+        self._lines = {} # y -> cells; None where unknown
+        self._size = None
+
+    def reset(self) -> None:
+        """Forget the screen contents; the next update is sent in full."""
+        self._lines = {}
+
+    def render(self, update: CompositorUpdate, size: tuple, console) -> str:
+        """Terminal output for ``update``, limited to the cells it changes."""
+        if size != self._size:
+            self._size = size
+            self.reset() # The terminal reflowed or cleared
+        if not isinstance(update, (ChopsUpdate, LayoutUpdate)):
+            self.reset()
+            return update.render_segments(console)
+        out = []
+        for y, x, strip in _pieces(update):
+            self._diff(out, y, x, _cells(strip), console)
+        return "".join(out)
+
+    def _diff(self, out: list, y: int, x: int, cells: list, console) -> None:
+        width = self._size[0]
+        cells = cells[:max(width - x, 0)]
+        line = self._lines.get(y)
+        if line is None:
+            line = self._lines[y] = [None] * width
+        if line[x:x + len(cells)] == cells:
+            return
+        runs = []
+        for i, cell in enumerate(cells):
+            if line[x + i] == cell:
+                continue
+            if runs and i - runs[-1][1] <= GAP:
+                runs[-1][1] = i + 1
+            else:
+                runs.append([i, i + 1])
+        for start, end in runs:
+            # Never send half of a wide character
+            while start > 0 and cells[start][0] == "":
+                start -= 1
+            while end < len(cells) and cells[end][0] == "":
+                end += 1
+            out.append(Control.move_to(x + start, y).segment.text)
+            out.append(_strip(cells[start:end]).render(console))
+        line[x:x + len(cells)] = cells
+
+
+def _pieces(update: CompositorUpdate):
+    """``(y, x, strip)`` for every part of the screen ``update`` paints."""
+    if isinstance(update, LayoutUpdate):
+        for y, line in enumerate(update.strips, update.region.y):
+            yield y, update.region.x, Strip.join(line)
+        return
+    # The same cropping as ChopsUpdate.render_segments
+    for y, x1, x2 in update.spans:
+        for end, (x, strip) in zip(update.chop_ends[y], update.chops[y].items()):
+            if strip is None or x > x2 or end <= x1:
+                continue
+            if not (x2 > x >= x1 and end <= x2):
+                strip = strip.crop(0, min(end, x2) - x)
+            yield y, x, strip
+
+
+def _cells(strip: Strip) -> list:
+    cells = []
+    for text, style, control in strip:
+        if control:
+            continue
+        for char in text:
+            width = get_character_cell_size(char)
+            if width == 0 and cells:
+                cells[-1] = (cells[-1][0] + char, style) # Combining character
+                continue
+            cells.append((char, style))
+            if width == 2:
+                cells.append(("", style)) # Right half of a wide character
+    return cells
+
+
+def _strip(cells: list) -> Strip:
+    """The segments for a run of cells, one per style change."""
+    segments = []
+    text, style = "", None
+    for char, cell_style in cells:
+        if cell_style != style and text:
+            segments.append(Segment(text, style))
+            text = ""
+        text += char
+        style = cell_style
+    if text:
+        segments.append(Segment(text, style))
+    return Strip(segments)
@@ -0,0 +1,150 @@
+"""Crash-safe checkpoint of the timer state.
+
+The session's settings and, while it runs, its wall-clock deadline are kept
+in one fixed-size record that is rewritten in place with a single
+``pwrite``: no temporary files, renames or fsyncs. It is only written when
+the state changes (start, stop, reset, phase change, new settings), never
+per tick, because a running countdown is fully described by its deadline.
+A CRC over the record catches a torn write, which just means starting with
+the defaults.
+
+Only one process checkpoints at a time. It holds an advisory lock on the
+file for as long as it runs, and the OS releases that lock if the process
+dies. Other timy instances running at the same time keep their timers in
+memory only.
+"""
+
+from datetime import datetime
+from pathlib import Path
+import os
+import struct
+import time
+import zlib
+
+from .history import HISTORY_DIR, SessionRecord
+from .timer import PomodoroSession
+
+try:
+    import fcntl
+except ImportError: # Windows: no advisory locks, every instance checkpoints
+    fcntl = None
+
+STATE_FILE = HISTORY_DIR / "timer.state"
+
+_RUNNING = 1
+_BREAK = 2
+_TAGGED = 4
+
+
+class TimerCheckpoint:
+    """The persisted state of one PomodoroSession."""
+
+    MAGIC = b"TIMYTIMR"
+    VERSION = 1
+    # magic, version, crc32 of the body
+    _HEADER = struct.Struct("<8sII")
+    # flags, work minutes, break minutes, seconds left (stopped), wall-clock deadline (running), tag length, tag
+    _BODY = struct.Struct("<IIIddH210s")
+    SIZE = _HEADER.size + _BODY.size # 256
+
+    def __init__(self, path: Path = STATE_FILE, on_error=None):
+        self.path = Path(path)
+        self.writes = 0
+        self._on_error = on_error
+        self._fd = None
+        self._last = None # Last record written, to skip identical rewrites
+
+    def acquire(self) -> bool:
+        """Open the file and take its lock; False if another process holds it."""
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        except OSError as e:
+            self._error(f"Error opening timer state {self.path}: {e}")
+            return False
+        if fcntl is not None:
+            try:
+                fcntl.lockf(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                os.close(fd)
+                return False
+        self._fd = fd
+        return True
+
+    def close(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd) # Also drops the lock
+            self._fd = None
+
+    def load(self) -> dict | None:
+        """The saved state, or None if there is none or it is damaged."""
+        if self._fd is None:
+            return None
+        data = os.pread(self._fd, self.SIZE, 0)
+        if len(data) != self.SIZE:
+            return None
+        magic, version, crc = self._HEADER.unpack_from(data)
+        body = data[self._HEADER.size:]
+        if magic != self.MAGIC or version != self.VERSION or zlib.crc32(body) != crc:
+            return None
+        self._last = data
+        flags, work, brk, left, deadline, tag_len, tag = self._BODY.unpack(body)
+        return {
+            "run": bool(flags & _RUNNING),
+            "brk": bool(flags & _BREAK),
+            "work": work,
+            "break": brk,
+            "left": left,
+            "deadline": deadline,
+            "tag": tag[:tag_len].decode("utf-8", errors="ignore") if flags & _TAGGED else None,
+        }
+
+    def save(self, session: PomodoroSession) -> None:
+        """Write ``session``'s current state, if it changed since the last write."""
+        if self._fd is None:
+            return
+        timer = session.timer
+        flags = (_RUNNING if timer.is_running else 0) | (_BREAK if session.is_break else 0)
+        tag = b""
+        if session.tag is not None:
+            flags |= _TAGGED
+            tag = session.tag.encode()[:210]
+        remaining = timer.remaining()
+        deadline = round(time.time() + remaining, 3) if timer.is_running else 0.0
+        body = self._BODY.pack(flags, session.work_duration, session.break_duration,
+                               remaining, deadline, len(tag), tag)
+        data = self._HEADER.pack(self.MAGIC, self.VERSION, zlib.crc32(body)) + body
+        if data == self._last:
+            return
+        try:
+            os.pwrite(self._fd, data, 0)
+        except OSError as e:
+            self._error(f"Error writing timer state {self.path}: {e}")
+            return
+        self._last = data
+        self.writes += 1
+
+    def restore(self, session: PomodoroSession, now: float = None) -> SessionRecord | None:
+        """Put ``session`` back where the previous run left it.
+
+        A session whose deadline passed meanwhile is completed, leaving the
+        next phase stopped, as if the app had been running. If that was a
+        work session, its record (timed at the deadline) is returned: log it,
+        then ``save`` the session, so it is credited exactly once barring a
+        crash in between.
+        """
+        state = self.load()
+        if state is None:
+            return None
+        now = time.time() if now is None else now
+        session.tag = state["tag"]
+        if state["run"]:
+            state["left"] = state["deadline"] - now
+        session.apply_state(dict(state, left=max(state["left"], 0.0)))
+        if state["run"] and state["left"] <= 0 and not session.complete():
+            return session.record(datetime.fromtimestamp(state["deadline"]))
+        return None
+
+    def _error(self, message: str) -> None:
+        if self._on_error is not None:
+            self._on_error(message)
@@ -0,0 +1,248 @@
+"""Command line entry point.
+
+Running ``timy`` with no arguments launches the TUI. The reporting
+subcommands work directly on the history files and never import Textual, so
+they are cheap enough to call from a shell prompt.
+"""
+
+from datetime import datetime, date, timedelta
+from pathlib import Path
+import argparse
+import sys
+
+from . import history, storage
+from .scheduler import parse_timer_spec
+
+
+# Kept in sync with transfer.FORMATS, which isn't imported for the other commands
+FORMATS = ("log", "csv", "jsonl", "bin")
+
+
+def _pomos(count: int) -> str:
+    return f"{count} pomo{'s' if count != 1 else ''}"
+
+
+def _open_store():
+    """Open the configured history store, folding in anything appended since its last sync."""
+    store = storage.open_store()
+    store.update(on_invalid=lambda line: print(f"Skipping invalid date format in history: {line}", file=sys.stderr))
+    return store
+
+
+def _window_total(store, days: int, today: date) -> int:
+    return sum(store.window(today - timedelta(days=days - 1), today).values())
+
+
+def cmd_stats(args) -> int:
+    store = _open_store()
+    today = date.today()
+    rows = [
+        ("Today", _window_total(store, 1, today)),
+        ("Last 7 days", _window_total(store, 7, today)),
+        (f"Last {args.days} days", _window_total(store, args.days, today)),
+    ]
+    for label, count in rows:
+        print(f"{label + ':':<18}{_pomos(count)}")
+    return 0
+
+
+def cmd_log(args) -> int:
+    try:
+        when = datetime.fromisoformat(args.at) if args.at else datetime.now()
+    except ValueError:
+        print(f"Invalid timestamp: {args.at}", file=sys.stderr)
+        return 2
+    record = history.SessionRecord(when, args.tag)
+    if args.tag is not None:
+        record.planned = record.actual = args.minutes * 60
+    store = _open_store()
+    history.append_completion(record, store)
+    print(f"Logged pomo at {when.isoformat(timespec='seconds')}" + (f" #{args.tag}" if args.tag else ""))
+    return 0
+
+
+def cmd_status(args) -> int:
+    store = _open_store()
+    count = _window_total(store, 1, date.today())
+    print(count if args.short else f"{_pomos(count)} today")
+    return 0
+
+
+def cmd_export(args) -> int:
+    from . import transfer
+    fmt = args.format or (args.output and transfer.format_for(args.output)) or "log"
+    warn = lambda line: print(f"Skipping invalid line in history: {line}", file=sys.stderr)
+    records = storage.open_store().sessions(warn)
+    if args.output is None:
+        count = transfer.export_records(sys.stdout.buffer, fmt, records)
+    else:
+        with open(args.output, "wb") as out:
+            count = transfer.export_records(out, fmt, records)
+    print(f"Exported {count} records", file=sys.stderr)
+    return 0
+
+
+def cmd_import(args) -> int:
+    try:
+        result = storage.open_store().merge(
+            args.files, args.format, memory=args.memory << 20,
+            on_invalid=lambda line: print(f"Skipping invalid record: {line}", file=sys.stderr),
+        )
+    except ValueError as e:
+        print(f"Import failed: {e}", file=sys.stderr)
+        return 2
+    print(f"Merged {result.read} records into {result.written} "
+          f"({result.duplicates} duplicates, {result.invalid} invalid lines dropped)")
+    return 0
+
+
+def cmd_migrate(args) -> int:
+    backend, _ = storage.configured_backend()
+    source = storage.open_store()
+    target = storage.open_store(args.to, args.path)
+    if args.to == backend and Path(target.path) == Path(source.path):
+        print(f"{target.path} already is the configured history", file=sys.stderr)
+        return 2
+    try:
+        result = target.merge(
+            [], memory=args.memory << 20,
+            records=source.sessions(lambda line: print(f"Skipping invalid line in history: {line}", file=sys.stderr)),
+        )
+    except ValueError as e:
+        print(f"Migration failed: {e}", file=sys.stderr)
+        return 2
+    print(f"Copied {source.path} into {target.path}: {result.written} records "
+          f"({result.duplicates} duplicates dropped); {source.path} was left as it is")
+    setting = f"TIMY_HISTORY={args.to}"
+    if args.path is not None:
+        setting += f" TIMY_HISTORY_PATH={target.path}"
+    print(f"Set {setting} to use it")
+    return 0
+
+
+def cmd_report(args) -> int:
+    from . import report
+    if not args.directory.is_dir():
+        print(f"Not a directory: {args.directory}", file=sys.stderr)
+        return 2
+    summary = report.build_report(args.directory, args.weeks, args.jobs)
+    if args.json is not None:
+        import json
+        text = json.dumps(summary, indent=1)
+        if str(args.json) == "-":
+            print(text)
+            return 0
+        args.json.write_text(text + "\n")
+    print(report.format_table(summary))
+    return 0
+
+
+def cmd_daemon(args) -> int:
+    from .daemon import run_daemon
+    try:
+        run_daemon(args.socket)
+    except RuntimeError as e:
+        print(e, file=sys.stderr)
+        return 1
+    return 0
+
+
+def cmd_attach(args) -> int:
+    from .daemon import DaemonClient
+    from .app import run
+    if not args.socket.exists():
+        print(f"No timy daemon socket at {args.socket}; start one with 'timy daemon'", file=sys.stderr)
+        return 1
+    run(DaemonClient(args.socket), args.session_tag, args.low_bandwidth)
+    return 0
+
+
+def _timer_spec(value: str) -> tuple:
+    try:
+        return parse_timer_spec(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def _positive_int(value: str) -> int:
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: {value!r}")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="timy", description="A simple Pomodoro timer.")
+    parser.add_argument("--tag", dest="session_tag", help="Tag the work sessions of this TUI (e.g. a project name)")
+    parser.add_argument("--timer", dest="timers", action="append", type=_timer_spec, metavar="NAME[:WORK[/BREAK]]",
+                        help="Run an extra timer alongside the main one (repeatable); its sessions are tagged NAME")
+    parser.add_argument("--low-bandwidth", action="store_const", const=True,
+                        help="Send only changed cells and show whole minutes, for slow SSH/mosh links (or set TIMY_LOW_BANDWIDTH=1)")
+    subparsers = parser.add_subparsers(dest="command")
+
+    stats = subparsers.add_parser("stats", help="Show Pomodoro totals")
+    stats.add_argument("--days", type=int, default=100, help="Size of the longer window (default: 100)")
+    stats.set_defaults(func=cmd_stats)
+
+    log = subparsers.add_parser("log", help="Log a completed Pomodoro")
+    log.add_argument("--at", help="ISO-8601 timestamp to log instead of now")
+    log.add_argument("--tag", help="Tag/project of the session")
+    log.add_argument("--minutes", type=int, default=30, help="Session length recorded with --tag (default: 30)")
+    log.set_defaults(func=cmd_log)
+
+    status = subparsers.add_parser("status", help="One-line summary for shell prompts")
+    status.add_argument("-s", "--short", action="store_true", help="Print only today's count")
+    status.set_defaults(func=cmd_status)
+
+    export = subparsers.add_parser("export", help="Write the history as log, CSV, JSON Lines or binary")
+    export.add_argument("-o", "--output", type=Path, help="Output file (default: stdout)")
+    export.add_argument("-f", "--format", choices=FORMATS, help="Output format (default: from the file extension, else log)")
+    export.set_defaults(func=cmd_export)
+
+    imp = subparsers.add_parser("import", help="Merge exported or copied histories into this one (sorted, deduplicated)")
+    imp.add_argument("files", nargs="*", type=Path, help="Files to merge; with none, the history is just compacted")
+    imp.add_argument("-f", "--format", choices=FORMATS, help="Input format (default: detected per file)")
+    imp.add_argument("--memory", type=int, default=64, help="Memory budget in MB for sorting (default: 64)")
+    imp.set_defaults(func=cmd_import)
+
+    migrate = subparsers.add_parser("migrate", help="Copy the history into another storage backend")
+    migrate.add_argument("--to", choices=("sqlite", "log"), default="sqlite", help="Backend to copy into (default: sqlite)")
+    migrate.add_argument("--path", type=Path, help="Its file (default: history.db / history.log in ~/.timy)")
+    migrate.add_argument("--memory", type=int, default=64, help="Memory budget in MB for sorting into a log (default: 64)")
+    migrate.set_defaults(func=cmd_migrate)
+
+    report = subparsers.add_parser("report", help="Summarize a directory tree of many users' history files")
+    report.add_argument("directory", type=Path, help="Directory to scan for history.log / *.log / *.log.gz files")
+    report.add_argument("--weeks", type=_positive_int, default=8, help="Weeks of weekly totals and trend (default: 8)")
+    report.add_argument("--json", type=Path, help="Also write the report as JSON to this file ('-': only JSON, to stdout)")
+    report.add_argument("-j", "--jobs", type=_positive_int, help="Worker processes (default: one per CPU core)")
+    report.set_defaults(func=cmd_report)
+
+    socket_file = history.HISTORY_DIR / "daemon.sock"
+    daemon = subparsers.add_parser("daemon", help="Run the timer and history as a background service")
+    daemon.add_argument("--socket", type=Path, default=socket_file, help=f"Unix socket to listen on (default: {socket_file})")
+    daemon.set_defaults(func=cmd_daemon)
+
+    attach = subparsers.add_parser("attach", help="Open the TUI on a running daemon")
+    attach.add_argument("--socket", type=Path, default=socket_file, help=f"Daemon socket (default: {socket_file})")
+    attach.set_defaults(func=cmd_attach)
+
+    return parser
+
+
+def main(argv=None) -> None:
+    """Entry point for the application."""
+    args = build_parser().parse_args(argv)
+    if args.command is None:
+        # Only the TUI needs Textual
+        from .app import run
+        run(tag=args.session_tag, low_bandwidth=args.low_bandwidth, timers=args.timers)
+        return
+    try:
+        sys.exit(args.func(args))
+    except OSError as e:
+        print(f"Error accessing history in {history.HISTORY_DIR}: {e}", file=sys.stderr)
+        sys.exit(1)
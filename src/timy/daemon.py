@@ -0,0 +1,380 @@
+"""Optional local daemon owning the timer, the history store and aggregates.
+
+TUI clients (``timy attach``) connect over a Unix domain socket. The wire
+format is one compact JSON object per line. Client to daemon::
+
+    {"op": "toggle"} | {"op": "reset"} | {"op": "settings", "work": 25, "break": 5, "tag": "writing"}
+
+Daemon to client::
+
+    {"t": "snap", "timer": {...}, "days": [[ordinal, count], ...], "hours": [24 ints]}
+    {"t": "timer", "timer": {...}}          # start/stop/reset/settings
+    {"t": "done", "was_break": bool, "timer": {...}}
+    {"t": "day", "d": ordinal, "h": hour}   # one new record
+
+Timer states carry the seconds left rather than a deadline, and clients run
+the countdown locally, so nothing is pushed per second. A new client gets
+the cached snapshot; attaching never parses history.
+"""
+
+from datetime import datetime, date, timedelta
+from pathlib import Path
+import asyncio
+import json
+import os
+import signal
+import socket
+
+from .checkpoint import TimerCheckpoint
+from .hooks import create_bus
+from .metrics import Registry, create_exporter
+from .history import HISTORY_DIR, DayCountStore, DayCounts
+from .storage import open_store
+from .timer import PomodoroSession
+from .watch import HistoryWatcher
+from .writer import HistoryWriter
+
+SOCKET_FILE = HISTORY_DIR / "daemon.sock"
+# Clients that fall this far behind are disconnected rather than buffered forever
+MAX_CLIENT_BUFFER = 1 << 20
+# Longest line a client accepts; the snapshot carries one entry per active day
+MAX_MESSAGE = 1 << 24
+
+
+def encode(message: dict) -> bytes:
+    return json.dumps(message, separators=(",", ":")).encode() + b"\n"
+
+
+class TimyDaemon:
+    """Serves one authoritative PomodoroSession and day store to many clients."""
+
+    def __init__(self, socket_path: Path = SOCKET_FILE, store: DayCountStore = None, durability: str = "none", log=print):
+        self.socket_path = Path(socket_path)
+        self.store = store if store is not None else open_store()
+        self.session = PomodoroSession()
+        self.checkpoint = TimerCheckpoint(on_error=log)
+        self.clients = set()
+        self._handlers = set() # One task per connected client
+        self._log = log
+        self._snapshot_days = None # Cached encoded day list, dropped on change
+        self._completion = None # Loop handle firing at the session deadline
+        self._server = None
+        self._stopped = None
+        self.writer = HistoryWriter(self.store, durability=durability, on_error=log)
+        # The daemon owns the timer, so attached TUIs leave the hooks to it
+        self.hooks = create_bus(on_error=log)
+        self.watcher = None
+        if self.store.watch_path is not None:
+            self.watcher = HistoryWatcher(self.store.watch_path, self._on_history_changed)
+        self.metrics = Registry()
+        self.metrics.gauge("timy_daemon_clients", "Attached clients", lambda: len(self.clients))
+        self.metrics.gauge("timy_history_writer_queue", "Completions waiting to be written", lambda: self.writer.pending)
+        self.metrics.gauge("timy_hook_queue", "Hook runs waiting for a worker", lambda: self.hooks.pending)
+        self.metrics.gauge("timy_hooks_dropped", "Hook runs skipped because the queue was full or the hook busy",
+                           lambda: self.hooks.dropped)
+        self.metrics.gauge("timy_hook_failures", "Hook runs that failed", lambda: self.hooks.failures)
+        self.metrics.gauge("timy_hook_timeouts", "Hook runs that overran their timeout", lambda: self.hooks.timeouts)
+        self._broadcast_time = self.metrics.histogram("timy_daemon_broadcast_seconds", "Time to queue one message to every client")
+        self.metrics_exporter = create_exporter(self.metrics, on_error=log)
+
+    # --- Store listener --- #
+
+    def record(self, timestamp: datetime) -> None:
+        self._snapshot_days = None
+        self.broadcast({"t": "day", "d": timestamp.toordinal(), "h": timestamp.hour})
+
+    def record_counts(self, days: dict, hours: list) -> None:
+        # Lines appended by timy instances that are not attached to us
+        self._snapshot_days = None
+        if sum(hours) == 1:
+            (ordinal,) = days
+            self.broadcast({"t": "day", "d": ordinal, "h": hours.index(1)})
+        else:
+            # A whole block is cheaper to send as one snapshot
+            asyncio.get_running_loop().call_soon(self._broadcast_snapshot)
+
+    def reset(self) -> None:
+        # The store is being rebuilt; clients get a fresh snapshot once it is done
+        self._snapshot_days = None
+        asyncio.get_running_loop().call_soon(self._broadcast_snapshot)
+
+    # --- Serving --- #
+
+    async def start(self) -> None:
+        self._remove_stale_socket() # Before anything else, so a second daemon leaves no trace
+        self.store.update(on_invalid=lambda line: self._log(f"Skipping invalid date format in history: {line}"))
+        self.store.add_listener(self)
+        self.writer.start()
+        if self.checkpoint.acquire():
+            missed = self.checkpoint.restore(self.session)
+            if missed is not None:
+                self.writer.submit(missed) # Finished while the daemon was down
+            self.checkpoint.save(self.session)
+            self._schedule_completion()
+        else:
+            self.checkpoint = None # Another timy instance keeps the timer state
+        if self.watcher is not None:
+            self.watcher.start()
+        if self.metrics_exporter is not None:
+            self.metrics_exporter.start()
+        # Bound under a private umask, so it is 0600 from the start and no other user can connect
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        umask = os.umask(0o077)
+        try:
+            sock.bind(str(self.socket_path))
+        except OSError:
+            sock.close()
+            raise
+        finally:
+            os.umask(umask)
+        self._server = await asyncio.start_unix_server(self._handle_client, sock=sock)
+
+    def _remove_stale_socket(self) -> None:
+        """Delete the socket of a daemon that is gone; raises RuntimeError if one still answers."""
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(str(self.socket_path))
+        except FileNotFoundError:
+            return
+        except ConnectionRefusedError:
+            self.socket_path.unlink(missing_ok=True) # Stale socket from a previous run
+            return
+        finally:
+            probe.close()
+        raise RuntimeError(f"A timy daemon is already listening on {self.socket_path}")
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        for client in list(self.clients):
+            client.close()
+        self.clients.clear()
+        # Closing the transports ends each handler's read loop
+        await asyncio.gather(*self._handlers, return_exceptions=True)
+        await self.writer.flush()
+        self.writer.close()
+        if self.watcher is not None:
+            self.watcher.stop()
+        self.hooks.close()
+        if self.checkpoint is not None:
+            self.checkpoint.save(self.session)
+            self.checkpoint.close()
+        if self.metrics_exporter is not None:
+            self.metrics_exporter.stop()
+        self.socket_path.unlink(missing_ok=True)
+
+    async def serve_forever(self) -> None:
+        await self.start()
+        self._stopped = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, self._stopped.set)
+        self._log(f"timy daemon listening on {self.socket_path}")
+        try:
+            await self._stopped.wait()
+        finally:
+            await self.stop()
+
+    def _snapshot(self) -> bytes:
+        if self._snapshot_days is None:
+            first_day = self.store.first_day()
+            days = self.store.window(first_day, date.max) if first_day else {}
+            self._snapshot_days = [[day.toordinal(), count] for day, count in sorted(days.items())]
+        return encode({
+            "t": "snap",
+            "timer": self.session.state(),
+            "days": self._snapshot_days,
+            "hours": list(self.store.hours()),
+        })
+
+    def _broadcast_snapshot(self) -> None:
+        data = self._snapshot()
+        for client in list(self.clients):
+            self._send(client, data)
+
+    def broadcast(self, message: dict) -> None:
+        with self._broadcast_time.time():
+            data = encode(message) # Encoded once for all clients
+            for client in list(self.clients):
+                self._send(client, data)
+
+    def _send(self, client: asyncio.StreamWriter, data: bytes) -> None:
+        if client.transport.get_write_buffer_size() > MAX_CLIENT_BUFFER:
+            self.clients.discard(client)
+            client.close()
+            return
+        client.write(data)
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.clients.add(writer)
+        self._handlers.add(asyncio.current_task())
+        self._send(writer, self._snapshot())
+        try:
+            while line := await reader.readline():
+                try:
+                    self.handle(json.loads(line))
+                except (ValueError, KeyError, TypeError) as e:
+                    self._log(f"Bad request from client: {e}")
+        except ConnectionError:
+            pass
+        finally:
+            self.clients.discard(writer)
+            self._handlers.discard(asyncio.current_task())
+            writer.close()
+
+    # --- Timer --- #
+
+    def handle(self, request: dict) -> None:
+        """Apply one client request to the session."""
+        op = request["op"]
+        timer = self.session.timer
+        if op == "toggle":
+            if timer.is_running:
+                timer.stop()
+            else:
+                starting = self.session.at_start()
+                timer.start()
+                if starting:
+                    self.hooks.emit("session-start", **self.session.hook_fields())
+        elif op == "reset":
+            if self.session.tag is not None and self.session.interrupted_seconds() > 0:
+                self.writer.submit(self.session.record(datetime.now(), interrupted=True))
+            self.session.reset()
+        elif op == "settings":
+            self.session.work_duration = int(request.get("work") or self.session.work_duration)
+            self.session.break_duration = int(request.get("break") or self.session.break_duration)
+            if "tag" in request:
+                self.session.tag = request["tag"] or None
+            if request.get("work") and not timer.is_running:
+                timer.time_left = timedelta(minutes=self.session.work_duration)
+        else:
+            raise ValueError(f"unknown op {op!r}")
+        self._schedule_completion()
+        if self.checkpoint is not None:
+            self.checkpoint.save(self.session)
+        self.broadcast({"t": "timer", "timer": self.session.state()})
+
+    def _schedule_completion(self) -> None:
+        """One wakeup per session end, none while stopped."""
+        if self._completion is not None:
+            self._completion.cancel()
+            self._completion = None
+        if self.session.timer.is_running:
+            self._completion = asyncio.get_running_loop().call_later(
+                self.session.timer.remaining(), self._complete
+            )
+
+    def _complete(self) -> None:
+        self._completion = None
+        if self.session.timer.remaining() > 0:
+            self._schedule_completion() # Woke up early
+            return
+        was_break = self.session.complete()
+        if not was_break:
+            self.writer.submit(self.session.record(datetime.now()))
+        if self.checkpoint is not None:
+            self.checkpoint.save(self.session)
+        self.broadcast({"t": "done", "was_break": was_break, "timer": self.session.state()})
+        self.hooks.emit("break-end" if was_break else "session-end", **self.session.hook_fields())
+
+    def _on_history_changed(self) -> None:
+        # Lines appended by timy instances that are not attached to us
+        self.store.update(on_invalid=lambda line: self._log(f"Skipping invalid date format in history: {line}"))
+
+
+class RemoteDayCounts(DayCounts):
+    """Read-only stand-in for DayCountStore, fed by daemon messages.
+
+    Listeners get the same ``record``/``reset`` calls as with DayCountStore
+    (``reset`` receives this object so they can reload from it), so the graph
+    and the stats engine work unchanged on top of a daemon connection.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._listeners = []
+
+    def add_listener(self, listener) -> None:
+        self._listeners.append(listener)
+
+    def apply_snapshot(self, days: list, hours: list) -> None:
+        self.load(days, hours)
+        for listener in self._listeners:
+            listener.reset(self)
+
+    def add(self, ordinal: int, hour: int) -> None:
+        super().add(ordinal, hour)
+        timestamp = datetime.combine(date.fromordinal(ordinal), datetime.min.time()).replace(hour=hour)
+        for listener in self._listeners:
+            listener.record(timestamp)
+
+
+class DaemonClient:
+    """Connection from a TUI to the daemon.
+
+    ``on_timer(state)``, ``on_done(was_break, state)`` and ``on_days()`` are
+    called on the event loop as messages arrive.
+    """
+
+    def __init__(self, socket_path: Path = SOCKET_FILE):
+        self.socket_path = Path(socket_path)
+        self.days = RemoteDayCounts()
+        self.on_timer = None
+        self.on_done = None
+        self.on_days = None
+        self.on_disconnect = None
+        self._reader = None
+        self._writer = None
+        self._task = None
+
+    async def connect(self) -> None:
+        self._reader, self._writer = await asyncio.open_unix_connection(str(self.socket_path), limit=MAX_MESSAGE)
+        self._task = asyncio.get_running_loop().create_task(self._read())
+
+    def send(self, op: str, **fields) -> None:
+        if self._writer is not None:
+            self._writer.write(encode({"op": op, **fields}))
+
+    def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    async def _read(self) -> None:
+        try:
+            while line := await self._reader.readline():
+                self._dispatch(json.loads(line))
+        except (ConnectionError, ValueError):
+            pass # Dropped by the daemon, or a message we can't read
+        if self.on_disconnect is not None:
+            self.on_disconnect()
+
+    def _dispatch(self, message: dict) -> None:
+        kind = message["t"]
+        if kind == "snap":
+            self.days.apply_snapshot(message["days"], message["hours"])
+            self._call(self.on_timer, message["timer"])
+            self._call(self.on_days)
+        elif kind == "timer":
+            self._call(self.on_timer, message["timer"])
+        elif kind == "done":
+            self._call(self.on_done, message["was_break"], message["timer"])
+        elif kind == "day":
+            self.days.add(message["d"], message["h"])
+            self._call(self.on_days)
+
+    @staticmethod
+    def _call(callback, *args) -> None:
+        if callback is not None:
+            callback(*args)
+
+
+def run_daemon(socket_path: Path = SOCKET_FILE) -> None:
+    daemon = TimyDaemon(socket_path, durability=os.environ.get("TIMY_DURABILITY", "none"))
+    asyncio.run(daemon.serve_forever())
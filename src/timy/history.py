@@ -0,0 +1,696 @@
+from datetime import datetime, date
+from pathlib import Path
+from collections import defaultdict
+from contextlib import contextmanager
+from itertools import accumulate
+import array
+import bisect
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+
+from .bulk import count_lines
+
+try:
+    import fcntl
+except ImportError: # Windows: no advisory locks
+    fcntl = None
+
+
+# History file path
+HISTORY_DIR = Path.home() / ".timy"
+HISTORY_FILE = HISTORY_DIR / "history.log"
+# Binary per-day counters derived from HISTORY_FILE
+DAYS_FILE = HISTORY_DIR / "history.days"
+
+# Number of leading bytes hashed to detect a rewritten/rotated log
+HEADER_BYTES = 4096
+# How much of the log is read and parsed at a time
+READ_BLOCK = 1 << 20
+# A last line without a newline counts once the log is this old (seconds) or stops growing
+TAIL_SETTLE = 1.0
+
+
+class _PathLock:
+    """This process's hold on one lock file: a thread lock, and the POSIX lock once held."""
+
+    def __init__(self):
+        self.thread_lock = threading.RLock()
+        self.depth = 0
+        self.fd = None
+
+
+_PATH_LOCKS = {}
+_PATH_LOCKS_GUARD = threading.Lock()
+
+
+@contextmanager
+def file_lock(path: Path):
+    """Hold the exclusive lock for ``path`` against other threads and processes.
+
+    POSIX locks (which also work on NFS) belong to the process and are all
+    dropped when it closes any descriptor of the file, so they are taken on
+    ``.<name>.lock`` next to it, which nothing else opens, after a thread lock.
+    Re-entrant within a thread.
+    """
+    path = Path(path)
+    with _PATH_LOCKS_GUARD:
+        lock = _PATH_LOCKS.setdefault(os.path.abspath(path), _PathLock())
+    with lock.thread_lock:
+        if lock.depth == 0 and fcntl is not None:
+            fd = os.open(path.with_name(f".{path.name}.lock"), os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.lockf(fd, fcntl.LOCK_EX)
+            except BaseException:
+                os.close(fd)
+                raise
+            lock.fd = fd
+        lock.depth += 1
+        try:
+            yield
+        finally:
+            lock.depth -= 1
+            if lock.depth == 0 and lock.fd is not None:
+                os.close(lock.fd) # Releases the POSIX lock
+                lock.fd = None
+
+
+class SessionRecord:
+    """One session in the history log.
+
+    Untagged completions are written as a bare ISO-8601 timestamp, exactly as
+    before. Sessions with a tag, or interrupted ones, append a tab and a JSON
+    object: ``2026-10-17T10:30:00\t{"tag":"writing","planned":1800,"actual":1800}``.
+    Durations are in seconds.
+    """
+
+    __slots__ = ("timestamp", "tag", "planned", "actual", "interrupted")
+
+    def __init__(self, timestamp: datetime, tag: str = None, planned: int = None,
+                 actual: int = None, interrupted: bool = False):
+        self.timestamp = timestamp
+        self.tag = tag
+        self.planned = planned
+        self.actual = actual
+        self.interrupted = interrupted
+
+    def to_line(self) -> bytes:
+        if self.tag is None and not self.interrupted:
+            return f"{self.timestamp.isoformat()}\n".encode()
+        fields = {"tag": self.tag, "planned": self.planned, "actual": self.actual}
+        if self.interrupted:
+            fields["interrupted"] = True
+        extra = json.dumps({k: v for k, v in fields.items() if v is not None}, separators=(",", ":"))
+        return f"{self.timestamp.isoformat()}\t{extra}\n".encode()
+
+    @classmethod
+    def from_line(cls, line: str) -> "SessionRecord":
+        """Parse one stripped line; raises ValueError if it is malformed."""
+        stamp, _, extra = line.partition("\t")
+        timestamp = datetime.fromisoformat(stamp)
+        if not extra:
+            return cls(timestamp)
+        fields = json.loads(extra)
+        if not isinstance(fields, dict):
+            raise ValueError(f"expected a JSON object, got {extra!r}")
+        return cls(timestamp, fields.get("tag"), fields.get("planned"),
+                   fields.get("actual"), bool(fields.get("interrupted")))
+
+
+def parse_records(data: bytes, on_invalid=None):
+    """Yield the timestamps of completed sessions in ``data`` (complete lines).
+
+    Invalid lines are skipped, and so are interrupted sessions: they are kept
+    in the log for per-tag totals but are not Pomodoros.
+    """
+    for raw in data.splitlines():
+        line = raw.decode("utf-8", errors="replace").strip()
+        if not line:
+            continue
+        try:
+            if "\t" not in line:
+                yield datetime.fromisoformat(line)
+                continue
+            record = SessionRecord.from_line(line)
+            if not record.interrupted:
+                yield record.timestamp
+        except ValueError:
+            if on_invalid is not None:
+                on_invalid(line)
+
+
+def parse_sessions(data: bytes, on_invalid=None, structured_only: bool = False):
+    """Yield a SessionRecord per valid line in ``data``, interrupted ones included.
+
+    With ``structured_only`` bare-timestamp lines are skipped without being
+    parsed, which makes a pass over an untagged log cheap.
+    """
+    if structured_only and b"\t" not in data:
+        return
+    for raw in data.splitlines():
+        if structured_only and b"\t" not in raw:
+            continue
+        line = raw.decode("utf-8", errors="replace").strip()
+        if not line:
+            continue
+        try:
+            yield SessionRecord.from_line(line)
+        except ValueError:
+            if on_invalid is not None:
+                on_invalid(line)
+
+
+def append_lines(path: Path, lines: list, durability: str = "none") -> int:
+    """Append ``lines`` (bytes) under an advisory lock; returns their offset.
+
+    ``durability`` is ``"none"``, ``"batch"`` (one fsync) or ``"record"``
+    (fsync after every line).
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Opened under the lock, so never a log that an import or rotation is replacing
+    with file_lock(path), open(path, "a+b") as f: # Readable, to check how the log ends
+        return _append_locked(f, lines, durability)
+
+
+def _append_locked(f, lines: list, durability: str) -> int:
+    offset = f.seek(0, os.SEEK_END)
+    if offset and os.pread(f.fileno(), 1, offset - 1) != b"\n":
+        f.write(b"\n") # Finish a last line left without a newline (hand edit, generator)
+        offset += 1
+    if durability == "record":
+        for line in lines:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+    else:
+        f.write(b"".join(lines))
+        f.flush()
+        if durability == "batch":
+            os.fsync(f.fileno())
+    return offset
+
+
+class HistoryTail:
+    """Keeps per-day Pomodoro counts in sync with an append-only history log.
+
+    Only the bytes appended since the previous read are parsed. The whole
+    file is re-read if it was truncated, replaced (new inode) or rewritten
+    (the checksum of its first bytes changed). A last line without a newline
+    is counted once the file has not grown since the previous read, or was
+    last written ``TAIL_SETTLE`` seconds ago, so a line still being appended
+    is never parsed half-written.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.counts = defaultdict(int)
+        self._offset = 0
+        self._inode = None
+        self._header_crc = None
+        self._header_len = 0
+        self._tail_size = None # File size when an unterminated last line was put off
+
+    def reset(self) -> None:
+        """Forget everything read so far; the next update does a full reload."""
+        self.counts = defaultdict(int)
+        self._offset = 0
+        self._inode = None
+        self._header_crc = None
+        self._header_len = 0
+        self._tail_size = None
+
+    def _parse(self, data: bytes, on_invalid=None):
+        """Turn complete lines into the items passed to ``_add_record``."""
+        return parse_records(data, on_invalid)
+
+    def _add_record(self, timestamp: datetime) -> None:
+        self.counts[timestamp.date()] += 1
+
+    def _add_lines(self, data: bytes, on_invalid=None) -> int:
+        """Fold in a block of complete lines; returns the number of records added."""
+        added = 0
+        for item in self._parse(data, on_invalid):
+            self._add_record(item)
+            added += 1
+        return added
+
+    def _header_checksum(self, f, length: int) -> int:
+        f.seek(0)
+        return zlib.crc32(f.read(length))
+
+    def _needs_reload(self, f, st: os.stat_result) -> bool:
+        """Check whether the file is still the one we have been tailing."""
+        if self._inode is None:
+            return False
+        if st.st_ino != self._inode or st.st_size < self._offset:
+            return True
+        # Same inode and not shorter, but the start may have been rewritten in place
+        return self._header_checksum(f, self._header_len) != self._header_crc
+
+    def update(self, on_invalid=None) -> int:
+        """Fold newly appended lines into ``counts``.
+
+        ``on_invalid`` is called with each line that is not a valid ISO-8601
+        timestamp. Returns the number of records added.
+        """
+        try:
+            f = open(self.path, "rb")
+        except FileNotFoundError:
+            if self._inode is not None:
+                self.reset()
+            return 0
+
+        with f:
+            st = os.fstat(f.fileno())
+            if self._needs_reload(f, st):
+                self.reset()
+            if st.st_size == self._offset:
+                return 0
+
+            f.seek(self._offset)
+            left = st.st_size - self._offset
+            added = 0
+            pending = b""
+            # Fixed-size blocks keep memory flat however much was appended
+            while left > 0:
+                block = f.read(min(READ_BLOCK, left))
+                if not block:
+                    break
+                left -= len(block)
+                block = pending + block
+                end = block.rfind(b"\n") + 1
+                pending = block[end:] # Partial line: completed by the next block or update
+                if end:
+                    added += self._add_lines(block[:end], on_invalid)
+                    self._offset += end
+                    self._inode = st.st_ino
+            if pending and left == 0 and (st.st_size == self._tail_size or time.time() - st.st_mtime > TAIL_SETTLE):
+                added += self._add_lines(pending + b"\n", on_invalid)
+                self._offset += len(pending)
+                self._inode = st.st_ino
+                pending = b""
+            self._tail_size = st.st_size if pending else None
+            if self._inode is None:
+                return 0 # Not even one complete line yet
+            if self._header_len < HEADER_BYTES:
+                self._header_len = min(self._offset, HEADER_BYTES)
+                self._header_crc = self._header_checksum(f, self._header_len)
+            return added
+
+
+class DayCountStore(HistoryTail):
+    """Memory-mapped sidecar holding one counter per calendar day.
+
+    Layout: a fixed header, 24 hour-of-day counters, then little-endian uint32
+    day counters indexed by ``date.toordinal() - EPOCH_ORDINAL``. The header
+    also records how far into the text log the counters are valid, so
+    reopening the store only parses lines appended since then. The sidecar is
+    rebuilt from the text log when it is missing, has an unknown format, or the
+    log was rotated/rewritten. Finished months live in compressed segments
+    (see ``timy.segments``), which are counted from their manifest's
+    summaries; the header records the manifest generation they came from.
+
+    Objects passed to ``add_listener`` are told about every record folded in
+    (``record(timestamp)``, or ``record_counts(days, hours)`` for a block of
+    them) and about full rebuilds (``reset()``).
+
+    Several processes may share one sidecar: every read-modify-write happens
+    under an advisory lock, the header is re-read first, and the file only
+    ever grows so other processes' mappings stay valid. Records another
+    process already counted are still parsed (just those bytes) so that this
+    process's listeners hear about them.
+
+    This is the ``log`` history backend; see ``timy.storage`` for the
+    interface it shares with the others.
+    """
+
+    MAGIC = b"TIMYDAYS"
+    VERSION = 3
+    EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+    # magic, version, header_len, header_crc, segment generation, inode, offset
+    _HEADER = struct.Struct("<8sIIIIQQ")
+    _HOURS = struct.Struct("<24I")
+    HOURS_OFFSET = 64
+    HEADER_SIZE = HOURS_OFFSET + _HOURS.size
+    _COUNTER = struct.Struct("<I")
+    # Grow the file a year at a time to avoid remapping on every new day
+    GROW_DAYS = 366
+
+    def __init__(self, path: Path, log_path: Path):
+        from .segments import HistorySegments # segments imports this module
+
+        super().__init__(log_path)
+        self.store_path = Path(path)
+        self.segments = HistorySegments(log_path)
+        self._generation = 0
+        self._fd = None
+        self._mm = None
+        self._prefix = None # Lazily built running totals, see range_total
+        self._listeners = []
+        self._lock = threading.RLock()
+        # How far into the log this process's listeners/prefix are up to date
+        self._seen_offset = 0
+        self._seen_inode = None
+
+    def add_listener(self, listener) -> None:
+        self._listeners.append(listener)
+
+    @property
+    def watch_path(self) -> Path:
+        """The file that changes when another process appends."""
+        return self.path
+
+    def write(self, records: list, durability: str = "none") -> int:
+        """Append SessionRecords to the log; returns the offset they were written at.
+
+        Only file I/O, so it may run in another thread; pass the result to
+        ``record_written`` afterwards.
+        """
+        return append_lines(self.path, [record.to_line() for record in records], durability)
+
+    def record_written(self, records: list, offset: int) -> None:
+        """Count records that ``write`` put at ``offset``."""
+        for record in records:
+            length = len(record.to_line())
+            self.record_append(None if record.interrupted else record.timestamp, offset, length)
+            offset += length
+
+    def sessions(self, on_invalid=None):
+        """Every SessionRecord in the history, oldest first."""
+        from .transfer import read_history
+        return read_history(self.path, on_invalid)
+
+    def tag_index(self):
+        """A TagIndex over this history."""
+        from .tags import TagIndex
+        return TagIndex(self.path)
+
+    def merge(self, sources: list, fmt: str = None, memory: int = None, on_invalid=None, records=None):
+        """Merge files (and SessionRecords from another store) into the history; see ``transfer.import_logs``."""
+        from .transfer import DEFAULT_MEMORY, import_logs
+        result = import_logs(sources, fmt, self.path, memory or DEFAULT_MEMORY, on_invalid, records)
+        self.update() # Rebuild the counters for the new log now rather than on the next start
+        return result
+
+    def open(self) -> None:
+        """Map the sidecar, creating it (empty) if needed."""
+        if self._mm is not None:
+            return
+        self.store_path.parent.mkdir(parents=True, exist_ok=True)
+        self._fd = os.open(self.store_path, os.O_RDWR | os.O_CREAT, 0o644)
+        with file_lock(self.store_path):
+            if os.fstat(self._fd).st_size < self.HEADER_SIZE:
+                os.ftruncate(self._fd, self.HEADER_SIZE)
+            self._mm = mmap.mmap(self._fd, 0)
+            if not self._read_header():
+                self.reset()
+        self._seen_offset, self._seen_inode = self._offset, self._inode
+
+    def _read_header(self) -> bool:
+        """Load the shared sync state; False if the sidecar has an unknown format."""
+        magic, version, header_len, header_crc, generation, inode, offset = self._HEADER.unpack_from(self._mm, 0)
+        if magic != self.MAGIC or version != self.VERSION or generation != self.segments.generation():
+            return False
+        self._generation = generation
+        self._header_len = header_len
+        self._header_crc = header_crc
+        self._inode = inode or None
+        self._offset = offset
+        return True
+
+    @contextmanager
+    def _locked(self):
+        """Exclusive access with the shared state freshly loaded from disk."""
+        self.open()
+        with self._lock, file_lock(self.store_path):
+            size = os.fstat(self._fd).st_size
+            if size != len(self._mm):
+                # Another process grew the file
+                self._mm.close()
+                self._mm = mmap.mmap(self._fd, 0)
+                self._prefix = None
+            if not self._read_header():
+                self.reset()
+            self._catch_up()
+            yield
+            self._seen_offset, self._seen_inode = self._offset, self._inode
+
+    def _catch_up(self) -> None:
+        """Replay records other processes counted since we last looked."""
+        if self._seen_inode != self._inode or self._seen_offset > self._offset:
+            # The shared store was rebuilt elsewhere
+            self._prefix = None
+            days, hours = self.segments.totals()
+            for listener in self._listeners:
+                listener.reset()
+                listener.record_counts(days, hours)
+            self._seen_offset = 0
+        if self._seen_offset == self._offset:
+            return
+        self._prefix = None
+        if self._listeners:
+            try:
+                with open(self.path, "rb") as f:
+                    f.seek(self._seen_offset)
+                    left = self._offset - self._seen_offset
+                    pending = b""
+                    while left > 0 and (block := f.read(min(READ_BLOCK, left))):
+                        left -= len(block)
+                        block = pending + block
+                        end = block.rfind(b"\n") + 1
+                        pending = block[end:]
+                        days, hours = count_lines(block[:end])
+                        for listener in self._listeners:
+                            listener.record_counts(days, hours)
+                    if pending: # A last line without a newline, already counted by its reader
+                        days, hours = count_lines(pending + b"\n")
+                        for listener in self._listeners:
+                            listener.record_counts(days, hours)
+            except OSError:
+                return
+        self._seen_offset = self._offset
+
+    def close(self) -> None:
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def _capacity(self) -> int:
+        return (len(self._mm) - self.HEADER_SIZE) // self._COUNTER.size
+
+    def _write_header(self) -> None:
+        self._HEADER.pack_into(
+            self._mm, 0, self.MAGIC, self.VERSION, self._header_len,
+            self._header_crc or 0, self._generation, self._inode or 0, self._offset,
+        )
+
+    def reset(self) -> None:
+        super().reset()
+        self._prefix = None
+        for listener in self._listeners:
+            listener.reset()
+        if self._mm is not None:
+            # Zero every counter in place (never shrink: other processes may
+            # have the file mapped), start from the segments' totals; the
+            # next update adds the log
+            self._mm[self.HOURS_OFFSET:] = bytes(len(self._mm) - self.HOURS_OFFSET)
+            self._generation = self.segments.generation()
+            self.add_counts(*self.segments.totals())
+            self._write_header()
+
+    def _add_record(self, timestamp: datetime) -> None:
+        self.bump(timestamp, persist=False)
+
+    def _add_lines(self, data: bytes, on_invalid=None) -> int:
+        days, hours = count_lines(data, on_invalid)
+        if days and min(days) < self.EPOCH_ORDINAL:
+            # Records before 1970 aren't counted at all; not worth a bulk path
+            # (invalid lines were reported already)
+            return super()._add_lines(data)
+        return self.add_counts(days, hours)
+
+    def add_counts(self, days: dict, hours: list) -> int:
+        """Add ``{ordinal: count}`` and 24 hour-of-day counts in one go (days before 1970 are dropped)."""
+        if days and min(days) < self.EPOCH_ORDINAL:
+            days = {ordinal: count for ordinal, count in days.items() if ordinal >= self.EPOCH_ORDINAL}
+        if not days:
+            return 0
+        last = max(days) - self.EPOCH_ORDINAL
+        if last >= self._capacity():
+            self._mm.close()
+            os.ftruncate(self._fd, self.HEADER_SIZE + (last + self.GROW_DAYS) * self._COUNTER.size)
+            self._mm = mmap.mmap(self._fd, 0)
+        for ordinal, count in days.items():
+            pos = self.HEADER_SIZE + (ordinal - self.EPOCH_ORDINAL) * self._COUNTER.size
+            (previous,) = self._COUNTER.unpack_from(self._mm, pos)
+            self._COUNTER.pack_into(self._mm, pos, previous + count)
+        totals = self._HOURS.unpack_from(self._mm, self.HOURS_OFFSET)
+        self._HOURS.pack_into(self._mm, self.HOURS_OFFSET, *(a + b for a, b in zip(totals, hours)))
+        self._prefix = None
+        for listener in self._listeners:
+            listener.record_counts(days, hours)
+        return sum(days.values())
+
+    def bump(self, timestamp: datetime, persist: bool = True) -> None:
+        """Count one record at ``timestamp`` in place."""
+        index = timestamp.toordinal() - self.EPOCH_ORDINAL
+        if index < 0:
+            return
+        hour_pos = self.HOURS_OFFSET + timestamp.hour * self._COUNTER.size
+        (count,) = self._COUNTER.unpack_from(self._mm, hour_pos)
+        self._COUNTER.pack_into(self._mm, hour_pos, count + 1)
+        if index >= self._capacity():
+            self._mm.close()
+            os.ftruncate(self._fd, self.HEADER_SIZE + (index + self.GROW_DAYS) * self._COUNTER.size)
+            self._mm = mmap.mmap(self._fd, 0)
+            self._prefix = None
+        pos = self.HEADER_SIZE + index * self._COUNTER.size
+        (count,) = self._COUNTER.unpack_from(self._mm, pos)
+        self._COUNTER.pack_into(self._mm, pos, count + 1)
+        if self._prefix is not None:
+            # New records are almost always for today, near the end of the array
+            for i in range(index + 1, len(self._prefix)):
+                self._prefix[i] += 1
+        if persist:
+            self._write_header()
+        for listener in self._listeners:
+            listener.record(timestamp)
+
+    def update(self, on_invalid=None) -> int:
+        self.segments.rotate()
+        with self._locked():
+            added = super().update(on_invalid)
+            self._write_header()
+        return added
+
+    def record_append(self, when: datetime | None, log_offset: int, length: int) -> None:
+        """Account for ``length`` bytes appended to the log at ``log_offset``.
+
+        ``when`` is None for a line that is not counted (an interrupted
+        session). If the store was not already in sync up to ``log_offset``
+        (another writer appended in between) the counter is left alone and the
+        line is picked up by the next ``update``.
+        """
+        with self._locked():
+            if self._inode is None or self._offset != log_offset:
+                return
+            self._offset += length
+            if when is not None:
+                self.bump(when)
+            else:
+                self._write_header()
+
+    def window(self, start: date, end: date) -> dict:
+        """Return the non-zero day counts between ``start`` and ``end`` inclusive."""
+        self.open()
+        first = max(start.toordinal() - self.EPOCH_ORDINAL, 0)
+        last = min(end.toordinal() - self.EPOCH_ORDINAL, self._capacity() - 1)
+        counts = defaultdict(int)
+        if last < first:
+            return counts
+        values = struct.unpack_from(f"<{last - first + 1}I", self._mm, self.HEADER_SIZE + first * self._COUNTER.size)
+        for i, count in enumerate(values):
+            if count:
+                counts[date.fromordinal(first + i + self.EPOCH_ORDINAL)] = count
+        return counts
+
+    def hours(self) -> tuple:
+        """Records per hour of day (0-23) over the whole history."""
+        self.open()
+        return self._HOURS.unpack_from(self._mm, self.HOURS_OFFSET)
+
+    def _prefix_sums(self) -> array.array:
+        """``prefix[i]`` is the number of records before day index ``i``."""
+        if self._prefix is None:
+            self.open()
+            counts = struct.unpack_from(f"<{self._capacity()}I", self._mm, self.HEADER_SIZE)
+            self._prefix = array.array("Q", [0])
+            self._prefix.extend(accumulate(counts))
+        return self._prefix
+
+    def range_total(self, start: date, end: date) -> int:
+        """Number of records between ``start`` and ``end`` inclusive, in O(1)."""
+        prefix = self._prefix_sums()
+        first = min(max(start.toordinal() - self.EPOCH_ORDINAL, 0), len(prefix) - 1)
+        last = min(max(end.toordinal() - self.EPOCH_ORDINAL + 1, 0), len(prefix) - 1)
+        return prefix[last] - prefix[first] if last > first else 0
+
+    def first_day(self) -> date | None:
+        """The earliest day with at least one record, or None if there are none."""
+        prefix = self._prefix_sums()
+        if prefix[-1] == 0:
+            return None
+        index = bisect.bisect_right(prefix, 0) - 1
+        return date.fromordinal(index + self.EPOCH_ORDINAL)
+
+
+class DayCounts:
+    """In-memory per-day counters with the read interface of DayCountStore.
+
+    Used where a sidecar file isn't wanted: the records of a single tag, and
+    the counters a daemon client receives over its socket.
+    """
+
+    path = None
+
+    def __init__(self):
+        self._counts = {} # ordinal -> count
+        self._ordinals = [] # Sorted keys of _counts
+        self._hours = [0] * 24
+        self._prefix = None # Lazily built running totals over _ordinals
+
+    def update(self, on_invalid=None) -> int:
+        return 0 # Filled in by whoever owns the counters
+
+    def load(self, days: list, hours: list) -> None:
+        """Replace everything with ``[ordinal, count]`` pairs and 24 hour counters."""
+        self._counts = dict((ordinal, count) for ordinal, count in days)
+        self._ordinals = sorted(self._counts)
+        self._hours = list(hours)
+        self._prefix = None
+
+    def add(self, ordinal: int, hour: int) -> None:
+        if ordinal not in self._counts:
+            bisect.insort(self._ordinals, ordinal)
+            self._counts[ordinal] = 0
+        self._counts[ordinal] += 1
+        self._hours[hour] += 1
+        self._prefix = None
+
+    def window(self, start: date, end: date) -> dict:
+        lo = bisect.bisect_left(self._ordinals, start.toordinal())
+        hi = bisect.bisect_right(self._ordinals, end.toordinal())
+        counts = defaultdict(int)
+        for ordinal in self._ordinals[lo:hi]:
+            counts[date.fromordinal(ordinal)] = self._counts[ordinal]
+        return counts
+
+    def range_total(self, start: date, end: date) -> int:
+        if self._prefix is None:
+            self._prefix = array.array("Q", [0])
+            self._prefix.extend(accumulate(self._counts[ordinal] for ordinal in self._ordinals))
+        lo = bisect.bisect_left(self._ordinals, start.toordinal())
+        hi = bisect.bisect_right(self._ordinals, end.toordinal())
+        return self._prefix[hi] - self._prefix[lo]
+
+    def first_day(self) -> date | None:
+        return date.fromordinal(self._ordinals[0]) if self._ordinals else None
+
+    def hours(self) -> tuple:
+        return tuple(self._hours)
+
+
+def append_completion(when: datetime | SessionRecord, store=None) -> None:
+    """Append one session to the history store (or, without one, to the log)."""
+    record = when if isinstance(when, SessionRecord) else SessionRecord(when)
+    if store is None:
+        append_lines(HISTORY_FILE, [record.to_line()])
+        return
+    store.record_written([record], store.write([record]))
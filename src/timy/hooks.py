@@ -0,0 +1,262 @@
+"""Hooks run on session boundaries, off the event loop.
+
+``HookBus.emit`` is called by the TUI (or the daemon, which owns the timer
+when TUIs are attached) with one of ``EVENTS`` and only enqueues work:
+a small pool of worker threads runs the hooks. The queue is bounded and a
+hook never has more than one job queued or running, so a burst of events or
+a hung hook drops that hook's events instead of piling up threads, and the
+next tick or repaint never waits for a hook.
+
+Hooks come from ``~/.timy/hooks.json`` (or the file in ``TIMY_HOOKS``)::
+
+    [
+      {"on": "session-end", "run": "notify-send 'Pomodoro done'", "timeout": 5},
+      {"on": ["session-start", "session-end", "break-end"], "post": "http://127.0.0.1:8080/timy"}
+    ]
+
+``run`` is a shell command that gets the event as ``TIMY_EVENT``,
+``TIMY_TIME``, ``TIMY_TAG``, ``TIMY_WORK`` and ``TIMY_BREAK``; ``post``
+sends it to a URL as a JSON body. A command that outlives its ``timeout``
+(default ``DEFAULT_TIMEOUT`` seconds) is killed together with its children.
+"""
+
+from datetime import datetime
+from pathlib import Path
+import json
+import os
+import queue
+import signal
+import threading
+import time
+
+from .history import HISTORY_DIR
+
+EVENTS = ("session-start", "session-end", "break-end")
+HOOKS_FILE = HISTORY_DIR / "hooks.json"
+DEFAULT_TIMEOUT = 10.0
+# How long a killed command's output is still read
+KILL_WAIT = 1.0
+
+
+class Hook:
+    """Base class for hooks: what to run, for which events, and for how long."""
+
+    def __init__(self, events, timeout: float = DEFAULT_TIMEOUT, name: str = None):
+        events = (events,) if isinstance(events, str) else tuple(events)
+        unknown = [event for event in events if event not in EVENTS]
+        if unknown or not events:
+            raise ValueError(f"Unknown hook event(s) {unknown}, expected some of {EVENTS}")
+        self.events = events
+        self.timeout = timeout
+        self.name = name or type(self).__name__
+        self.busy = False # Queued or running; further events are skipped meanwhile
+        self.skipped = 0
+
+    def call(self, payload: dict) -> None:
+        """Run the hook; called on a worker thread."""
+        raise NotImplementedError
+
+
+class CommandHook(Hook):
+    """Runs a shell command with the event in its environment."""
+
+    def __init__(self, command: str, events, timeout: float = DEFAULT_TIMEOUT):
+        super().__init__(events, timeout, name=command)
+        self.command = command
+
+    def call(self, payload: dict) -> None:
+        import subprocess # Only needed once a hook runs
+        env = dict(os.environ)
+        for key, value in payload.items():
+            env[f"TIMY_{key.upper()}"] = "" if value is None else str(value)
+        # Own process group, so a timeout also kills whatever the shell started
+        process = subprocess.Popen(self.command, shell=True, env=env, stdin=subprocess.DEVNULL,
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, start_new_session=True)
+        try:
+            _, err = process.communicate(timeout=self.timeout)
+        except subprocess.TimeoutExpired:
+            try:
+                os.killpg(process.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass # Only children that left the group are left
+            try:
+                process.communicate(timeout=KILL_WAIT)
+            except subprocess.TimeoutExpired:
+                # A child that left the group (setsid, nohup) still holds stderr; stop waiting for it
+                process.stderr.close()
+                process.wait()
+            raise TimeoutError(f"killed after {self.timeout:g}s") from None
+        if process.returncode:
+            raise RuntimeError(f"exit status {process.returncode}: {err.decode(errors='replace').strip()}")
+
+
+class PostHook(Hook):
+    """POSTs the event as JSON to a URL."""
+
+    def __init__(self, url: str, events, timeout: float = DEFAULT_TIMEOUT):
+        super().__init__(events, timeout, name=f"POST {url}")
+        self.url = url
+
+    def call(self, payload: dict) -> None:
+        import urllib.request
+        request = urllib.request.Request(self.url, data=json.dumps(payload).encode(), method="POST",
+                                         headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+
+class CallableHook(Hook):
+    """Calls ``fn(payload)`` in-process.
+
+    A Python call can't be interrupted: one that overruns its timeout is
+    reported, and its events are skipped until it returns.
+    """
+
+    def __init__(self, fn, events, timeout: float = DEFAULT_TIMEOUT):
+        super().__init__(events, timeout, name=getattr(fn, "__name__", None))
+        self.fn = fn
+
+    def call(self, payload: dict) -> None:
+        self.fn(payload)
+
+
+class HookBus:
+    """Hands session events to the hooks registered for them.
+
+    ``emit`` never blocks: the first event starts ``workers`` threads, jobs
+    wait in a queue of at most ``max_queue``, and an event is skipped for a
+    hook that is still busy with an earlier one.
+    """
+
+    def __init__(self, workers: int = 2, max_queue: int = 32, on_error=None):
+        self.hooks = []
+        self.workers = workers
+        self.dropped = 0 # Jobs refused because the queue was full or a hook was busy
+        self.timeouts = 0
+        self.failures = 0
+        self._on_error = on_error
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._threads = []
+
+    @property
+    def pending(self) -> int:
+        """Hook runs queued but not yet started."""
+        return self._queue.qsize()
+
+    def add(self, hook: Hook) -> Hook:
+        self.hooks.append(hook)
+        return hook
+
+    def emit(self, event: str, **fields) -> None:
+        """Queue every hook registered for ``event``; returns immediately."""
+        if event not in EVENTS:
+            raise ValueError(f"Unknown hook event {event!r}, expected one of {EVENTS}")
+        hooks = [hook for hook in self.hooks if event in hook.events]
+        if not hooks:
+            return
+        if not self._threads:
+            self.start()
+        payload = {"event": event, "time": datetime.now().isoformat(timespec="seconds"), **fields}
+        for hook in hooks:
+            if hook.busy:
+                hook.skipped += 1
+                self.dropped += 1
+                self._error(f"Hook {hook.name} is still busy; skipping {event}")
+                continue
+            hook.busy = True
+            try:
+                self._queue.put_nowait((hook, payload))
+            except queue.Full:
+                hook.busy = False
+                self.dropped += 1
+                self._error(f"Too many hooks pending; skipping {hook.name} for {event}")
+
+    def start(self) -> None:
+        if self._threads:
+            return
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"timy-hook-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def close(self, timeout: float = 1.0) -> None:
+        """Stop the workers once the queued hooks ran, waiting at most ``timeout`` in total.
+
+        Workers stuck in a hook are left behind; they are daemon threads.
+        """
+        if not self._threads:
+            return
+        for _ in self._threads:
+            try:
+                self._queue.put_nowait(None)
+            except queue.Full:
+                break # Workers are stuck anyway
+        deadline = time.monotonic() + timeout
+        for thread in self._threads:
+            thread.join(max(deadline - time.monotonic(), 0))
+        self._threads = []
+
+    def _run(self) -> None:
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            hook, payload = job
+            start = time.monotonic()
+            try:
+                hook.call(payload)
+            except TimeoutError as e:
+                self.timeouts += 1
+                self._error(f"Hook {hook.name} timed out on {payload['event']}: {e}")
+            except Exception as e:
+                self.failures += 1
+                self._error(f"Hook {hook.name} failed on {payload['event']}: {e}")
+            else:
+                elapsed = time.monotonic() - start
+                if elapsed > hook.timeout:
+                    self.timeouts += 1
+                    self._error(f"Hook {hook.name} took {elapsed:.1f}s on {payload['event']} (timeout {hook.timeout:g}s)")
+            finally:
+                hook.busy = False
+
+    def _error(self, message: str) -> None:
+        if self._on_error is not None:
+            self._on_error(message)
+
+
+def load_hooks(path: Path) -> list:
+    """The hooks configured in ``path`` (a JSON list); none if it doesn't exist."""
+    try:
+        entries = json.loads(Path(path).read_text())
+    except FileNotFoundError:
+        return []
+    if not isinstance(entries, list):
+        raise ValueError(f"{path} must hold a JSON list of hooks")
+    hooks = []
+    for entry in entries:
+        timeout = float(entry.get("timeout", DEFAULT_TIMEOUT))
+        if "run" in entry:
+            hooks.append(CommandHook(entry["run"], entry.get("on", EVENTS), timeout))
+        elif "post" in entry:
+            hooks.append(PostHook(entry["post"], entry.get("on", EVENTS), timeout))
+        else:
+            raise ValueError(f"Hook {entry} needs \"run\" or \"post\"")
+    return hooks
+
+
+def create_bus(on_error=None) -> HookBus:
+    """A bus with the hooks from ``TIMY_HOOKS`` (default ``~/.timy/hooks.json``)
+    and ``TIMY_HOOK_WORKERS`` threads."""
+    try:
+        workers = max(int(os.environ.get("TIMY_HOOK_WORKERS", "2")), 1)
+    except ValueError:
+        workers = 2
+    bus = HookBus(workers, on_error=on_error)
+    path = os.environ.get("TIMY_HOOKS")
+    try:
+        for hook in load_hooks(Path(path).expanduser() if path else HOOKS_FILE):
+            bus.add(hook)
+    except (OSError, ValueError, TypeError, AttributeError) as e:
+        if on_error is not None:
+            on_error(f"Error loading hooks: {e}")
+    return bus
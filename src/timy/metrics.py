@@ -0,0 +1,232 @@
+"""In-process counters and histograms with Prometheus text-format export.
+
+Recording a value is a few list operations, cheap enough for every frame.
+``MetricsExporter`` periodically writes ``Registry.render()`` to a file
+(e.g. for node_exporter's textfile collector) or serves it to whoever
+connects to a Unix socket.
+"""
+
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+import asyncio
+import bisect
+import os
+import tempfile
+import time
+
+# Seconds; spans sub-millisecond renders up to badly stalled wakeups
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+# Observations kept for the overlay's percentiles
+RECENT = 512
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self.value = 0
+
+    def inc(self, amount: int = 1) -> None:
+        self.value += amount
+
+    def samples(self):
+        yield self.name, self.value
+
+
+class Gauge:
+    """A value that is either set, or read from ``fn`` when exported."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, fn=None):
+        self.name = name
+        self.help = help
+        self.fn = fn
+        self._value = 0
+
+    @property
+    def value(self) -> float:
+        return self.fn() if self.fn is not None else self._value
+
+    def set(self, value: float) -> None:
+        self._value = value
+
+    def samples(self):
+        yield self.name, self.value
+
+
+class Histogram:
+    """Cumulative buckets for export, plus the most recent values for percentiles."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, buckets: tuple = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = buckets
+        self.bucket_counts = [0] * (len(buckets) + 1) # Last one is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.last = None
+        self.max = 0.0
+        self._recent = deque(maxlen=RECENT)
+
+    def observe(self, value: float) -> None:
+        self.bucket_counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.last = value
+        self.max = max(self.max, value)
+        self._recent.append(value)
+
+    @contextmanager
+    def time(self):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def percentile(self, q: float) -> float | None:
+        """``q``-quantile (0..1) of the last RECENT observations."""
+        recent = sorted(self._recent)
+        if not recent:
+            return None
+        return recent[min(int(q * len(recent)), len(recent) - 1)]
+
+    def samples(self):
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.bucket_counts):
+            cumulative += count
+            yield f'{self.name}_bucket{{le="{bound}"}}', cumulative
+        yield f'{self.name}_bucket{{le="+Inf"}}', self.count
+        yield f"{self.name}_sum", self.sum
+        yield f"{self.name}_count", self.count
+
+
+class Registry:
+    """Named metrics of one process; creating an existing name returns it."""
+
+    def __init__(self):
+        self._metrics = {}
+
+    def _get(self, cls, name: str, *args):
+        metric = self._metrics.get(name)
+        if metric is None:
+            metric = self._metrics[name] = cls(name, *args)
+        return metric
+
+    def counter(self, name: str, help: str) -> Counter:
+        return self._get(Counter, name, help)
+
+    def gauge(self, name: str, help: str, fn=None) -> Gauge:
+        return self._get(Gauge, name, help, fn)
+
+    def histogram(self, name: str, help: str, buckets: tuple = DEFAULT_BUCKETS) -> Histogram:
+        return self._get(Histogram, name, help, buckets)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for sample, value in metric.samples():
+                lines.append(f"{sample} {value}")
+        return "\n".join(lines) + "\n"
+
+
+class MetricsExporter:
+    """Publishes a Registry to a file or a Unix socket.
+
+    ``target`` is a file path, rewritten atomically every ``interval``
+    seconds (and once more on stop), or ``unix:PATH``, a socket that sends the
+    current metrics to each client that connects.
+    """
+
+    def __init__(self, registry: Registry, target: str, interval: float = 15.0, on_error=None):
+        self.registry = registry
+        self.target = target
+        self.interval = interval
+        self._on_error = on_error
+        self._task = None
+        self._server = None
+
+    @property
+    def socket_path(self) -> Path | None:
+        return Path(self.target[len("unix:"):]) if self.target.startswith("unix:") else None
+
+    def start(self) -> None:
+        """Start exporting; must be called from the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self.socket_path is not None:
+            self._task = loop.create_task(self._serve())
+        else:
+            self._task = loop.create_task(self._write_periodically())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+            self.socket_path.unlink(missing_ok=True)
+        elif self.socket_path is None:
+            self._write_file(self.registry.render())
+
+    async def _write_periodically(self) -> None:
+        while True:
+            # Rendered on the loop so metrics aren't read while being updated;
+            # written in a thread as the file may live on a slow mount
+            await asyncio.to_thread(self._write_file, self.registry.render())
+            await asyncio.sleep(self.interval)
+
+    def _write_file(self, text: str) -> None:
+        path = Path(self.target)
+        tmp = None
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+            with open(fd, "w") as f:
+                os.fchmod(fd, 0o644) # mkstemp's 0600 would hide it from a collector running as another user
+                f.write(text)
+            os.replace(tmp, path) # Scrapers never see a half-written file
+        except OSError as e:
+            if tmp is not None:
+                Path(tmp).unlink(missing_ok=True)
+            if self._on_error is not None:
+                self._on_error(f"Error writing metrics to {path}: {e}")
+
+    async def _serve(self) -> None:
+        path = self.socket_path
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.unlink(missing_ok=True)
+            self._server = await asyncio.start_unix_server(self._send, path=str(path))
+        except OSError as e:
+            if self._on_error is not None:
+                self._on_error(f"Error serving metrics on {path}: {e}")
+
+    async def _send(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        writer.write(self.registry.render().encode())
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+        writer.close()
+
+
+def create_exporter(registry: Registry, on_error=None) -> MetricsExporter | None:
+    """The exporter configured by ``TIMY_METRICS`` (and ``TIMY_METRICS_INTERVAL``), if any."""
+    target = os.environ.get("TIMY_METRICS")
+    if not target:
+        return None
+    try:
+        interval = float(os.environ.get("TIMY_METRICS_INTERVAL", "15"))
+    except ValueError:
+        interval = 15.0
+    return MetricsExporter(registry, target, interval, on_error)
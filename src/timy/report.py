@@ -0,0 +1,180 @@
+"""Team report over a directory tree of collected history files.
+
+Every ``history.log`` (counted together with its ``segments/`` when those
+were copied along), and every other ``*.log`` or ``*.log.gz`` file, is one
+user. Files are summarized in parallel by a process pool, and each worker
+uses the TUI's code: the bulk parser (``count_lines``) for per-day and
+per-hour counts, and ``SessionStats`` for streaks, averages and weekly
+totals. Only these compact summaries go back to the parent. The parent
+adds them up per day for the team and prints a table, optionally writing
+JSON too.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+from pathlib import Path
+import gzip
+import os
+
+from .bulk import count_lines
+from .history import READ_BLOCK
+from .segments import HistorySegments
+from .stats import SessionStats, sparkline
+
+DEFAULT_WEEKS = 8
+
+
+def find_histories(root: Path) -> list:
+    """``(user, path)`` for every history file under ``root``, sorted by user."""
+    root = Path(root)
+    found = []
+    for directory, subdirs, files in os.walk(root):
+        subdirs.sort()
+        if Path(directory).name == "segments" and "manifest.json" in files:
+            continue # Counted with the history.log next to it
+        for name in sorted(files):
+            if name.endswith((".log", ".log.gz")):
+                path = Path(directory, name)
+                found.append((_user_name(root, path), path))
+    return sorted(found)
+
+
+def _user_name(root: Path, path: Path) -> str:
+    relative = path.relative_to(root)
+    if path.name != "history.log":
+        parts = relative.parts[:-1] + (path.name.split(".")[0],)
+    else:
+        parts = relative.parts[:-1] or (root.resolve().name,)
+    # ~/.timy directories copied along with their owner's name
+    return "/".join(part for part in parts if part != ".timy") or path.name
+
+
+def summarize(user: str, path: Path, weeks: int = DEFAULT_WEEKS, today: date = None) -> dict:
+    """Totals, streaks and weekly counts of one user's history (runs in a worker)."""
+    today = today or date.today()
+    summary = {"user": user, "path": str(path)}
+    invalid = []
+    try:
+        days, hours = _count_file(path, invalid.append)
+        if path.name == "history.log":
+            segment_days, segment_hours = HistorySegments(path).totals()
+            for ordinal, count in segment_days.items():
+                days[ordinal] = days.get(ordinal, 0) + count
+            hours = [a + b for a, b in zip(hours, segment_hours)]
+    except (OSError, EOFError, ValueError) as e: # EOFError: truncated .gz
+        summary["error"] = str(e)
+        return summary
+    stats = SessionStats()
+    stats.record_counts(days, hours)
+    summary.update(_describe(stats, weeks, today))
+    summary["invalid"] = len(invalid)
+    summary["days"] = days # For the team totals; dropped from the per-user output
+    return summary
+
+
+def _count_file(path: Path, on_invalid) -> tuple:
+    """``({ordinal: count}, hours)`` of a whole file, read in fixed-size blocks."""
+    days, hours = {}, [0] * 24
+    opener = gzip.open if path.suffix == ".gz" else open
+    with opener(path, "rb") as f:
+        pending = b""
+        while block := f.read(READ_BLOCK):
+            block = pending + block
+            end = block.rfind(b"\n") + 1
+            pending = block[end:]
+            _add(days, hours, count_lines(block[:end], on_invalid))
+        if pending:
+            _add(days, hours, count_lines(pending + b"\n", on_invalid))
+    return days, hours
+
+
+def _add(days: dict, hours: list, counted: tuple) -> None:
+    for ordinal, count in counted[0].items():
+        days[ordinal] = days.get(ordinal, 0) + count
+    hours[:] = [a + b for a, b in zip(hours, counted[1])]
+
+
+def _describe(stats: SessionStats, weeks: int, today: date) -> dict:
+    active = sorted(stats.day_counts)
+    weekly = stats.weekly_totals(weeks, today)
+    return {
+        "records": sum(stats.day_counts.values()),
+        "active_days": len(active),
+        "first_day": active[0].isoformat() if active else None,
+        "last_day": active[-1].isoformat() if active else None,
+        "current_streak": stats.current_streak(today),
+        "longest_streak": stats.longest_streak,
+        "avg_7d": round(stats.rolling_average(7, today), 2),
+        "avg_30d": round(stats.rolling_average(30, today), 2),
+        "weekly": weekly,
+        "trend": _trend(weekly),
+        "hours": stats.hour_totals,
+    }
+
+
+def _trend(weekly: list) -> float | None:
+    """Change of the last complete week against the mean of the weeks before it."""
+    if len(weekly) < 3:
+        return None
+    earlier = sum(weekly[:-2]) / (len(weekly) - 2)
+    return round(weekly[-2] / earlier - 1, 3) if earlier else None
+
+
+def build_report(root: Path, weeks: int = DEFAULT_WEEKS, jobs: int = None, today: date = None) -> dict:
+    """Summarize every history under ``root`` with ``jobs`` processes (default: one per core)."""
+    today = today or date.today()
+    histories = find_histories(root)
+    jobs = jobs or os.cpu_count() or 1
+    args = ([user for user, _ in histories], [path for _, path in histories],
+            [weeks] * len(histories), [today] * len(histories))
+    if jobs == 1 or len(histories) <= 1:
+        summaries = list(map(summarize, *args))
+    else:
+        # Several files per task keeps the pickling overhead small next to the parsing
+        chunksize = max(1, len(histories) // (jobs * 4))
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            summaries = list(pool.map(summarize, *args, chunksize=chunksize))
+
+    team_days, team_hours = {}, [0] * 24
+    users, errors = [], []
+    for summary in summaries:
+        if "error" in summary:
+            errors.append({"user": summary["user"], "path": summary["path"], "error": summary["error"]})
+            continue
+        _add(team_days, team_hours, (summary.pop("days"), summary["hours"]))
+        users.append(summary)
+    team = SessionStats()
+    team.record_counts(team_days, team_hours)
+    start = today - timedelta(days=today.weekday() + 7 * (weeks - 1))
+    return {
+        "today": today.isoformat(),
+        "week_starts": [(start + timedelta(weeks=i)).isoformat() for i in range(weeks)],
+        "team": dict(_describe(team, weeks, today), users=len(users),
+                     active_this_week=sum(1 for user in users if user["weekly"][-1])),
+        "users": users,
+        "errors": errors,
+    }
+
+
+def format_table(report: dict) -> str:
+    """The report as a plain-text table: one row per user, then the team."""
+    header = (f"{'User':<20} {'Total':>7} {'Days':>5} {'Streak':>6} {'Longest':>7} "
+              f"{'Avg/7d':>6} {'Trend':>6}  Weeks since {report['week_starts'][0]} (this week last)")
+    lines = [header, "-" * len(header)]
+
+    def row(name: str, summary: dict) -> str:
+        trend = "" if summary["trend"] is None else f"{summary['trend']:+.0%}"
+        return (f"{name[:20]:<20} {summary['records']:>7} {summary['active_days']:>5} "
+                f"{summary['current_streak']:>6} {summary['longest_streak']:>7} "
+                f"{summary['avg_7d']:>6.1f} {trend:>6}  {sparkline(summary['weekly'])} {summary['weekly'][-1]}")
+
+    for user in report["users"]:
+        lines.append(row(user["user"], user))
+    team = report["team"]
+    lines.append("-" * len(header))
+    lines.append(row(f"Team ({team['users']})", team))
+    lines.append(f"{team['active_this_week']} of {team['users']} users active this week; "
+                 f"weekly totals: {', '.join(map(str, team['weekly']))}")
+    for error in report["errors"]:
+        lines.append(f"Skipped {error['path']}: {error['error']}")
+    return "\n".join(lines)
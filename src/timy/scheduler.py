@@ -0,0 +1,188 @@
+"""Many independent Pomodoro timers driven from one deadline queue.
+
+Each timer is a PomodoroSession. The scheduler keeps the running timers'
+deadlines in a heap and asks its host for exactly one wakeup, at the
+earliest of them. When it fires, every timer that is due switches phase and
+the next wakeup is armed. Starting, stopping or resetting a timer pushes a
+fresh heap entry and leaves the old one to be skipped when it surfaces, so
+every operation is O(log n) and a running timer costs nothing between its
+events: a hundred timers wake the loop no more often than their deadlines do.
+"""
+
+import heapq
+import itertools
+import re
+import time
+
+from .timer import PomodoroSession
+
+# ``name``, ``name:50`` or ``name:50/10`` (work/break minutes)
+_SPEC = re.compile(r"^([^:]+)(?::(\d+)(?:/(\d+))?)?$")
+# Shortest wakeup delay requested; a Textual timer with no delay at all divides by zero
+MIN_DELAY = 0.001
+
+
+def parse_timer_spec(spec: str) -> tuple:
+    """``(name, work, break)`` from ``NAME[:WORK[/BREAK]]``; durations may be None."""
+    match = _SPEC.match(spec.strip())
+    if match is None:
+        raise ValueError(f"Bad timer {spec!r}, expected NAME[:WORK[/BREAK]]")
+    name, work, brk = match.groups()
+    return name.strip(), int(work) if work else None, int(brk) if brk else None
+
+
+class ScheduledTimer:
+    """One named timer: its session, and which heap entry is current."""
+
+    def __init__(self, name: str, session: PomodoroSession):
+        self.name = name
+        self.session = session
+        self.generation = 0 # Heap entries of older generations are stale
+        self.completed = 0 # Work sessions finished
+
+    @property
+    def is_running(self) -> bool:
+        return self.session.timer.is_running
+
+
+class TimerScheduler:
+    """Runs any number of ScheduledTimers off one wakeup.
+
+    ``call_later(delay, callback)`` schedules the wakeup on the host loop and
+    returns a handle with ``stop()`` (Textual's ``set_timer``) or ``cancel()``
+    (asyncio's ``call_later``). ``on_done(timer, was_break)`` is called for
+    every phase switch.
+    """
+
+    def __init__(self, call_later, on_done=None, clock=time.monotonic):
+        self._call_later = call_later
+        self._on_done = on_done
+        self._clock = clock
+        self._timers = {}
+        self._heap = [] # (deadline, seq, generation, timer)
+        self._seq = itertools.count()
+        self._wakeup = None
+        self._armed_at = None # Deadline the pending wakeup is for
+        self.wakeups = 0
+        self.version = 0 # Bumped on every change, for cheap repaint checks
+
+    def __len__(self) -> int:
+        return len(self._timers)
+
+    def __iter__(self):
+        return iter(self._timers.values())
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._timers
+
+    def get(self, name: str) -> ScheduledTimer:
+        return self._timers[name]
+
+    @property
+    def running(self) -> int:
+        """Timers currently counting down."""
+        return sum(1 for timer in self._timers.values() if timer.is_running)
+
+    def add(self, name: str, work: int = None, brk: int = None, tag: str = None) -> ScheduledTimer:
+        """A new, stopped timer; its work sessions are logged with ``tag`` (default: ``name``)."""
+        if name in self._timers:
+            raise ValueError(f"There is already a timer called {name!r}")
+        session = PomodoroSession(work or 30, brk or 5, clock=self._clock)
+        session.tag = tag or name
+        timer = self._timers[name] = ScheduledTimer(name, session)
+        self.version += 1
+        return timer
+
+    def remove(self, name: str) -> None:
+        timer = self._timers.pop(name)
+        timer.generation += 1
+        self._changed()
+
+    def start(self, name: str) -> None:
+        timer = self._timers[name]
+        timer.session.timer.start()
+        self._push(timer)
+
+    def stop(self, name: str) -> None:
+        timer = self._timers[name]
+        timer.session.timer.stop()
+        self._push(timer)
+
+    def toggle(self, name: str) -> bool:
+        """Start or stop ``name``; returns whether it is running now."""
+        if self._timers[name].is_running:
+            self.stop(name)
+            return False
+        self.start(name)
+        return True
+
+    def reset(self, name: str) -> None:
+        timer = self._timers[name]
+        timer.session.reset()
+        self._push(timer)
+
+    def _push(self, timer: ScheduledTimer) -> None:
+        """Make ``timer``'s current deadline (if running) the only live heap entry."""
+        timer.generation += 1
+        if timer.is_running:
+            deadline = self._clock() + timer.session.timer.remaining()
+            heapq.heappush(self._heap, (deadline, next(self._seq), timer.generation, timer))
+        self._changed()
+
+    def _changed(self) -> None:
+        self.version += 1
+        # Stale entries are skipped lazily; rebuild once they dominate the heap
+        if len(self._heap) > 64 and len(self._heap) > 2 * len(self._timers):
+            self._heap = [entry for entry in self._heap if not self._stale(entry)]
+            heapq.heapify(self._heap)
+        self._rearm()
+
+    def _stale(self, entry: tuple) -> bool:
+        _, _, generation, timer = entry
+        return generation != timer.generation or self._timers.get(timer.name) is not timer
+
+    def _rearm(self) -> None:
+        """Keep exactly one wakeup pending, for the earliest live deadline."""
+        heap = self._heap
+        while heap and self._stale(heap[0]):
+            heapq.heappop(heap)
+        deadline = heap[0][0] if heap else None
+        if deadline == self._armed_at:
+            return
+        if self._wakeup is not None:
+            cancel = getattr(self._wakeup, "stop", None) or self._wakeup.cancel
+            cancel()
+            self._wakeup = None
+        self._armed_at = deadline
+        if deadline is not None:
+            self._wakeup = self._call_later(max(deadline - self._clock(), MIN_DELAY), self._fire)
+
+    def _fire(self) -> None:
+        self._wakeup = self._armed_at = None
+        self.wakeups += 1
+        now = self._clock()
+        due = []
+        heap = self._heap
+        while heap and heap[0][0] <= now:
+            entry = heapq.heappop(heap)
+            if self._stale(entry):
+                continue
+            timer = entry[3]
+            remaining = timer.session.timer.remaining()
+            if remaining > 0: # The host woke us a little early
+                heapq.heappush(heap, (now + remaining, next(self._seq), timer.generation, timer))
+                continue
+            due.append(timer)
+        switched = []
+        for timer in due:
+            was_break = timer.session.complete() # Stops the timer until it is started again
+            timer.generation += 1
+            if not was_break:
+                timer.completed += 1
+            switched.append((timer, was_break))
+        if switched:
+            self.version += 1
+        self._rearm()
+        if self._on_done is not None:
+            for timer, was_break in switched:
+                self._on_done(timer, was_break)
@@ -0,0 +1,390 @@
+"""Closed months of history, archived as compressed segment files.
+
+``history.log`` only holds the current month, plus any sessions logged late
+for an earlier one. Once a month is over, its lines move to
+``segments/YYYY-MM.<generation>.log.gz``, and ``segments/manifest.json``
+keeps a summary of each segment: per-day and per-hour counts and per-tag
+totals. Rebuilding the day store or the tag index reads the manifest
+instead of the segments, so startup cost is bounded by the current month,
+not by years of history. Only export and import read the segments.
+
+Every change is committed by replacing the manifest. New segment files, and
+the new log (``history.log.<generation>.next``), are written first. The log
+is installed right after the manifest is replaced. If a process crashes
+before the commit, only unreferenced files are left, and they are deleted.
+If it crashes after the commit, the next process to look installs the new
+log.
+"""
+
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+import json
+import os
+import re
+
+from .bulk import count_lines
+from .history import file_lock, parse_sessions
+
+MANIFEST_VERSION = 1
+_MONTH = re.compile(rb"\d{4}-(0[1-9]|1[0-2])")
+# Lines summarized at a time while writing a segment
+_SUMMARY_LINES = 4096
+# Segments written at once (each holds a file and a compressor); a log spanning
+# more finished months is rotated in several passes
+MAX_OPEN_SEGMENTS = 16
+
+
+def _empty_manifest() -> dict:
+    return {"version": MANIFEST_VERSION, "generation": 0, "segments": {}}
+
+
+class Summary:
+    """Per-day, per-hour and per-tag counts of a set of history lines."""
+
+    def __init__(self, entry: dict = None):
+        entry = entry or {}
+        self.records = entry.get("records", 0)
+        self.days = {int(ordinal): count for ordinal, count in entry.get("days", {}).items()}
+        self.hours = list(entry.get("hours", [0] * 24))
+        self.tags = {}
+        for tag, totals in entry.get("tags", {}).items():
+            self.tags[tag] = dict(totals, days={int(o): n for o, n in totals["days"].items()})
+
+    def add(self, data: bytes) -> None:
+        """Fold in complete lines; invalid ones are skipped silently."""
+        days, hours = count_lines(data)
+        for ordinal, count in days.items():
+            self.days[ordinal] = self.days.get(ordinal, 0) + count
+            self.records += count
+        self.hours = [a + b for a, b in zip(self.hours, hours)]
+        for record in parse_sessions(data, structured_only=True):
+            if record.tag is None:
+                continue
+            totals = self.tags.get(record.tag)
+            if totals is None:
+                totals = self.tags[record.tag] = {"count": 0, "seconds": 0, "interrupted": 0,
+                                                  "days": {}, "hours": [0] * 24}
+            totals["seconds"] += record.actual or 0
+            if record.interrupted:
+                totals["interrupted"] += 1
+            else:
+                totals["count"] += 1
+                ordinal = record.timestamp.toordinal()
+                totals["days"][ordinal] = totals["days"].get(ordinal, 0) + 1
+                totals["hours"][record.timestamp.hour] += 1
+
+    def entry(self) -> dict:
+        return {
+            "records": self.records,
+            "days": {str(ordinal): count for ordinal, count in sorted(self.days.items())},
+            "hours": self.hours,
+            "tags": {tag: dict(totals, days={str(o): n for o, n in sorted(totals["days"].items())})
+                     for tag, totals in self.tags.items()},
+        }
+
+
+class HistorySegments:
+    """The archived months of the history log at ``log_path``."""
+
+    def __init__(self, log_path: Path):
+        self.log_path = Path(log_path)
+        self.dir = self.log_path.parent / "segments"
+        self.manifest_path = self.dir / "manifest.json"
+        self._manifest = None
+        self._manifest_key = None
+        self._checked = None # (log inode, month, generation) of the last check that found nothing to do
+
+    def manifest(self) -> dict:
+        """The current manifest, re-read only when the file changed."""
+        try:
+            st = os.stat(self.manifest_path)
+        except FileNotFoundError:
+            self._manifest, self._manifest_key = _empty_manifest(), None
+            return self._manifest
+        key = (st.st_ino, st.st_mtime_ns, st.st_size)
+        if key != self._manifest_key:
+            with open(self.manifest_path, "rb") as f:
+                manifest = json.load(f)
+            if manifest.get("version") != MANIFEST_VERSION:
+                raise ValueError(f"Unsupported history manifest version in {self.manifest_path}")
+            self._manifest, self._manifest_key = manifest, key
+        return self._manifest
+
+    def generation(self) -> int:
+        return self.manifest()["generation"]
+
+    def totals(self, manifest: dict = None) -> tuple:
+        """``({ordinal: count}, hours)`` over all segments."""
+        days, hours = {}, [0] * 24
+        for entry in (manifest or self.manifest())["segments"].values():
+            for ordinal, count in entry["days"].items():
+                days[int(ordinal)] = days.get(int(ordinal), 0) + count
+            hours = [a + b for a, b in zip(hours, entry["hours"])]
+        return days, hours
+
+    def tag_totals(self, manifest: dict = None) -> dict:
+        """Per-tag count/seconds/interrupted, days and hours over all segments."""
+        tags = {}
+        for entry in (manifest or self.manifest())["segments"].values():
+            tags_entry = Summary({"tags": entry["tags"]}).tags
+            for tag, totals in tags_entry.items():
+                merged = tags.get(tag)
+                if merged is None:
+                    tags[tag] = totals
+                    continue
+                for field in ("count", "seconds", "interrupted"):
+                    merged[field] += totals[field]
+                for ordinal, count in totals["days"].items():
+                    merged["days"][ordinal] = merged["days"].get(ordinal, 0) + count
+                merged["hours"] = [a + b for a, b in zip(merged["hours"], totals["hours"])]
+        return tags
+
+    def files(self) -> list:
+        """Segment files, oldest month first."""
+        segments = self.manifest()["segments"]
+        return [self.dir / segments[month]["file"] for month in sorted(segments)]
+
+    def _next_log(self, generation: int) -> Path:
+        return self.log_path.with_name(f"{self.log_path.name}.{generation}.next")
+
+    # --- Writing --- #
+
+    def recover(self) -> bool:
+        """Finish or undo an interrupted commit; call with the log locked.
+
+        Returns True if a committed log was installed, which makes any
+        handle to the old log stale.
+        """
+        pending = self._next_log(self.generation())
+        installed = False
+        if pending.exists():
+            os.replace(pending, self.log_path)
+            installed = True
+        for stale in self.log_path.parent.glob(f"{self.log_path.name}.*.next"):
+            stale.unlink(missing_ok=True)
+        referenced = {entry["file"] for entry in self.manifest()["segments"].values()}
+        if self.dir.is_dir():
+            for path in self.dir.iterdir():
+                if path.name != self.manifest_path.name and path.name not in referenced:
+                    path.unlink(missing_ok=True)
+        return installed
+
+    def writer(self, month: str, fresh: bool = False, ordered: bool = False) -> "SegmentWriter":
+        """Start a commit: lines of months before ``month`` ("YYYY-MM") go to segments.
+
+        With ``fresh`` the existing segments are dropped (their lines are
+        expected to be written again); otherwise lines are added to them.
+        ``ordered`` promises lines in month order, so each segment is
+        finished as soon as the next month starts.
+        """
+        return SegmentWriter(self, month, fresh, ordered)
+
+    @contextmanager
+    def locked(self):
+        """The log, opened for appending with its lock held and any interrupted commit finished."""
+        self.log_path.parent.mkdir(parents=True, exist_ok=True)
+        with file_lock(self.log_path):
+            self.recover()
+            with open(self.log_path, "a+b") as log:
+                yield log
+
+    def rotate(self, now: datetime = None) -> int:
+        """Move the lines of finished months out of the log; returns how many moved.
+
+        Cheap when there is nothing to do: a stat, or reading the first lines
+        of the log. The first call on an old single-file history migrates it.
+        """
+        month = (now or datetime.now()).strftime("%Y-%m")
+        try:
+            with open(self.log_path, "rb") as f:
+                if self._checked == self._check_key(f, month) or not self._due(f, month):
+                    return 0
+        except FileNotFoundError:
+            return 0
+        with self.locked() as log:
+            if not self._due(log, month):
+                return 0
+            months, ordered = self._finished_months(log, month.encode())
+            writer = self.writer(month, ordered=ordered)
+            try:
+                # Out of order, one pass per batch of months keeps few segments open at a time
+                if ordered or len(months) <= MAX_OPEN_SEGMENTS:
+                    batches = [set(months)]
+                else:
+                    batches = [set(months[i:i + MAX_OPEN_SEGMENTS]) for i in range(0, len(months), MAX_OPEN_SEGMENTS)]
+                for i, batch in enumerate(batches):
+                    log.seek(0)
+                    for line in log:
+                        if line[:7] in batch or (i == 0 and not writer.archives(line)):
+                            writer.write(line)
+                    writer.finish()
+                writer.commit(os.fstat(log.fileno()).st_mode & 0o777)
+            except BaseException:
+                writer.abort()
+                raise
+        return writer.moved
+
+    @staticmethod
+    def _finished_months(log, month: bytes) -> tuple:
+        """The months before ``month`` with lines in ``log``, oldest first, and whether they are in order."""
+        log.seek(0)
+        months, last, ordered = set(), b"", True
+        for line in log:
+            line_month = line[:7]
+            if line_month != last and _MONTH.fullmatch(line_month) and line_month < month:
+                ordered = ordered and line_month > last
+                months.add(line_month)
+                last = line_month
+        return sorted(months), ordered
+
+    def _check_key(self, f, month: str) -> tuple:
+        return os.fstat(f.fileno()).st_ino, month, self.generation()
+
+    def _due(self, f, month: str) -> bool:
+        """Whether the log open as ``f`` starts with a finished month, or a commit is pending."""
+        if self._next_log(self.generation()).exists():
+            return True
+        f.seek(0)
+        for line in f.read(4096).split(b"\n"):
+            if _MONTH.match(line):
+                if line[:7].decode() < month:
+                    return True
+                self._checked = self._check_key(f, month)
+                return False
+        return False
+
+
+class _Segment:
+    """One month's segment file being written, optionally extending an older one."""
+
+    def __init__(self, path: Path, previous: Path = None, entry: dict = None):
+        # Only needed when writing, which the headless commands rarely do
+        import gzip
+        import shutil
+
+        self.path = path
+        self.summary = Summary(entry)
+        # Reopening a finished segment appends a gzip member to it
+        self._file = open(path, "ab" if previous == path else "wb")
+        if previous is not None and previous != path:
+            with open(previous, "rb") as old:
+                shutil.copyfileobj(old, self._file) # gzip members concatenate
+        self._gzip = gzip.GzipFile(fileobj=self._file, mode="wb", compresslevel=6)
+        self._pending = []
+
+    def write(self, line: bytes) -> None:
+        self._gzip.write(line)
+        self._pending.append(line)
+        if len(self._pending) >= _SUMMARY_LINES:
+            self._summarize()
+
+    def _summarize(self) -> None:
+        self.summary.add(b"".join(self._pending))
+        self._pending = []
+
+    def close(self) -> None:
+        if self._file.closed:
+            return
+        self._summarize()
+        self._gzip.close()
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+
+
+class SegmentWriter:
+    """Routes history lines to segments or the next log, then commits them together."""
+
+    def __init__(self, segments: HistorySegments, month: str, fresh: bool, ordered: bool = False):
+        self.segments = segments
+        self.month = month.encode()
+        base = segments.manifest()
+        self.generation = base["generation"] + 1
+        self.moved = 0
+        self._committed = False
+        self._base = {} if fresh else base["segments"]
+        self._ordered = ordered
+        self._open = {} # month -> _Segment, least recently used first
+        self._done = {} # month -> finished _Segment
+        segments.dir.mkdir(parents=True, exist_ok=True)
+        self._log_path = segments._next_log(self.generation)
+        self._log = open(self._log_path, "wb", buffering=1 << 16)
+
+    def archives(self, line: bytes) -> bool:
+        """Whether ``line`` goes to a segment rather than the next log."""
+        month = line[:7]
+        return bool(_MONTH.fullmatch(month)) and month < self.month
+
+    def write(self, line: bytes) -> None:
+        if not self.archives(line):
+            self._log.write(line)
+            return
+        month = line[:7]
+        segment = self._open.pop(month, None)
+        if segment is None:
+            if self._ordered:
+                self.finish() # No more lines for the earlier months
+            elif len(self._open) >= MAX_OPEN_SEGMENTS:
+                oldest = next(iter(self._open))
+                self._done[oldest] = self._open.pop(oldest)
+                self._done[oldest].close()
+            done = self._done.pop(month, None)
+            if done is not None:
+                segment = _Segment(done.path, done.path, done.summary.entry())
+            else:
+                name = month.decode()
+                entry = self._base.get(name)
+                previous = self.segments.dir / entry["file"] if entry is not None else None
+                path = self.segments.dir / f"{name}.{self.generation}.log.gz"
+                segment = _Segment(path, previous, entry)
+        self._open[month] = segment # Now the most recently used
+        segment.write(line if line.endswith(b"\n") else line + b"\n")
+        self.moved += 1
+
+    def finish(self) -> None:
+        """Close the segments being written; they are still committed together."""
+        for month, segment in self._open.items():
+            segment.close()
+            self._done[month] = segment
+        self._open = {}
+
+    def commit(self, log_mode: int = 0o644) -> None:
+        """Make the new segments and log current; call with the log locked."""
+        self.finish()
+        segments = dict(self._base)
+        for month, segment in self._done.items():
+            segments[month.decode()] = dict(segment.summary.entry(), file=segment.path.name)
+        self._log.flush()
+        os.fsync(self._log.fileno())
+        self._log.close()
+        os.chmod(self._log_path, log_mode)
+
+        import tempfile
+
+        manifest = {"version": MANIFEST_VERSION, "generation": self.generation, "segments": segments}
+        fd, tmp = tempfile.mkstemp(dir=self.segments.dir, prefix=".manifest-")
+        try:
+            with open(fd, "w") as f:
+                json.dump(manifest, f, separators=(",", ":"))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.segments.manifest_path) # The commit point
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        self._committed = True
+        self.segments.recover() # Installs the new log and deletes replaced segments
+
+    def abort(self) -> None:
+        """Delete what was written, unless it was committed already (recover finishes that)."""
+        if self._committed:
+            return
+        for segment in [*self._open.values(), *self._done.values()]:
+            try:
+                segment.close()
+            except OSError:
+                pass
+            segment.path.unlink(missing_ok=True)
+        self._log.close()
+        self._log_path.unlink(missing_ok=True)
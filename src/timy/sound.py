@@ -0,0 +1,248 @@
+from pathlib import Path
+import array
+import math
+import os
+import queue
+import shutil
+import subprocess
+import sys
+import threading
+import time
+import wave
+
+
+# Clip played when a work session ends / when a break ends
+WORK_OVER = "work_over"
+BREAK_OVER = "break_over"
+
+
+class SoundBackend:
+    """Base class for notification sound backends.
+
+    Clips are prepared once when the worker starts. ``play`` only enqueues the clip name;
+    a single long-lived worker thread plays them one after another. The queue is
+    bounded, so a burst of completions drops sounds rather than piling up work.
+    """
+
+    QUEUE_SIZE = 4
+
+    def __init__(self, on_error=None):
+        self._on_error = on_error
+        self._queue = queue.Queue(maxsize=self.QUEUE_SIZE)
+        self._worker = None
+
+    @property
+    def pending(self) -> int:
+        """Clips queued but not yet played."""
+        return self._queue.qsize()
+
+    def start(self) -> None:
+        """Start the worker thread, which prepares the clips before playing any."""
+        if self._worker is not None:
+            return
+        self._worker = threading.Thread(target=self._run, name="timy-sound", daemon=True)
+        self._worker.start()
+
+    def close(self) -> None:
+        """Stop the worker after the clips already queued have played."""
+        if self._worker is None:
+            return
+        deadline = time.monotonic() + 2
+        try:
+            self._queue.put_nowait(None)
+        except queue.Full:
+            # Wait for room until the deadline; the worker may be stuck (e.g. opening a busy device)
+            try:
+                self._queue.put(None, timeout=2)
+            except queue.Full:
+                pass
+        self._worker.join(timeout=max(deadline - time.monotonic(), 0))
+        alive = self._worker.is_alive()
+        self._worker = None
+        if not alive: # Otherwise it may still be playing the clips
+            self.unload()
+
+    def play(self, clip: str) -> None:
+        """Queue ``clip`` for playback without blocking the caller."""
+        if self._worker is None:
+            self.start()
+        try:
+            self._queue.put_nowait(clip)
+        except queue.Full:
+            pass # Already plenty of sound queued; skip this one
+
+    def _run(self) -> None:
+        # Loading happens here so opening a player or device never blocks the UI
+        try:
+            self.load()
+        except Exception as e:
+            self._error(f"Error loading notification sounds: {e}")
+        while True:
+            clip = self._queue.get()
+            if clip is None:
+                return
+            try:
+                self.play_now(clip)
+            except Exception as e:
+                self._error(f"Error playing sound {clip}: {e}")
+
+    def _error(self, message: str) -> None:
+        if self._on_error is not None:
+            self._on_error(message)
+
+    # Hooks for subclasses; called from start/close and the worker thread
+
+    def load(self) -> None:
+        pass
+
+    def unload(self) -> None:
+        pass
+
+    def play_now(self, clip: str) -> None:
+        raise NotImplementedError
+
+
+class NullBackend(SoundBackend):
+    """Plays nothing, but remembers what was requested (useful in tests)."""
+
+    def __init__(self, on_error=None):
+        super().__init__(on_error)
+        self.played = []
+
+    def play_now(self, clip: str) -> None:
+        self.played.append(clip)
+
+
+class AfplayBackend(SoundBackend):
+    """macOS backend using the system sounds and ``afplay``."""
+
+    CLIPS = {
+        BREAK_OVER: "/System/Library/Sounds/Glass.aiff",
+        WORK_OVER: "/System/Library/Sounds/Ping.aiff",
+    }
+    VOLUME = "5" # Adjust this value as needed (e.g., "1.5", "3")
+
+    def __init__(self, on_error=None):
+        super().__init__(on_error)
+        self._afplay = None
+        self._clips = {}
+
+    def load(self) -> None:
+        self._afplay = shutil.which("afplay")
+        if self._afplay is None:
+            raise FileNotFoundError("'afplay' command not found")
+        self._clips = {name: path for name, path in self.CLIPS.items() if Path(path).exists()}
+
+    def play_now(self, clip: str) -> None:
+        path = self._clips.get(clip)
+        if self._afplay is None or path is None:
+            return
+        subprocess.run([self._afplay, "-v", self.VOLUME, path], check=True, capture_output=True)
+
+
+class PcmBackend(SoundBackend):
+    """Writes raw PCM (signed 16-bit little-endian, mono) to a pipe or device.
+
+    By default a single ``pacat``/``aplay`` process is started and fed through
+    its stdin for the whole session. Passing ``device`` writes to that file
+    instead (e.g. a FIFO read by another player). Clips are synthesized chimes
+    unless ``clips`` maps names to WAV files in the same format.
+    """
+
+    RATE = 22050
+    PLAYERS = (
+        ["pacat", "--raw", "--format=s16le", f"--rate={RATE}", "--channels=1"],
+        ["aplay", "-q", "-t", "raw", "-f", "S16_LE", "-r", str(RATE), "-c", "1"],
+    )
+
+    def __init__(self, device: str = None, clips: dict = None, on_error=None):
+        super().__init__(on_error)
+        self._device = device
+        self._clip_files = clips or {}
+        self._pcm = {}
+        self._process = None
+        self._out = None
+
+    @classmethod
+    def available(cls) -> bool:
+        return any(shutil.which(player[0]) for player in cls.PLAYERS)
+
+    def _tone(self, notes, duration: float = 0.18, volume: float = 0.4) -> bytes:
+        samples = array.array("h")
+        per_note = int(self.RATE * duration)
+        for freq in notes:
+            for i in range(per_note):
+                fade = 1.0 - i / per_note # Linear decay to avoid clicks
+                samples.append(int(32767 * volume * fade * math.sin(2 * math.pi * freq * i / self.RATE)))
+        if sys.byteorder != "little":
+            samples.byteswap()
+        return samples.tobytes()
+
+    def _read_wav(self, path) -> bytes:
+        with wave.open(str(path), "rb") as w:
+            if (w.getframerate(), w.getsampwidth(), w.getnchannels()) != (self.RATE, 2, 1):
+                raise ValueError(f"{path} must be {self.RATE} Hz, 16-bit mono")
+            return w.readframes(w.getnframes())
+
+    def load(self) -> None:
+        self._pcm = {
+            BREAK_OVER: self._tone((660, 880)),
+            WORK_OVER: self._tone((880, 1320, 1760)),
+        }
+        for name, path in self._clip_files.items():
+            self._pcm[name] = self._read_wav(path)
+        self._open_output()
+
+    def _open_output(self) -> None:
+        if self._device is not None:
+            self._out = open(self._device, "wb", buffering=0)
+            return
+        for player in self.PLAYERS:
+            if shutil.which(player[0]):
+                self._process = subprocess.Popen(
+                    player, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                )
+                self._out = self._process.stdin
+                return
+        raise FileNotFoundError("No PCM player found (tried pacat, aplay)")
+
+    def unload(self) -> None:
+        if self._out is not None:
+            try:
+                self._out.close()
+            except OSError:
+                pass
+            self._out = None
+        if self._process is not None:
+            try:
+                self._process.wait(timeout=2)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+            self._process = None
+
+    def play_now(self, clip: str) -> None:
+        pcm = self._pcm.get(clip)
+        if pcm is None or self._out is None:
+            return
+        try:
+            self._out.write(pcm)
+            self._out.flush()
+        except BrokenPipeError:
+            # Player went away (e.g. audio server restarted); reopen once
+            self.unload()
+            self._open_output()
+            self._out.write(pcm)
+            self._out.flush()
+
+
+def create_backend(on_error=None) -> SoundBackend:
+    """Pick a backend from ``TIMY_SOUND`` (afplay/pcm/null) or the platform."""
+    choice = os.environ.get("TIMY_SOUND", "").lower()
+    if choice == "null":
+        return NullBackend(on_error)
+    if choice == "afplay" or (not choice and sys.platform == "darwin"):
+        return AfplayBackend(on_error)
+    device = os.environ.get("TIMY_SOUND_DEVICE")
+    if choice == "pcm" or (not choice and (device or PcmBackend.available())):
+        return PcmBackend(device=device, on_error=on_error)
+    return NullBackend(on_error)
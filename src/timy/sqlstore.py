@@ -0,0 +1,331 @@
+"""History in one SQLite database (``TIMY_HISTORY=sqlite``).
+
+Sessions are rows of ``sessions``; triggers keep the number of completed
+sessions per day (``day_counts``, clustered on the day ordinal) and per hour
+of day (``hour_counts``) up to date. The graph window, range totals and the
+first day are range scans of ``day_counts``, so reading never gets slower as
+history grows. Per-tag views use the index on ``(tag, day)``.
+
+The database is in WAL mode: any number of processes read while one
+writes, and each append is one short transaction. Other processes' appends
+are found by id (ids only grow), so an ``update`` is two indexed lookups
+when nothing changed. Rewrites (an import) bump ``generation`` in ``meta``,
+which makes every process reload.
+"""
+
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import date, datetime
+from pathlib import Path
+import sqlite3
+import threading
+
+from .history import DayCounts, SessionRecord
+
+SCHEMA_VERSION = 1
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts TEXT NOT NULL, -- ISO-8601, as in the text log
+    day INTEGER NOT NULL, -- date.toordinal() of ts
+    hour INTEGER NOT NULL,
+    tag TEXT,
+    planned INTEGER,
+    actual INTEGER,
+    interrupted INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS sessions_tag ON sessions (tag, day) WHERE tag IS NOT NULL;
+CREATE TABLE IF NOT EXISTS day_counts (day INTEGER PRIMARY KEY, count INTEGER NOT NULL) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS hour_counts (hour INTEGER PRIMARY KEY, count INTEGER NOT NULL) WITHOUT ROWID;
+CREATE TRIGGER IF NOT EXISTS sessions_insert AFTER INSERT ON sessions WHEN NOT new.interrupted BEGIN
+    INSERT INTO day_counts VALUES (new.day, 1) ON CONFLICT (day) DO UPDATE SET count = count + 1;
+    INSERT INTO hour_counts VALUES (new.hour, 1) ON CONFLICT (hour) DO UPDATE SET count = count + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS sessions_delete AFTER DELETE ON sessions WHEN NOT old.interrupted BEGIN
+    UPDATE day_counts SET count = count - 1 WHERE day = old.day;
+    DELETE FROM day_counts WHERE day = old.day AND count = 0;
+    UPDATE hour_counts SET count = count - 1 WHERE hour = old.hour;
+END;
+INSERT OR IGNORE INTO meta VALUES ('schema', {version}), ('generation', 0);
+"""
+_INSERT = "INSERT INTO sessions (ts, day, hour, tag, planned, actual, interrupted) VALUES (?, ?, ?, ?, ?, ?, ?)"
+# PRAGMA synchronous per durability mode; in WAL mode NORMAL only syncs at checkpoints
+_SYNCHRONOUS = {"none": "NORMAL", "batch": "FULL", "record": "FULL"}
+
+
+def _row(record: SessionRecord) -> tuple:
+    timestamp = record.timestamp
+    return (timestamp.isoformat(), timestamp.toordinal(), timestamp.hour, record.tag,
+            record.planned, record.actual, int(record.interrupted))
+
+
+class SqliteStore:
+    """History store backed by a SQLite database; see ``timy.storage``."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.watch_path = self.path.with_name(self.path.name + "-wal") # Every commit writes here
+        self.version = 0 # Bumped on every change, for cheap cache checks
+        self._db = None
+        self._synchronous = None
+        self._lock = threading.RLock() # One connection, shared with the writer thread
+        self._listeners = []
+        self._generation = None
+        self._last_id = 0 # Highest session id this process's listeners have heard about
+
+    def add_listener(self, listener) -> None:
+        self._listeners.append(listener)
+
+    def open(self) -> None:
+        if self._db is not None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._errors():
+            db = sqlite3.connect(self.path, timeout=10, isolation_level=None, check_same_thread=False)
+            try:
+                db.execute("PRAGMA journal_mode=WAL")
+                db.executescript("BEGIN IMMEDIATE;" + _SCHEMA.format(version=SCHEMA_VERSION) + "COMMIT;")
+                (schema,) = db.execute("SELECT value FROM meta WHERE key = 'schema'").fetchone()
+            except BaseException:
+                db.close()
+                raise
+        if schema != SCHEMA_VERSION:
+            db.close()
+            raise ValueError(f"Unsupported history database version {schema} in {self.path}")
+        self._db = db
+
+    @contextmanager
+    def _errors(self):
+        """Report database failures as OSError, like the file-based backend."""
+        try:
+            yield
+        except sqlite3.DatabaseError as e:
+            raise OSError(f"{self.path}: {e}") from e
+
+    @contextmanager
+    def _locked(self):
+        self.open()
+        with self._lock, self._errors():
+            yield self._db
+
+    @contextmanager
+    def _transaction(self, db: sqlite3.Connection):
+        db.execute("BEGIN IMMEDIATE") # Take the write lock up front instead of upgrading later
+        try:
+            yield
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        db.execute("COMMIT")
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    # --- Reading --- #
+
+    def update(self, on_invalid=None) -> int:
+        """Tell listeners about sessions other processes added; returns how many."""
+        with self._locked() as db:
+            db.execute("BEGIN") # One snapshot for both queries
+            try:
+                (generation,) = db.execute("SELECT value FROM meta WHERE key = 'generation'").fetchone()
+                (last_id,) = db.execute("SELECT coalesce(max(id), 0) FROM sessions").fetchone()
+                if generation != self._generation:
+                    # First sync, or the history was rewritten
+                    self._generation = generation
+                    self._last_id = last_id
+                    days, hours = self._totals(db)
+                    for listener in self._listeners:
+                        listener.reset()
+                        listener.record_counts(days, hours)
+                    self.version += 1
+                    return sum(days.values())
+                if last_id == self._last_id:
+                    return 0
+                days, hours = {}, [0] * 24
+                rows = db.execute("SELECT day, hour FROM sessions WHERE id > ? AND NOT interrupted", (self._last_id,))
+                for day, hour in rows:
+                    days[day] = days.get(day, 0) + 1
+                    hours[hour] += 1
+                self._last_id = last_id
+            finally:
+                db.execute("COMMIT")
+        if days:
+            for listener in self._listeners:
+                listener.record_counts(days, hours)
+        self.version += 1
+        return sum(hours)
+
+    def _totals(self, db: sqlite3.Connection) -> tuple:
+        return dict(db.execute("SELECT day, count FROM day_counts")), self._hours(db)
+
+    def _hours(self, db: sqlite3.Connection) -> list:
+        hours = [0] * 24
+        for hour, count in db.execute("SELECT hour, count FROM hour_counts"):
+            hours[hour] = count
+        return hours
+
+    def window(self, start: date, end: date) -> dict:
+        """Return the non-zero day counts between ``start`` and ``end`` inclusive."""
+        with self._locked() as db:
+            rows = db.execute("SELECT day, count FROM day_counts WHERE day BETWEEN ? AND ?",
+                              (start.toordinal(), end.toordinal())).fetchall()
+        counts = defaultdict(int)
+        for day, count in rows:
+            counts[date.fromordinal(day)] = count
+        return counts
+
+    def range_total(self, start: date, end: date) -> int:
+        """Number of records between ``start`` and ``end`` inclusive."""
+        with self._locked() as db:
+            (total,) = db.execute("SELECT coalesce(sum(count), 0) FROM day_counts WHERE day BETWEEN ? AND ?",
+                                  (start.toordinal(), end.toordinal())).fetchone()
+        return total
+
+    def first_day(self) -> date | None:
+        with self._locked() as db:
+            (day,) = db.execute("SELECT min(day) FROM day_counts").fetchone()
+        return date.fromordinal(day) if day is not None else None
+
+    def hours(self) -> tuple:
+        with self._locked() as db:
+            return tuple(self._hours(db))
+
+    def sessions(self, on_invalid=None):
+        """Every SessionRecord, in the order they were written."""
+        self.open()
+        # A connection of its own: a long export must not hold up appends
+        with self._errors():
+            db = sqlite3.connect(self.path, timeout=10)
+        try:
+            with self._errors():
+                rows = db.execute("SELECT ts, tag, planned, actual, interrupted FROM sessions ORDER BY id")
+                while batch := rows.fetchmany(4096):
+                    for ts, tag, planned, actual, interrupted in batch:
+                        try:
+                            yield SessionRecord(datetime.fromisoformat(ts), tag, planned, actual, bool(interrupted))
+                        except ValueError:
+                            if on_invalid is not None:
+                                on_invalid(ts)
+        finally:
+            db.close()
+
+    def tag_index(self) -> "SqliteTags":
+        return SqliteTags(self)
+
+    # --- Writing --- #
+
+    def write(self, records: list, durability: str = "none") -> list:
+        """Insert SessionRecords; returns their ids. May run in another thread."""
+        rows = [_row(record) for record in records]
+        ids = []
+        with self._locked() as db:
+            if self._synchronous != durability:
+                db.execute(f"PRAGMA synchronous={_SYNCHRONOUS[durability]}")
+                self._synchronous = durability
+            if durability == "record":
+                for row in rows:
+                    with self._transaction(db):
+                        ids.append(db.execute(_INSERT, row).lastrowid)
+            else:
+                with self._transaction(db):
+                    ids = [db.execute(_INSERT, row).lastrowid for row in rows]
+        return ids
+
+    def record_written(self, records: list, ids: list) -> None:
+        """Tell listeners about sessions ``write`` inserted.
+
+        Only while no other process's sessions came in between; otherwise
+        the next ``update`` reports them all in order.
+        """
+        with self._lock:
+            for record, session_id in zip(records, ids):
+                if session_id != self._last_id + 1 or self._generation is None:
+                    break
+                self._last_id = session_id
+                if not record.interrupted:
+                    for listener in self._listeners:
+                        listener.record(record.timestamp)
+            self.version += 1
+
+    def merge(self, sources: list, fmt: str = None, memory: int = None, on_invalid=None, records=None):
+        """Add the records of files (and of another store) and drop duplicates, in one transaction.
+
+        Nothing is sorted in memory: SQLite finds the duplicates with a
+        temporary index, which spills to disk when it is large.
+        """
+        from .transfer import ImportResult, key_record, read_keys
+        result = ImportResult()
+
+        def rows():
+            for source in sources:
+                for key in read_keys(Path(source), fmt, result, on_invalid):
+                    yield _row(key_record(key))
+            for record in records or ():
+                result.read += 1
+                yield _row(record)
+
+        with self._locked() as db, self._transaction(db):
+            (existing,) = db.execute("SELECT count(*) FROM sessions").fetchone()
+            db.executemany(_INSERT, rows())
+            result.read += existing
+            db.execute("DELETE FROM sessions WHERE id NOT IN (SELECT min(id) FROM sessions "
+                       "GROUP BY ts, tag, planned, actual, interrupted)")
+            (result.written,) = db.execute("SELECT count(*) FROM sessions").fetchone()
+            db.execute("UPDATE meta SET value = value + 1 WHERE key = 'generation'")
+        self.update()
+        return result
+
+
+class SqliteTags:
+    """Per-tag totals and day counts queried from a SqliteStore.
+
+    Totals are reloaded (one grouped query over tagged sessions) when the
+    store changed; a tag's day counts are loaded when it is first shown.
+    """
+
+    def __init__(self, store: SqliteStore):
+        self.store = store
+        self.totals = {}
+        self.version = 0
+        self._views = {}
+        self._store_version = None
+
+    def update(self, on_invalid=None) -> int:
+        if self._store_version == self.store.version:
+            return 0
+        from .tags import TagTotals
+        with self.store._locked() as db:
+            rows = db.execute("SELECT tag, sum(NOT interrupted), sum(coalesce(actual, 0)), sum(interrupted) "
+                              "FROM sessions WHERE tag IS NOT NULL GROUP BY tag").fetchall()
+        self.totals = {}
+        for tag, count, seconds, interrupted in rows:
+            totals = self.totals[tag] = TagTotals()
+            totals.count, totals.seconds, totals.interrupted = count, seconds, interrupted
+        self._views = {}
+        self._store_version = self.store.version
+        self.version += 1
+        return 0
+
+    def tags(self) -> list:
+        """All tags seen so far, sorted."""
+        return sorted(self.totals)
+
+    def view(self, tag: str) -> DayCounts:
+        """Day counts of ``tag``, with the read interface of DayCountStore."""
+        view = self._views.get(tag)
+        if view is None:
+            with self.store._locked() as db:
+                days = db.execute("SELECT day, count(*) FROM sessions WHERE tag = ? AND NOT interrupted "
+                                  "GROUP BY day", (tag,)).fetchall()
+                hours = [0] * 24
+                for hour, count in db.execute("SELECT hour, count(*) FROM sessions WHERE tag = ? "
+                                              "AND NOT interrupted GROUP BY hour", (tag,)):
+                    hours[hour] = count
+            view = self._views[tag] = DayCounts()
+            view.load(days, hours)
+        return view
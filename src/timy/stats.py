@@ -0,0 +1,141 @@
+from datetime import datetime, date, timedelta
+from collections import defaultdict
+
+from .history import DayCountStore
+
+_SPARK = " ▁▂▃▄▅▆▇█"
+
+
+def sparkline(values) -> str:
+    """One block character per value, scaled to the largest."""
+    values = list(values) # The initial history load may still be adding to them
+    top = max(values) or 1
+    return "".join(_SPARK[round(v * (len(_SPARK) - 1) / top)] for v in values)
+
+
+class SessionStats:
+    """Derived statistics kept up to date one record at a time.
+
+    The initial state is read from the day store (per-day and per-hour
+    counters), never from the text log. Attached to a store it then receives
+    each new record, which costs O(1) (amortized, via union-find over the
+    runs of active days) regardless of history size.
+    """
+
+    def __init__(self):
+        self.version = 0 # Bumped on every change, for cheap cache checks
+        self.reset()
+
+    def reset(self, store: DayCountStore = None) -> None:
+        """Clear everything, then reload the totals from ``store`` if given."""
+        self.day_counts = defaultdict(int)
+        self.weekday_totals = [0] * 7 # Monday = 0
+        self.hour_totals = [0] * 24
+        self.longest_streak = 0
+        self._parent = {} # Union-find over the ordinals of active days
+        self._size = {}
+        if store is not None:
+            first_day = store.first_day()
+            if first_day is not None:
+                for day, count in store.window(first_day, date.max).items():
+                    self._add_day(day, count)
+            self.hour_totals = list(store.hours())
+        self.version += 1
+
+    def attach(self, store: DayCountStore) -> None:
+        """Load the current totals from ``store`` and follow its new records."""
+        self.reset(store)
+        store.add_listener(self)
+
+    def record(self, timestamp: datetime) -> None:
+        """Fold in one completed Pomodoro."""
+        self._add_day(timestamp.date(), 1)
+        self.hour_totals[timestamp.hour] += 1
+        self.version += 1
+
+    def record_counts(self, days: dict, hours: list) -> None:
+        """Fold in a block of records: ``{ordinal: count}`` and hour-of-day counts."""
+        day_counts = self.day_counts
+        weekday_totals = self.weekday_totals
+        fresh = [] # Days that had no records yet
+        for ordinal, count in days.items():
+            day = date.fromordinal(ordinal)
+            if not day_counts[day]:
+                fresh.append(ordinal)
+            day_counts[day] += count
+            weekday_totals[(ordinal + 6) % 7] += count # date.weekday() without the call
+        # Each run of consecutive new days joins one set directly; only the
+        # days just before and after a run can belong to an existing set
+        fresh.sort()
+        parent, size = self._parent, self._size
+        start = previous = None
+        for ordinal in fresh + [None]:
+            if ordinal is not None and ordinal - 1 == previous:
+                parent[ordinal] = start
+                size[start] += 1
+            else:
+                if start is not None:
+                    for neighbour in (start - 1, previous + 1):
+                        if neighbour in parent:
+                            self._union(start, neighbour)
+                    self.longest_streak = max(self.longest_streak, size[self._find(start)])
+                if ordinal is not None:
+                    parent[ordinal] = start = ordinal
+                    size[ordinal] = 1
+            previous = ordinal
+        self.hour_totals = [a + b for a, b in zip(self.hour_totals, hours)]
+        self.version += 1
+
+    def _add_day(self, day: date, count: int) -> None:
+        self.weekday_totals[day.weekday()] += count
+        first = self.day_counts[day] == 0
+        self.day_counts[day] += count
+        if first:
+            ordinal = day.toordinal()
+            self._parent[ordinal] = ordinal
+            self._size[ordinal] = 1
+            for neighbour in (ordinal - 1, ordinal + 1):
+                if neighbour in self._parent:
+                    self._union(ordinal, neighbour)
+            self.longest_streak = max(self.longest_streak, self._size[self._find(ordinal)])
+
+    def _find(self, ordinal: int) -> int:
+        root = ordinal
+        while self._parent[root] != root:
+            root = self._parent[root]
+        while self._parent[ordinal] != root: # Path compression
+            self._parent[ordinal], ordinal = root, self._parent[ordinal]
+        return root
+
+    def _union(self, a: int, b: int) -> None:
+        a, b = self._find(a), self._find(b)
+        if a == b:
+            return
+        if self._size[a] < self._size[b]:
+            a, b = b, a
+        self._parent[b] = a
+        self._size[a] += self._size[b]
+
+    def current_streak(self, today: date = None) -> int:
+        """Consecutive active days up to today (or yesterday, if today is still empty)."""
+        today = today or date.today()
+        for day in (today, today - timedelta(days=1)):
+            ordinal = day.toordinal()
+            if ordinal in self._parent:
+                return self._size[self._find(ordinal)]
+        return 0
+
+    def rolling_average(self, days: int, today: date = None) -> float:
+        """Mean Pomodoros per day over the last ``days`` days including today."""
+        today = today or date.today()
+        total = sum(self.day_counts.get(today - timedelta(days=i), 0) for i in range(days))
+        return total / days
+
+    def weekly_totals(self, weeks: int, today: date = None) -> list:
+        """Pomodoros per week (Monday to Sunday) for the last ``weeks`` weeks, this one last."""
+        today = today or date.today()
+        start = today - timedelta(days=today.weekday() + 7 * (weeks - 1))
+        totals = [0] * weeks
+        for i in range(7 * weeks):
+            totals[i // 7] += self.day_counts.get(start + timedelta(days=i), 0)
+        return totals
@@ -0,0 +1,133 @@
+"""History backends, and picking one.
+
+The TUI, the daemon and the CLI only talk to a *history store*:
+
+* reading: ``window(start, end)``, ``range_total(start, end)``,
+  ``first_day()`` and ``hours()``, the per-day interface of DayCountStore;
+* ``update(on_invalid)`` picks up what other processes wrote, and objects
+  passed to ``add_listener`` hear about every record (``record``,
+  ``record_counts``, ``reset``);
+* appending: ``write(records, durability)`` does the I/O and may run in a
+  thread, then ``record_written(records, receipt)`` counts them;
+* ``sessions()`` streams every SessionRecord (export, migration),
+  ``merge(...)`` imports files, ``tag_index()`` gives the per-tag views;
+* ``path`` is the store's file and ``watch_path`` the file that changes on
+  writes by other processes (None when there is nothing to watch).
+
+Backends (``TIMY_HISTORY``):
+
+``log``
+    The plain text log with its day-count sidecar and monthly segments
+    (``history.DayCountStore``). The default.
+``sqlite``
+    One SQLite database in WAL mode (``timy.sqlstore``). Readers never block
+    the writer, and every query is answered from an index on day.
+``memory``
+    Nothing on disk, for tests and benchmarks.
+
+``TIMY_HISTORY_PATH`` overrides the file of the configured backend;
+``timy migrate`` copies a history from one backend to another.
+"""
+
+from pathlib import Path
+import os
+import threading
+
+from .history import DAYS_FILE, HISTORY_DIR, HISTORY_FILE, DayCountStore, DayCounts
+
+BACKENDS = ("log", "sqlite", "memory")
+SQLITE_FILE = HISTORY_DIR / "history.db"
+
+
+def configured_backend() -> tuple:
+    """``(backend, path)`` from ``TIMY_HISTORY`` and ``TIMY_HISTORY_PATH``."""
+    backend = os.environ.get("TIMY_HISTORY", "log").lower() or "log"
+    path = os.environ.get("TIMY_HISTORY_PATH")
+    return backend, Path(path).expanduser() if path else None
+
+
+def open_store(backend: str = None, path: Path = None):
+    """The history store of ``backend`` at ``path`` (default: the configured one).
+
+    Nothing is read yet; call ``update`` to sync it with its files.
+    """
+    if backend is None:
+        backend, configured_path = configured_backend()
+        path = path or configured_path
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown history backend {backend!r}, expected one of {BACKENDS}")
+    if backend == "log":
+        if not path:
+            return DayCountStore(DAYS_FILE, HISTORY_FILE)
+        return DayCountStore(Path(path).with_suffix(".days"), path) # history.log -> history.days
+    if backend == "sqlite":
+        from .sqlstore import SqliteStore # sqlite3 is only imported when it is used
+        return SqliteStore(Path(path) if path else SQLITE_FILE)
+    return MemoryStore()
+
+
+class MemoryStore(DayCounts):
+    """A history store that keeps everything in memory."""
+
+    watch_path = None
+
+    def __init__(self):
+        super().__init__()
+        self._records = []
+        self._listeners = []
+        self._tags = None
+        self._lock = threading.Lock()
+
+    def add_listener(self, listener) -> None:
+        self._listeners.append(listener)
+
+    def write(self, records: list, durability: str = "none") -> None:
+        with self._lock:
+            self._records.extend(records)
+
+    def record_written(self, records: list, receipt=None) -> None:
+        for record in records:
+            if self._tags is not None:
+                self._tags.add(record)
+            if record.interrupted:
+                continue
+            self.add(record.timestamp.toordinal(), record.timestamp.hour)
+            for listener in self._listeners:
+                listener.record(record.timestamp)
+
+    def sessions(self, on_invalid=None):
+        with self._lock:
+            return iter(list(self._records))
+
+    def tag_index(self):
+        from .tags import TagCounts
+        if self._tags is None:
+            self._tags = TagCounts()
+            for record in self.sessions():
+                self._tags.add(record)
+        return self._tags
+
+    def merge(self, sources: list, fmt: str = None, memory: int = None, on_invalid=None, records=None):
+        """Merge files (and SessionRecords) into the history, sorted and without duplicates."""
+        from .transfer import ImportResult, key_record, read_keys, record_keys
+        result = ImportResult()
+        keys = set(record_keys(self.sessions(), result))
+        for source in sources:
+            keys.update(read_keys(Path(source), fmt, result, on_invalid))
+        if records is not None:
+            keys.update(record_keys(records, result))
+        merged = [key_record(key) for key in sorted(keys)]
+        result.written = len(merged)
+        with self._lock:
+            self._records = []
+        self.load([], [0] * 24)
+        if self._tags is not None:
+            self._tags.clear()
+        for listener in self._listeners:
+            listener.reset()
+        self.write(merged)
+        self.record_written(merged)
+        return result
+
+    def close(self) -> None:
+        pass
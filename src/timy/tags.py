@@ -0,0 +1,99 @@
+from pathlib import Path
+
+from .history import DayCounts, HistoryTail, SessionRecord, parse_sessions
+from .segments import HistorySegments
+
+
+class TagTotals:
+    """Lifetime totals for one tag."""
+
+    __slots__ = ("count", "seconds", "interrupted")
+
+    def __init__(self):
+        self.count = 0 # Completed sessions
+        self.seconds = 0 # Actual focus time, interrupted sessions included
+        self.interrupted = 0
+
+
+class TagCounts:
+    """Per-tag totals and day counts, fed one SessionRecord at a time.
+
+    Switching the graph to another tag or asking for a tag's totals is a
+    dictionary lookup. Used as is by the in-memory history backend.
+    """
+
+    def __init__(self):
+        self.version = 0 # Bumped on every change, for cheap cache checks
+        self.clear()
+
+    def clear(self) -> None:
+        self._days = {} # tag -> DayCounts of completed sessions
+        self.totals = {} # tag -> TagTotals
+        self.version += 1
+
+    def update(self, on_invalid=None) -> int:
+        return 0 # Filled in by whoever owns the counts
+
+    def add(self, record: SessionRecord) -> None:
+        if record.tag is None:
+            return
+        totals = self.totals.get(record.tag)
+        if totals is None:
+            totals = self.totals[record.tag] = TagTotals()
+            self._days[record.tag] = DayCounts()
+        totals.seconds += record.actual or 0
+        if record.interrupted:
+            totals.interrupted += 1
+        else:
+            totals.count += 1
+            self._days[record.tag].add(record.timestamp.toordinal(), record.timestamp.hour)
+        self.version += 1
+
+    def tags(self) -> list:
+        """All tags seen so far, sorted."""
+        return sorted(self.totals)
+
+    def view(self, tag: str) -> DayCounts:
+        """Day counts of ``tag``, with the read interface of DayCountStore."""
+        return self._days.get(tag) or DayCounts()
+
+
+class TagIndex(TagCounts, HistoryTail):
+    """Per-tag, per-day counts of the tagged sessions in the history log.
+
+    Built with one pass over the log, in which bare-timestamp lines are
+    skipped without being parsed, and afterwards tailed like the day store.
+    Finished months start from the segment manifest's per-tag summaries.
+    """
+
+    def __init__(self, path: Path):
+        HistoryTail.__init__(self, path)
+        self.segments = HistorySegments(path)
+        TagCounts.__init__(self)
+
+    def reset(self) -> None:
+        HistoryTail.reset(self)
+        self.clear()
+
+    def clear(self) -> None:
+        super().clear()
+        self._generation = self.segments.generation()
+        for tag, summary in self.segments.tag_totals().items():
+            totals = self.totals[tag] = TagTotals()
+            totals.count = summary["count"]
+            totals.seconds = summary["seconds"]
+            totals.interrupted = summary["interrupted"]
+            self._days[tag] = DayCounts()
+            self._days[tag].load(summary["days"].items(), summary["hours"])
+
+    def update(self, on_invalid=None) -> int:
+        if self.segments.generation() != self._generation:
+            self.reset() # Lines moved into segments (or an import rewrote them)
+        return HistoryTail.update(self, on_invalid)
+
+    def _parse(self, data: bytes, on_invalid=None):
+        # Invalid lines are reported by the day store, which reads the same log
+        return parse_sessions(data, structured_only=True)
+
+    def _add_record(self, record: SessionRecord) -> None:
+        self.add(record)
@@ -0,0 +1,152 @@
+from datetime import datetime, timedelta
+import math
+import time
+
+from .history import SessionRecord
+
+
+class TimerCore:
+    """Countdown timer driven by a monotonic deadline instead of tick counting.
+
+    ``time_left`` is always derived from the deadline, so a late or missed
+    wakeup never makes the timer run slow. Callers ask ``next_wakeup`` how long
+    to sleep until the displayed second changes, and report each wakeup through
+    ``record_wakeup`` so drift and wakeup rate can be inspected.
+    """
+
+    def __init__(self, duration: timedelta, clock=time.monotonic):
+        self._clock = clock
+        self._remaining = duration.total_seconds()
+        self._deadline = None # Set while running
+        self._scheduled_at = None # Monotonic time the next wakeup is due
+        self._created = clock()
+        self.wakeups = 0
+        self.last_drift = 0.0
+        self.max_drift = 0.0
+
+    @property
+    def is_running(self) -> bool:
+        return self._deadline is not None
+
+    def remaining(self) -> float:
+        """Seconds left, never negative."""
+        if self._deadline is None:
+            return self._remaining
+        return max(self._deadline - self._clock(), 0.0)
+
+    @property
+    def time_left(self) -> timedelta:
+        return timedelta(seconds=self.remaining())
+
+    @time_left.setter
+    def time_left(self, value: timedelta) -> None:
+        self._remaining = max(value.total_seconds(), 0.0)
+        if self._deadline is not None:
+            self._deadline = self._clock() + self._remaining
+
+    def display_seconds(self) -> int:
+        """Whole seconds to show; 30:00 stays visible for the first second."""
+        return math.ceil(self.remaining())
+
+    def start(self) -> None:
+        if self._deadline is None:
+            self._deadline = self._clock() + self._remaining
+
+    def stop(self) -> None:
+        if self._deadline is not None:
+            self._remaining = self.remaining()
+            self._deadline = None
+            self._scheduled_at = None
+
+    def next_wakeup(self, step: int = 1) -> float | None:
+        """Delay until the next visible boundary of ``step`` seconds, or None when stopped."""
+        if self._deadline is None:
+            return None
+        remaining = self.remaining()
+        delay = remaining - (math.ceil(remaining / step) - 1) * step if remaining > 0 else 0.0
+        self._scheduled_at = self._clock() + delay
+        return delay
+
+    def record_wakeup(self) -> None:
+        """Note a wakeup and how late it was relative to its schedule."""
+        self.wakeups += 1
+        if self._scheduled_at is not None:
+            self.last_drift = max(self._clock() - self._scheduled_at, 0.0)
+            self.max_drift = max(self.max_drift, self.last_drift)
+            self._scheduled_at = None
+
+    @property
+    def wakeups_per_hour(self) -> float:
+        elapsed = self._clock() - self._created
+        return self.wakeups * 3600 / elapsed if elapsed > 0 else 0.0
+
+
+class PomodoroSession:
+    """Work/break state machine around a TimerCore.
+
+    Shared by the TUI's TimerDisplay and the daemon so both switch phases the
+    same way. ``state``/``apply_state`` convert to and from the plain dict used
+    on the daemon socket.
+    """
+
+    def __init__(self, work_duration: int = 30, break_duration: int = 5, clock=time.monotonic):
+        self.work_duration = work_duration
+        self.break_duration = break_duration
+        self.is_break = False
+        self.tag = None # Written with each work session when set
+        self.timer = TimerCore(timedelta(minutes=work_duration), clock)
+
+    def reset(self) -> None:
+        """Stop and go back to the start of a work session."""
+        self.timer.stop()
+        self.is_break = False
+        self.timer.time_left = timedelta(minutes=self.work_duration)
+
+    def complete(self) -> bool:
+        """Switch phase once the countdown ran out; returns whether a break just ended."""
+        self.timer.stop()
+        was_break = self.is_break
+        self.is_break = not was_break
+        minutes = self.break_duration if self.is_break else self.work_duration
+        self.timer.time_left = timedelta(minutes=minutes)
+        return was_break
+
+    def at_start(self) -> bool:
+        """Whether the timer sits at the very start of a work session."""
+        return not self.is_break and self.timer.remaining() >= self.work_duration * 60
+
+    def hook_fields(self) -> dict:
+        """What hooks are told about the session along with each event."""
+        return {"tag": self.tag, "work": self.work_duration, "break": self.break_duration}
+
+    def interrupted_seconds(self) -> int:
+        """Seconds already worked in an unfinished work session, else 0."""
+        if self.is_break:
+            return 0
+        return max(int(self.work_duration * 60 - self.timer.remaining()), 0)
+
+    def record(self, when: datetime, interrupted: bool = False) -> SessionRecord:
+        """The history record for a work session that ended (or was cut short) at ``when``."""
+        if self.tag is None and not interrupted:
+            return SessionRecord(when)
+        planned = self.work_duration * 60
+        actual = self.interrupted_seconds() if interrupted else planned
+        return SessionRecord(when, self.tag, planned, actual, interrupted)
+
+    def state(self) -> dict:
+        return {
+            "run": self.timer.is_running,
+            "brk": self.is_break,
+            "left": round(self.timer.remaining(), 3),
+            "work": self.work_duration,
+            "break": self.break_duration,
+        }
+
+    def apply_state(self, state: dict) -> None:
+        self.timer.stop()
+        self.is_break = state["brk"]
+        self.work_duration = state["work"]
+        self.break_duration = state["break"]
+        self.timer.time_left = timedelta(seconds=state["left"])
+        if state["run"]:
+            self.timer.start()
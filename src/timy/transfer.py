@@ -0,0 +1,352 @@
+"""Streaming export and import of history logs.
+
+Records are converted one at a time, so exporting never holds more than one
+record in memory. Both cover the whole history: the compressed segments of
+finished months, then the log. Importing merges the history with any number
+of inputs through an external merge sort: sorted runs of at most
+``memory`` bytes are spilled to temporary files and then merged, at most
+``FAN_IN`` at a time, into sorted segments and a log without duplicates.
+
+Formats: ``log`` (the native history format), ``csv``, ``jsonl`` and
+``bin``, a compact binary form (``BIN_MAGIC``, then per record: microseconds
+since 1970-01-01 of the wall-clock time, UTC offset in minutes or
+``NAIVE`` and the length of the JSON extras, followed by the extras).
+"""
+
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+import csv
+import gzip
+import heapq
+import io
+import json
+import os
+import struct
+import tempfile
+
+from .history import HISTORY_FILE, SessionRecord
+from .segments import HistorySegments
+
+FORMATS = ("log", "csv", "jsonl", "bin")
+BIN_MAGIC = b"TIMYREC1"
+NAIVE = -32768 # UTC offset marker for timestamps without a timezone
+_BIN_RECORD = struct.Struct("<qhH")
+_EPOCH = datetime(1970, 1, 1)
+_EXTENSIONS = {".log": "log", ".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl", ".bin": "bin"}
+_CSV_FIELDS = ("timestamp", "tag", "planned", "actual", "interrupted")
+# Rough in-memory size of one sort key, used to turn the memory budget into a run length
+_KEY_BYTES = 200
+# How many sorted runs are merged at once
+FAN_IN = 64
+DEFAULT_MEMORY = 64 << 20
+
+
+class ImportResult:
+    """Counts reported by ``import_logs``."""
+
+    def __init__(self):
+        self.read = 0 # Valid records in the log and the inputs
+        self.written = 0
+        self.invalid = 0
+        self.runs = 0
+
+    @property
+    def duplicates(self) -> int:
+        return self.read - self.written
+
+
+def format_for(path: Path) -> str | None:
+    """The format implied by ``path``'s extension (ignoring ``.gz``), if any."""
+    path = Path(path)
+    if path.suffix.lower() == ".gz":
+        path = path.with_suffix("")
+    return _EXTENSIONS.get(path.suffix.lower())
+
+
+def detect_format(path: Path) -> str:
+    """Guess an input file's format from its extension, or its first bytes."""
+    fmt = format_for(path)
+    if fmt is not None:
+        return fmt
+    with _open(path) as f:
+        return "bin" if f.read(len(BIN_MAGIC)) == BIN_MAGIC else "log"
+
+
+def _open(path: Path):
+    """Open ``path`` for binary reading, decompressing ``.gz`` files (such as segments)."""
+    return gzip.open(path, "rb") if Path(path).suffix.lower() == ".gz" else open(path, "rb")
+
+
+# --- Sort keys --- #
+# A record travels through the merge as (micros, offset, extras): it sorts by
+# wall-clock time, and equal keys are duplicates.
+
+def record_key(record: SessionRecord) -> tuple:
+    timestamp = record.timestamp
+    offset = timestamp.utcoffset()
+    micros = (timestamp.replace(tzinfo=None) - _EPOCH) // timedelta(microseconds=1)
+    extras = record.to_line().partition(b"\t")[2].rstrip(b"\n")
+    return micros, NAIVE if offset is None else offset // timedelta(minutes=1), extras
+
+
+def key_record(key: tuple) -> SessionRecord:
+    return SessionRecord.from_line(key_line(key).decode().rstrip("\n"))
+
+
+def key_line(key: tuple) -> bytes:
+    """The native log line for a sort key."""
+    micros, offset, extras = key
+    timestamp = _EPOCH + timedelta(microseconds=micros)
+    if offset != NAIVE:
+        timestamp = timestamp.replace(tzinfo=timezone(timedelta(minutes=offset)))
+    line = timestamp.isoformat().encode()
+    return line + b"\t" + extras + b"\n" if extras else line + b"\n"
+
+
+def _write_bin_key(f, key: tuple) -> None:
+    micros, offset, extras = key
+    f.write(_BIN_RECORD.pack(micros, offset, len(extras)))
+    f.write(extras)
+
+
+def _read_bin_keys(f):
+    if f.read(len(BIN_MAGIC)) != BIN_MAGIC:
+        raise ValueError("not a timy binary export")
+    while header := f.read(_BIN_RECORD.size):
+        if len(header) < _BIN_RECORD.size:
+            raise ValueError("truncated binary export")
+        micros, offset, length = _BIN_RECORD.unpack(header)
+        yield micros, offset, f.read(length)
+
+
+# --- Reading --- #
+
+def read_keys(path: Path, fmt: str = None, result: ImportResult = None, on_invalid=None):
+    """Stream the sort keys of every valid record in ``path``."""
+    fmt = fmt or detect_format(path)
+    with _open(path) as f:
+        yield from _file_keys(f, fmt, result, on_invalid)
+
+
+def _file_keys(f, fmt: str, result: ImportResult = None, on_invalid=None):
+    if fmt == "bin":
+        yield from _counted(_read_bin_keys(f), result)
+        return
+    if fmt == "log":
+        records = _read_log(f, result, on_invalid)
+    elif fmt == "csv":
+        records = _read_rows(csv.DictReader(io.TextIOWrapper(f, "utf-8", newline="")), result, on_invalid)
+    elif fmt == "jsonl":
+        records = _read_rows(_json_lines(f, result, on_invalid), result, on_invalid)
+    else:
+        raise ValueError(f"Unknown format {fmt!r}, expected one of {FORMATS}")
+    yield from record_keys(records, result)
+
+
+def _counted(keys, result: ImportResult):
+    for key in keys:
+        if result is not None:
+            result.read += 1
+        yield key
+
+
+def record_keys(records, result: ImportResult = None):
+    """The sort keys of SessionRecords coming from another history store."""
+    return _counted(map(record_key, records), result)
+
+
+def _invalid(result: ImportResult, on_invalid, line: str) -> None:
+    if result is not None:
+        result.invalid += 1
+    if on_invalid is not None:
+        on_invalid(line)
+
+
+def _read_log(f, result: ImportResult, on_invalid):
+    for raw in f:
+        line = raw.decode("utf-8", errors="replace").strip()
+        if not line:
+            continue
+        try:
+            yield SessionRecord.from_line(line)
+        except ValueError:
+            _invalid(result, on_invalid, line)
+
+
+def _json_lines(f, result: ImportResult, on_invalid):
+    for raw in f:
+        line = raw.decode("utf-8", errors="replace").strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        if isinstance(row, dict):
+            yield row
+        else:
+            _invalid(result, on_invalid, line)
+
+
+def _read_rows(rows, result: ImportResult, on_invalid):
+    """SessionRecords from CSV/JSON Lines rows with the export's column names."""
+    for row in rows:
+        try:
+            interrupted = row.get("interrupted")
+            if isinstance(interrupted, str):
+                interrupted = interrupted.strip().lower() in ("1", "true", "yes")
+            yield SessionRecord(
+                datetime.fromisoformat(row["timestamp"]),
+                row.get("tag") or None,
+                int(row["planned"]) if row.get("planned") not in (None, "") else None,
+                int(row["actual"]) if row.get("actual") not in (None, "") else None,
+                bool(interrupted),
+            )
+        except (KeyError, TypeError, ValueError):
+            _invalid(result, on_invalid, json.dumps(row))
+
+
+# --- Export --- #
+
+def read_history(path: Path = HISTORY_FILE, on_invalid=None):
+    """Every SessionRecord of the history log at ``path``, oldest segment first."""
+    for segment in HistorySegments(path).files():
+        with _open(segment) as f:
+            yield from _read_log(f, None, on_invalid)
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return
+    with f:
+        yield from _read_log(f, None, on_invalid)
+
+
+def export_log(out, fmt: str = "log", path: Path = HISTORY_FILE, on_invalid=None) -> int:
+    """Stream the records of the history at ``path`` to the binary file object ``out``; returns the count."""
+    return export_records(out, fmt, read_history(path, on_invalid))
+
+
+def export_records(out, fmt: str, records) -> int:
+    """Write SessionRecords to the binary file object ``out`` in ``fmt``; returns the count."""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format {fmt!r}, expected one of {FORMATS}")
+    count = 0
+    if fmt == "bin":
+        out.write(BIN_MAGIC)
+        for key in record_keys(records):
+            _write_bin_key(out, key)
+            count += 1
+        return count
+    text = io.TextIOWrapper(out, "utf-8", newline="", write_through=True)
+    writer = csv.writer(text) if fmt == "csv" else None
+    if writer is not None:
+        writer.writerow(_CSV_FIELDS)
+    for record in records:
+        if fmt == "log":
+            text.write(record.to_line().decode())
+        elif fmt == "csv":
+            writer.writerow([
+                record.timestamp.isoformat(), record.tag or "",
+                "" if record.planned is None else record.planned,
+                "" if record.actual is None else record.actual,
+                int(record.interrupted),
+            ])
+        else:
+            row = {"timestamp": record.timestamp.isoformat(), "tag": record.tag,
+                   "planned": record.planned, "actual": record.actual,
+                   "interrupted": record.interrupted}
+            text.write(json.dumps(row, separators=(",", ":")) + "\n")
+        count += 1
+    text.detach() # Leave ``out`` open for the caller
+    return count
+
+
+# --- Import --- #
+
+def _spill(keys: list, directory: str) -> str:
+    """Sort ``keys``, drop duplicates and write them to a new run file."""
+    keys.sort()
+    fd, run = tempfile.mkstemp(dir=directory, suffix=".run")
+    with open(fd, "wb", buffering=1 << 16) as f:
+        f.write(BIN_MAGIC)
+        previous = None
+        for key in keys:
+            if key != previous:
+                _write_bin_key(f, key)
+                previous = key
+    return run
+
+
+def _merge_runs(runs: list, write) -> int:
+    """Merge sorted run files, calling ``write(key)`` once per distinct key."""
+    files = [open(run, "rb", buffering=1 << 16) for run in runs]
+    try:
+        written, previous = 0, None
+        for key in heapq.merge(*(_read_bin_keys(f) for f in files)):
+            if key != previous:
+                write(key)
+                written += 1
+                previous = key
+        return written
+    finally:
+        for f in files:
+            f.close()
+
+
+def import_logs(sources: list, fmt: str = None, path: Path = HISTORY_FILE,
+                memory: int = DEFAULT_MEMORY, on_invalid=None, records=None) -> ImportResult:
+    """Merge ``sources`` into the history at ``path`` in bounded memory.
+
+    The history is rewritten sorted and without duplicates (with no sources
+    it is just compacted) into new segments and a new log, which atomically
+    replace the old ones. Appends by running timy instances wait on the
+    log's lock meanwhile and then go to the new log. Lines that can't be
+    parsed are dropped and counted. ``records`` adds SessionRecords read
+    from another history store (see ``timy migrate``).
+    """
+    path = Path(path)
+    segments = HistorySegments(path)
+    result = ImportResult()
+    run_length = max(memory // _KEY_BYTES, 1024)
+    with segments.locked() as log, \
+            tempfile.TemporaryDirectory(dir=path.parent, prefix=".import-") as scratch:
+        runs, keys = [], []
+        log.seek(0)
+        inputs = [read_keys(segment, "log", result, on_invalid) for segment in segments.files()]
+        inputs.append(_file_keys(log, "log", result, on_invalid))
+        inputs += [read_keys(Path(source), fmt, result, on_invalid) for source in sources]
+        if records is not None:
+            inputs.append(record_keys(records, result))
+        for source in inputs:
+            for key in source:
+                keys.append(key)
+                if len(keys) >= run_length:
+                    runs.append(_spill(keys, scratch))
+                    keys = []
+        if keys or not runs:
+            runs.append(_spill(keys, scratch))
+        del keys
+        result.runs = len(runs)
+
+        # Merge passes until one run is left
+        while len(runs) > FAN_IN:
+            merged = []
+            for i in range(0, len(runs), FAN_IN):
+                group = runs[i:i + FAN_IN]
+                fd, run = tempfile.mkstemp(dir=scratch, suffix=".run")
+                with open(fd, "wb", buffering=1 << 16) as f:
+                    f.write(BIN_MAGIC)
+                    _merge_runs(group, lambda key: _write_bin_key(f, key))
+                for old in group:
+                    os.unlink(old)
+                merged.append(run)
+            runs = merged
+
+        writer = segments.writer(datetime.now().strftime("%Y-%m"), fresh=True, ordered=True)
+        try:
+            result.written = _merge_runs(runs, lambda key: writer.write(key_line(key)))
+            writer.commit(os.fstat(log.fileno()).st_mode & 0o777)
+        except BaseException:
+            writer.abort()
+            raise
+    return result
@@ -0,0 +1,119 @@
+from pathlib import Path
+import asyncio
+import ctypes
+import ctypes.util
+import os
+import struct
+import sys
+
+# inotify(7) constants
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = 0o2000000
+_EVENT = struct.Struct("iIII")
+
+
+def _inotify_libc():
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1, libc.inotify_add_watch # Make sure both exist
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+
+class HistoryWatcher:
+    """Calls ``callback`` on the event loop when the history log changes.
+
+    Uses inotify on the history directory where available, and otherwise
+    polls ``os.stat`` of the log every ``poll_interval`` seconds. inotify
+    does not see writes made by other NFS clients, so ``TIMY_WATCH=poll``
+    forces polling for shared network homes.
+    """
+
+    def __init__(self, path: Path, callback, poll_interval: float = 0.5, mode: str = None):
+        self.path = Path(path)
+        self.poll_interval = poll_interval
+        self._callback = callback
+        self._mode = mode or os.environ.get("TIMY_WATCH", "auto")
+        self._fd = None
+        self._task = None
+        self._loop = None
+
+    @property
+    def backend(self) -> str | None:
+        """``"inotify"``, ``"poll"`` or None when not started."""
+        if self._fd is not None:
+            return "inotify"
+        return "poll" if self._task is not None else None
+
+    def start(self) -> None:
+        """Start watching; must be called from the running event loop."""
+        self._loop = asyncio.get_running_loop()
+        if self._mode != "poll" and self._start_inotify():
+            return
+        self._task = self._loop.create_task(self._poll())
+
+    def stop(self) -> None:
+        if self._fd is not None:
+            self._loop.remove_reader(self._fd)
+            os.close(self._fd)
+            self._fd = None
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def _start_inotify(self) -> bool:
+        libc = _inotify_libc()
+        if libc is None:
+            return False
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            return False
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        mask = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+        if libc.inotify_add_watch(fd, os.fsencode(self.path.parent), mask) < 0:
+            os.close(fd)
+            return False
+        self._fd = fd
+        self._loop.add_reader(fd, self._on_inotify)
+        return True
+
+    def _on_inotify(self) -> None:
+        name = os.fsencode(self.path.name)
+        changed = False
+        try:
+            while True:
+                data = os.read(self._fd, 4096)
+                pos = 0
+                while pos < len(data):
+                    _, _, _, length = _EVENT.unpack_from(data, pos)
+                    pos += _EVENT.size
+                    changed |= data[pos:pos + length].rstrip(b"\0") == name
+                    pos += length
+        except BlockingIOError:
+            pass
+        # One callback per burst of events
+        if changed:
+            self._callback()
+
+    def _signature(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return st.st_ino, st.st_size, st.st_mtime_ns
+
+    async def _poll(self) -> None:
+        last = self._signature()
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            current = self._signature()
+            if current != last:
+                last = current
+                self._callback()
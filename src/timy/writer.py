@@ -0,0 +1,128 @@
+from datetime import datetime
+import asyncio
+
+from .history import SessionRecord
+
+# When to fsync the history log
+DURABILITY_MODES = ("none", "batch", "record")
+# A failed write is retried after this many seconds, doubling up to MAX_RETRY_DELAY
+RETRY_DELAY = 1.0
+MAX_RETRY_DELAY = 60.0
+
+
+class HistoryWriter:
+    """Appends completions to a history store without blocking the event loop.
+
+    ``submit`` only enqueues the record. A single asyncio task drains the
+    bounded queue, coalesces whatever is waiting into one batch and hands the
+    store's I/O (``write``) to a thread; the store then counts the batch
+    (``record_written``) back on the event loop and ``on_written`` is called
+    with the written timestamps.
+
+    ``durability`` controls fsync: ``"none"`` leaves it to the OS, ``"batch"``
+    syncs once per batch and ``"record"`` after every record.
+
+    A batch whose write fails (a full disk, an unreachable network home) is
+    kept and retried with backoff, together with whatever arrived since;
+    ``close`` makes a last attempt at it.
+    """
+
+    def __init__(self, store, durability: str = "none", max_queue: int = 256, max_batch: int = 64,
+                 on_written=None, on_error=None):
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f"Unknown durability mode {durability!r}, expected one of {DURABILITY_MODES}")
+        self.durability = durability
+        self.max_batch = max_batch
+        self._store = store
+        self._on_written = on_written
+        self._on_error = on_error
+        self._queue = asyncio.Queue(maxsize=max_queue)
+        self._task = None
+        self._failed = [] # Records waiting for a retry
+
+    @property
+    def pending(self) -> int:
+        """Records queued or waiting for a retry, but not yet written."""
+        return self._queue.qsize() + len(self._failed)
+
+    def start(self) -> None:
+        """Start the writer task; must be called from the running event loop."""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def submit(self, when: datetime | SessionRecord) -> None:
+        """Queue one completed Pomodoro (or a tagged/interrupted session) for writing."""
+        record = when if isinstance(when, SessionRecord) else SessionRecord(when)
+        if self._task is None:
+            self._write_now([record])
+            return
+        try:
+            self._queue.put_nowait(record)
+        except asyncio.QueueFull:
+            # Writer is far behind (e.g. stalled network home); don't lose the record
+            self._write_now([record])
+
+    async def flush(self) -> None:
+        """Wait until everything submitted so far is on disk, or failed and waits for a retry."""
+        if self._task is not None:
+            await self._queue.join()
+
+    def close(self) -> None:
+        """Stop the task and synchronously write anything still queued."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        leftover, self._failed = self._failed, []
+        while not self._queue.empty():
+            leftover.append(self._queue.get_nowait())
+            self._queue.task_done()
+        if leftover:
+            self._write_now(leftover)
+
+    async def _run(self) -> None:
+        delay = RETRY_DELAY
+        while True:
+            batch, self._failed = self._failed, []
+            taken = 0
+            if not batch:
+                batch.append(await self._queue.get())
+                taken = 1
+            # Coalesce everything already waiting into the same write
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                taken += 1
+            try:
+                receipt = await asyncio.to_thread(self._store.write, batch, self.durability)
+            except Exception as e:
+                self._failed = batch
+                self._error(f"Error writing to history {self._store.path}: {e}; retrying in {delay:g}s")
+            else:
+                delay = RETRY_DELAY
+                self._written(batch, receipt)
+            finally:
+                for _ in range(taken):
+                    self._queue.task_done()
+            if self._failed:
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, MAX_RETRY_DELAY)
+
+    def _write_now(self, batch: list) -> None:
+        try:
+            receipt = self._store.write(batch, self.durability)
+        except Exception as e:
+            self._error(f"Error writing to history {self._store.path}: {e}")
+            return
+        self._written(batch, receipt)
+
+    def _written(self, batch: list, receipt) -> None:
+        # The records are on disk: a failure from here on must not write them again
+        try:
+            self._store.record_written(batch, receipt)
+        except Exception as e:
+            self._error(f"Error counting history records: {e}")
+        if self._on_written is not None:
+            self._on_written([record.timestamp for record in batch])
+
+    def _error(self, message: str) -> None:
+        if self._on_error is not None:
+            self._on_error(message)
@@ -0,0 +1,107 @@
+"""The timer state survives a restart, and a damaged state file means the defaults."""
+
+import os
+import time
+
+from timy.checkpoint import TimerCheckpoint
+from timy.timer import PomodoroSession
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def saved(tmp_path, session: PomodoroSession) -> TimerCheckpoint:
+    checkpoint = TimerCheckpoint(tmp_path / "timer.state")
+    assert checkpoint.acquire()
+    checkpoint.save(session)
+    checkpoint.close()
+    return checkpoint
+
+
+def restored(tmp_path, now: float = None) -> tuple:
+    checkpoint = TimerCheckpoint(tmp_path / "timer.state")
+    assert checkpoint.acquire()
+    session = PomodoroSession()
+    record = checkpoint.restore(session, now)
+    checkpoint.close()
+    return session, record
+
+
+def test_stopped_session_is_restored(tmp_path):
+    clock = Clock()
+    session = PomodoroSession(50, 10, clock=clock)
+    session.tag = "writing"
+    session.timer.start()
+    clock.now += 600
+    session.timer.stop()
+    saved(tmp_path, session)
+
+    restored_session, record = restored(tmp_path)
+    assert record is None
+    assert restored_session.tag == "writing"
+    assert (restored_session.work_duration, restored_session.break_duration) == (50, 10)
+    assert not restored_session.timer.is_running
+    assert restored_session.timer.remaining() == 40 * 60
+
+
+def test_running_session_keeps_its_deadline(tmp_path):
+    session = PomodoroSession()
+    session.timer.start()
+    checkpoint = saved(tmp_path, session)
+    assert checkpoint.writes == 1
+
+    restored_session, record = restored(tmp_path, time.time() + 60)
+    assert record is None
+    assert restored_session.timer.is_running
+    assert 29 * 60 - 1 < restored_session.timer.remaining() <= 29 * 60
+
+
+def test_deadline_passed_while_away_completes_the_session(tmp_path):
+    session = PomodoroSession()
+    session.tag = "writing"
+    session.timer.start()
+    saved(tmp_path, session)
+
+    restored_session, record = restored(tmp_path, time.time() + 3600)
+    assert record is not None and record.tag == "writing" and record.actual == 30 * 60
+    assert restored_session.is_break
+    assert not restored_session.timer.is_running
+
+
+def test_torn_checkpoint_starts_with_the_defaults(tmp_path):
+    session = PomodoroSession(50, 10)
+    session.tag = "writing"
+    saved(tmp_path, session)
+    path = tmp_path / "timer.state"
+    data = bytearray(path.read_bytes())
+    data[40:60] = bytes(20) # Half of a later write landed
+    path.write_bytes(data)
+
+    restored_session, record = restored(tmp_path)
+    assert record is None
+    assert restored_session.tag is None
+    assert restored_session.work_duration == 30
+
+
+def test_short_checkpoint_is_ignored(tmp_path):
+    path = tmp_path / "timer.state"
+    path.write_bytes(TimerCheckpoint.MAGIC)
+    restored_session, record = restored(tmp_path)
+    assert record is None
+    assert restored_session.work_duration == 30
+
+
+def test_only_one_process_checkpoints(tmp_path):
+    first = TimerCheckpoint(tmp_path / "timer.state")
+    assert first.acquire()
+    pid = os.fork()
+    if pid == 0:
+        os._exit(0 if not TimerCheckpoint(tmp_path / "timer.state").acquire() else 1)
+    _, status = os.waitpid(pid, 0)
+    first.close()
+    assert os.WEXITSTATUS(status) == 0
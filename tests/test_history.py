@@ -0,0 +1,135 @@
+"""HistoryTail follows the log through partial lines, truncation and replacement."""
+
+from datetime import date, datetime
+import os
+import threading
+
+from timy.history import DayCountStore, HistoryTail, SessionRecord, append_lines
+
+JAN_6 = date(2025, 1, 6)
+# The sidecar tests stay in the current month, which the log keeps rather than rotating out
+DAY_1 = date.today().replace(day=1)
+
+
+def lines(*hours: int, day: date = JAN_6) -> bytes:
+    return b"".join(SessionRecord(datetime(day.year, day.month, day.day, hour)).to_line() for hour in hours)
+
+
+def test_partial_last_line_waits_for_its_newline(tmp_path):
+    log = tmp_path / "history.log"
+    log.write_bytes(lines(9) + b"2025-01-06T10:0")
+    tail = HistoryTail(log)
+    assert tail.update() == 1
+    with open(log, "ab") as f:
+        f.write(b"0:00\n")
+    assert tail.update() == 1
+    assert tail.counts[JAN_6] == 2
+
+
+def test_unterminated_line_is_counted_once_settled(tmp_path):
+    log = tmp_path / "history.log"
+    log.write_bytes(lines(9) + b"2025-01-06T10:00:00")
+    tail = HistoryTail(log)
+    assert tail.update() == 1
+    assert tail.update() == 1 # Same size as last time: nobody is still writing it
+    assert tail.update() == 0
+    assert tail.counts[JAN_6] == 2
+
+
+def test_old_unterminated_line_is_counted_at_once(tmp_path):
+    log = tmp_path / "history.log"
+    log.write_bytes(b"2025-01-06T10:00:00")
+    os.utime(log, (0, 0))
+    tail = HistoryTail(log)
+    assert tail.update() == 1
+
+
+def test_append_finishes_an_unterminated_line(tmp_path):
+    log = tmp_path / "history.log"
+    log.write_bytes(b"2025-01-06T10:00:00")
+    offset = append_lines(log, [lines(11)])
+    assert offset == len(b"2025-01-06T10:00:00\n")
+    assert log.read_bytes() == lines(10, 11)
+
+
+def test_truncation_then_regrowth_reloads(tmp_path):
+    log = tmp_path / "history.log"
+    log.write_bytes(lines(9, 10, 11))
+    tail = HistoryTail(log)
+    assert tail.update() == 3
+    log.write_bytes(lines(12)) # Shorter than what was read
+    tail.update()
+    assert tail.counts[JAN_6] == 1
+    log.write_bytes(lines(13, 14, 15, 16, 17)) # Longer, but not an append
+    tail.update()
+    assert tail.counts[JAN_6] == 5
+
+
+def test_replaced_file_reloads(tmp_path):
+    log = tmp_path / "history.log"
+    log.write_bytes(lines(9, 10))
+    tail = HistoryTail(log)
+    tail.update()
+    replacement = tmp_path / "history.new"
+    replacement.write_bytes(lines(9, 10)) # Same bytes, new inode
+    os.replace(replacement, log)
+    tail.update()
+    assert tail.counts[JAN_6] == 2
+
+
+def test_deleted_file_forgets_counts(tmp_path):
+    log = tmp_path / "history.log"
+    log.write_bytes(lines(9))
+    tail = HistoryTail(log)
+    tail.update()
+    log.unlink()
+    assert tail.update() == 0
+    assert not tail.counts
+
+
+def test_sidecar_keeps_its_place_across_opens(tmp_path):
+    log, days = tmp_path / "history.log", tmp_path / "history.days"
+    log.write_bytes(lines(9, 10, day=DAY_1))
+    store = DayCountStore(days, log)
+    assert store.update() == 2
+    store.close()
+
+    store = DayCountStore(days, log)
+    assert store.update() == 0 # Counted already, per the sidecar's header
+    with open(log, "ab") as f:
+        f.write(lines(11, day=DAY_1))
+    assert store.update() == 1
+    assert store.range_total(DAY_1, DAY_1) == 3
+    assert store.hours()[11] == 1
+    store.close()
+
+
+def test_sidecar_rebuilds_when_the_log_is_replaced(tmp_path):
+    log, days = tmp_path / "history.log", tmp_path / "history.days"
+    log.write_bytes(lines(9, 10, 11, day=DAY_1))
+    store = DayCountStore(days, log)
+    store.update()
+    store.close()
+    log.write_bytes(lines(9, day=DAY_1)) # Truncated while nobody was running
+
+    store = DayCountStore(days, log)
+    store.update()
+    assert store.range_total(DAY_1, DAY_1) == 1
+    store.close()
+
+
+def test_concurrent_appends_keep_every_line(tmp_path):
+    log = tmp_path / "history.log"
+
+    def append(minute: int) -> None:
+        for second in range(50):
+            append_lines(log, [SessionRecord(datetime(2025, 1, 6, 9, minute, second)).to_line()])
+
+    threads = [threading.Thread(target=append, args=(minute,)) for minute in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    tail = HistoryTail(log)
+    assert tail.update() == 400
+    assert log.read_bytes().count(b"\n") == 400
@@ -0,0 +1,132 @@
+"""The scheduler keeps exactly one wakeup pending, for the earliest deadline."""
+
+import pytest
+
+from timy.scheduler import TimerScheduler, parse_timer_spec
+
+
+class Loop:
+    """A fake host loop and clock: wakeups only fire when ``advance`` reaches them."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.pending = []
+
+    def clock(self) -> float:
+        return self.now
+
+    def call_later(self, delay: float, callback):
+        handle = Handle(self.now + delay, callback)
+        self.pending.append(handle)
+        return handle
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+        for handle in [handle for handle in self.pending if handle.when <= self.now]:
+            self.pending.remove(handle)
+            if not handle.cancelled:
+                handle.callback()
+
+    @property
+    def armed(self) -> list:
+        return [handle.when for handle in self.pending if not handle.cancelled]
+
+
+class Handle:
+    def __init__(self, when: float, callback):
+        self.when = when
+        self.callback = callback
+        self.cancelled = False
+
+    def cancel(self) -> None:
+        self.cancelled = True
+
+
+@pytest.fixture
+def loop():
+    return Loop()
+
+
+def scheduler_for(loop: Loop, done: list) -> TimerScheduler:
+    return TimerScheduler(loop.call_later, lambda timer, was_break: done.append((timer.name, was_break)), loop.clock)
+
+
+def test_one_wakeup_for_many_timers(loop):
+    done = []
+    scheduler = scheduler_for(loop, done)
+    for minutes in (25, 10, 50):
+        scheduler.add(f"t{minutes}", minutes)
+        scheduler.start(f"t{minutes}")
+    assert loop.armed == [600.0]
+
+    loop.advance(600)
+    assert done == [("t10", False)]
+    assert scheduler.get("t10").completed == 1
+    assert not scheduler.get("t10").is_running
+    assert loop.armed == [1500.0]
+    assert scheduler.wakeups == 1
+
+
+def test_stopped_and_removed_timers_do_not_fire(loop):
+    done = []
+    scheduler = scheduler_for(loop, done)
+    scheduler.add("a", 10)
+    scheduler.add("b", 20)
+    scheduler.start("a")
+    scheduler.start("b")
+    scheduler.stop("a")
+    assert loop.armed == [1200.0]
+    scheduler.remove("b")
+    assert loop.armed == []
+    loop.advance(3600)
+    assert done == []
+    assert scheduler.wakeups == 0
+
+
+def test_restart_moves_the_deadline(loop):
+    done = []
+    scheduler = scheduler_for(loop, done)
+    scheduler.add("a", 10)
+    scheduler.start("a")
+    loop.advance(300)
+    scheduler.toggle("a") # Paused with 5 minutes left
+    loop.advance(300)
+    assert scheduler.toggle("a")
+    assert loop.armed == [900.0]
+    loop.advance(299)
+    assert done == []
+    loop.advance(1)
+    assert done == [("a", False)]
+
+
+def test_break_follows_work(loop):
+    done = []
+    scheduler = scheduler_for(loop, done)
+    scheduler.add("a", 10, 2)
+    scheduler.start("a")
+    loop.advance(600)
+    scheduler.start("a")
+    loop.advance(120)
+    assert done == [("a", False), ("a", True)]
+    assert scheduler.get("a").completed == 1
+
+
+def test_duplicate_names_are_rejected(loop):
+    scheduler = scheduler_for(loop, [])
+    scheduler.add("a")
+    with pytest.raises(ValueError):
+        scheduler.add("a")
+
+
+@pytest.mark.parametrize("spec, parsed", [
+    ("writing", ("writing", None, None)),
+    ("writing:50", ("writing", 50, None)),
+    ("writing:50/10", ("writing", 50, 10)),
+])
+def test_parse_timer_spec(spec, parsed):
+    assert parse_timer_spec(spec) == parsed
+
+
+def test_bad_timer_spec():
+    with pytest.raises(ValueError):
+        parse_timer_spec("writing:soon")
@@ -0,0 +1,86 @@
+"""Rotation moves finished months into segments without losing or repeating a line."""
+
+from datetime import datetime
+import gzip
+import random
+
+from timy.history import SessionRecord
+from timy.segments import MAX_OPEN_SEGMENTS, HistorySegments
+from timy.transfer import read_history
+
+
+def month_lines(year: int, month: int, count: int = 3) -> list:
+    return [SessionRecord(datetime(year, month, 1 + day, 9)).to_line() for day in range(count)]
+
+
+def segment_lines(segments: HistorySegments, month: str) -> list:
+    entry = segments.manifest()["segments"][month]
+    with gzip.open(segments.dir / entry["file"], "rb") as f:
+        return f.read().splitlines(keepends=True)
+
+
+def test_rotation_across_a_month_boundary(tmp_path):
+    log = tmp_path / "history.log"
+    old, current = month_lines(2025, 1) + month_lines(2025, 2), month_lines(2025, 3)
+    log.write_bytes(b"".join(old + current))
+    segments = HistorySegments(log)
+    assert segments.rotate(now=datetime(2025, 2, 28, 23, 59)) == 3
+
+    assert sorted(segments.manifest()["segments"]) == ["2025-01"]
+    assert segments.rotate(now=datetime(2025, 3, 1)) == 3 # Another month is finished
+    manifest = segments.manifest()
+    assert sorted(manifest["segments"]) == ["2025-01", "2025-02"]
+    assert manifest["generation"] == 2
+    assert segment_lines(segments, "2025-01") == month_lines(2025, 1)
+    assert segment_lines(segments, "2025-02") == month_lines(2025, 2)
+    assert log.read_bytes() == b"".join(current)
+
+    days, _ = segments.totals()
+    assert sum(days.values()) == 6
+    assert [record.to_line() for record in read_history(log)] == old + current
+    assert segments.rotate(now=datetime(2025, 3, 1)) == 0
+
+
+def test_rotation_adds_late_lines_to_a_segment(tmp_path):
+    log = tmp_path / "history.log"
+    log.write_bytes(b"".join(month_lines(2025, 1, 2)))
+    segments = HistorySegments(log)
+    segments.rotate(now=datetime(2025, 3, 1))
+    with open(log, "ab") as f:
+        f.write(SessionRecord(datetime(2025, 1, 20, 9)).to_line()) # Logged late, with --at
+    assert segments.rotate(now=datetime(2025, 3, 1)) == 1
+    assert segment_lines(segments, "2025-01") == month_lines(2025, 1, 2) + [SessionRecord(datetime(2025, 1, 20, 9)).to_line()]
+    assert sorted(path.name for path in segments.dir.iterdir()) == ["2025-01.2.log.gz", "manifest.json"]
+
+
+def test_unordered_log_with_more_months_than_open_segments(tmp_path):
+    log = tmp_path / "history.log"
+    months = [(2020 + i // 12, 1 + i % 12) for i in range(MAX_OPEN_SEGMENTS * 2 + 3)]
+    lines = [line for year, month in months for line in month_lines(year, month)]
+    shuffled = lines[:]
+    random.Random(1).shuffle(shuffled)
+    log.write_bytes(b"".join(shuffled))
+    segments = HistorySegments(log)
+    assert segments.rotate(now=datetime(2030, 1, 1)) == len(lines)
+
+    assert len(segments.manifest()["segments"]) == len(months)
+    for year, month in months:
+        expected = [line for line in shuffled if line in month_lines(year, month)]
+        assert segment_lines(segments, f"{year}-{month:02}") == expected
+    assert log.read_bytes() == b""
+    assert sorted(record.to_line() for record in read_history(log)) == sorted(lines)
+
+
+def test_interrupted_commit_is_undone(tmp_path):
+    log = tmp_path / "history.log"
+    data = b"".join(month_lines(2025, 1) + month_lines(2025, 3))
+    log.write_bytes(data)
+    segments = HistorySegments(log)
+    writer = segments.writer("2025-03")
+    for line in data.splitlines(keepends=True):
+        writer.write(line)
+    writer.finish() # Crash before the manifest was replaced
+    segments.recover()
+    assert list(segments.dir.iterdir()) == []
+    assert not list(tmp_path.glob("*.next"))
+    assert log.read_bytes() == data
@@ -0,0 +1,48 @@
+"""The sound worker plays clips in order, off the caller's thread."""
+
+import threading
+
+from timy.sound import BREAK_OVER, WORK_OVER, NullBackend
+
+
+class StuckBackend(NullBackend):
+    """Blocks in ``load`` until released, like a busy audio device."""
+
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+        self.unloaded = False
+
+    def load(self) -> None:
+        self.release.wait()
+
+    def unload(self) -> None:
+        self.unloaded = True
+
+
+def test_clips_play_in_order():
+    sound = NullBackend()
+    sound.play(WORK_OVER)
+    sound.play(BREAK_OVER)
+    sound.close() # Waits for the queued clips
+    assert sound.played == [WORK_OVER, BREAK_OVER]
+    assert sound.pending == 0
+
+
+def test_full_queue_drops_clips():
+    sound = StuckBackend()
+    for _ in range(sound.QUEUE_SIZE + 3):
+        sound.play(WORK_OVER)
+    assert sound.pending == sound.QUEUE_SIZE
+    sound.release.set()
+    sound.close()
+    assert sound.played == [WORK_OVER] * sound.QUEUE_SIZE
+
+
+def test_close_gives_up_on_a_stuck_worker():
+    sound = StuckBackend()
+    for _ in range(sound.QUEUE_SIZE):
+        sound.play(WORK_OVER)
+    sound.close() # Must not block on the full queue
+    assert not sound.unloaded # The worker may still use the clips
+    sound.release.set()
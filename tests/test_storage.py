@@ -0,0 +1,136 @@
+"""The history backends must agree on every query of the store interface."""
+
+from collections import Counter
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from timy.history import SessionRecord
+from timy.storage import BACKENDS, open_store
+
+FILES = {"log": "history.log", "sqlite": "history.db", "memory": None}
+
+TODAY = datetime.now().replace(minute=0, second=0, microsecond=0)
+# Spread over past months too, so the log backend moves some into segments
+RECORDS = [
+    SessionRecord(datetime(2025, 1, 6, 9, 30)),
+    SessionRecord(datetime(2025, 1, 6, 14, 0), tag="writing", planned=1800, actual=1800),
+    SessionRecord(datetime(2025, 3, 2, 23, 59)),
+    SessionRecord(datetime(2025, 3, 3, 0, 0), tag="writing", planned=1800, actual=600, interrupted=True),
+    SessionRecord(TODAY - timedelta(days=40)),
+    SessionRecord(TODAY - timedelta(days=1), tag="review", planned=1500, actual=1500),
+    SessionRecord(TODAY),
+]
+COUNTED = [record for record in RECORDS if not record.interrupted]
+
+
+def open_at(backend: str, directory):
+    name = FILES[backend]
+    return open_store(backend, directory / name if name else None)
+
+
+@pytest.fixture(params=BACKENDS)
+def store(request, tmp_path):
+    store = open_at(request.param, tmp_path)
+    store.update()
+    yield store
+    store.close()
+
+
+def write(store, records: list) -> None:
+    store.record_written(records, store.write(records))
+
+
+def write_all(store, records: list) -> None:
+    write(store, records)
+    store.update()
+
+
+def key(record: SessionRecord) -> tuple:
+    return record.timestamp, record.tag, record.planned, record.actual, record.interrupted
+
+
+def check_counts(store, records: list) -> None:
+    days = Counter(record.timestamp.date() for record in records)
+    hours = Counter(record.timestamp.hour for record in records)
+    start, end = date(2025, 1, 1), TODAY.date()
+    assert dict(store.window(start, end)) == {day: n for day, n in days.items() if n}
+    assert store.window(date(2025, 1, 7), date(2025, 3, 1)) == {}
+    assert store.range_total(start, end) == len(records)
+    assert store.range_total(date(2025, 3, 1), date(2025, 3, 31)) == 1
+    assert store.first_day() == min(days)
+    assert tuple(store.hours()) == tuple(hours[hour] for hour in range(24))
+
+
+def test_empty(store):
+    assert store.first_day() is None
+    assert store.range_total(date(2025, 1, 1), TODAY.date()) == 0
+    assert tuple(store.hours()) == (0,) * 24
+
+
+def test_written_records_are_counted(store):
+    # A backend may leave records to the next update (the log does when it was empty)
+    write_all(store, RECORDS)
+    check_counts(store, COUNTED)
+    store.update() # Nothing new on disk
+    check_counts(store, COUNTED)
+
+
+def test_records_are_counted_once(store):
+    write_all(store, RECORDS[:1])
+    write_all(store, RECORDS[1:])
+    store.update()
+    check_counts(store, COUNTED)
+
+
+def test_sessions_keep_every_field(store):
+    write_all(store, RECORDS)
+    assert sorted(map(key, store.sessions())) == sorted(map(key, RECORDS))
+
+
+@pytest.mark.parametrize("backend", ["log", "sqlite"])
+def test_another_process_sees_writes(backend, tmp_path):
+    writer, reader = open_at(backend, tmp_path), open_at(backend, tmp_path)
+    reader.update()
+    write(writer, RECORDS)
+    reader.update()
+    check_counts(reader, COUNTED)
+    writer.close()
+    reader.close()
+
+
+def test_merge_drops_duplicates(store, tmp_path):
+    write_all(store, RECORDS[:4])
+    export = tmp_path / "export.log"
+    export.write_bytes(b"".join(record.to_line() for record in RECORDS[2:]))
+    result = store.merge([export])
+    store.update()
+    assert result.written == len(RECORDS)
+    assert result.duplicates == 2
+    check_counts(store, COUNTED)
+    assert sorted(map(key, store.sessions())) == sorted(map(key, RECORDS))
+
+
+def test_merge_twice_changes_nothing(store, tmp_path):
+    export = tmp_path / "export.log"
+    export.write_bytes(b"".join(record.to_line() for record in RECORDS))
+    store.merge([export])
+    result = store.merge([export])
+    store.update()
+    assert result.written == len(RECORDS)
+    check_counts(store, COUNTED)
+
+
+@pytest.mark.parametrize("source", BACKENDS)
+@pytest.mark.parametrize("target", BACKENDS)
+def test_migrate_between_backends(source, target, tmp_path):
+    (tmp_path / "from").mkdir()
+    (tmp_path / "to").mkdir()
+    old, new = open_at(source, tmp_path / "from"), open_at(target, tmp_path / "to")
+    write_all(old, RECORDS)
+    new.merge([], records=old.sessions()) # What `timy migrate` does
+    new.update()
+    check_counts(new, COUNTED)
+    assert sorted(map(key, new.sessions())) == sorted(map(key, RECORDS))
+    old.close()
+    new.close()
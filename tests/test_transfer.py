@@ -0,0 +1,54 @@
+"""Import sorts and deduplicates in bounded memory; every export format round-trips."""
+
+from datetime import datetime, timedelta
+import io
+
+import pytest
+
+from timy.history import SessionRecord
+from timy.segments import HistorySegments
+from timy.transfer import FORMATS, export_records, import_logs, read_history, record_key
+
+START = datetime(2022, 1, 1, 9)
+# Every 5 days over three years: far more keys than the smallest run holds (1024)
+RECORDS = [
+    SessionRecord(START + timedelta(days=5 * i, minutes=i % 60), tag="writing" if i % 3 else None,
+                  planned=1800 if i % 3 else None, actual=1800 if i % 3 else None)
+    for i in range(220)
+] * 6
+RECORDS += [SessionRecord(START + timedelta(hours=i)) for i in range(3000)]
+
+
+def test_import_spanning_many_runs_and_months(tmp_path):
+    source = tmp_path / "export.log"
+    # Newest first, so nothing arrives in order
+    source.write_bytes(b"".join(record.to_line() for record in reversed(RECORDS)) + b"not a timestamp\n")
+    log = tmp_path / "history.log"
+    result = import_logs([source], path=log, memory=0)
+
+    distinct = sorted(set(map(record_key, RECORDS)))
+    assert result.runs > 1
+    assert result.read == len(RECORDS)
+    assert result.written == len(distinct)
+    assert result.invalid == 1
+    assert [record_key(record) for record in read_history(log)] == distinct
+    months = {record.timestamp.strftime("%Y-%m") for record in RECORDS}
+    assert set(HistorySegments(log).manifest()["segments"]) == months
+
+    again = import_logs([source], path=log, memory=0)
+    assert again.written == len(distinct)
+    assert [record_key(record) for record in read_history(log)] == distinct
+
+
+@pytest.mark.parametrize("fmt", FORMATS)
+def test_export_round_trip(fmt, tmp_path):
+    records = RECORDS[:220] + [SessionRecord(START, tag="review", planned=1500, actual=300, interrupted=True)]
+    out = io.BytesIO()
+    assert export_records(out, fmt, records) == len(records)
+    exported = tmp_path / f"export.{fmt}"
+    exported.write_bytes(out.getvalue())
+
+    log = tmp_path / "history.log"
+    result = import_logs([exported], path=log)
+    assert result.invalid == 0
+    assert [record_key(record) for record in read_history(log)] == sorted(map(record_key, records))